@@ -0,0 +1,149 @@
+import time
+import queue
+import threading
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+
+import numpy as np
+
+from . import forksafe, metrics
+
+# ------- Dynamic micro-batching -------
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into one batched call.
+    batch_fn: callable(list of items) -> list of results (same order)
+    max_batch_size: largest batch handed to batch_fn
+    max_wait_us: how long the first request of a batch may wait for company
+    timeout_s: default time a caller waits for its result before giving up
+    """
+
+    def __init__(self, batch_fn, max_batch_size=32, max_wait_us=1000, stats_window=2048, timeout_s=30.0):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        if timeout_s is None or timeout_s <= 0:
+            raise ValueError("timeout_s must be a positive number of seconds")
+        self.batch_fn = batch_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_us = max_wait_us
+        self.timeout_s = timeout_s
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._batches = 0
+        self._requests = 0
+        self._batch_size_counts = {}
+        self._queue_waits_us = deque(maxlen=stats_window)
+        self._batch_run_us = deque(maxlen=stats_window)
+        self._closed = False
+        self._start_worker()
+        forksafe.register(self, MicroBatcher._after_fork)
+
+    def _start_worker(self):
+        self._worker = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._worker.start()
+
+    def _after_fork(self):
+        # The child inherits the queue and lock but not the worker thread
+        if not self._closed:
+            self._queue = queue.Queue()
+            self._stats_lock = threading.Lock()
+            self._start_worker()
+
+    def submit(self, item):
+        """Queue one item; returns a Future resolved with its result"""
+        if self._closed:
+            raise RuntimeError("MicroBatcher is shut down")
+        future = Future()
+        self._queue.put((item, future, time.perf_counter()))
+        return future
+
+    def __call__(self, item, timeout=None):
+        """Submit and wait up to `timeout` (default timeout_s); raises TimeoutError after that"""
+        future = self.submit(item)
+        try:
+            return future.result(timeout=self.timeout_s if timeout is None else timeout)
+        except TimeoutError:
+            future.cancel()  # dropped from its batch if it has not started yet
+            raise
+
+    def shutdown(self):
+        self._closed = True
+        self._queue.put(None)
+        self._worker.join()
+
+    def stats(self):
+        """Batch-size and queue-wait metrics for tuning throughput vs latency"""
+        with self._stats_lock:
+            waits = np.array(self._queue_waits_us, dtype=np.float64)
+            runs = np.array(self._batch_run_us, dtype=np.float64)
+            return {
+                "max_batch_size": self.max_batch_size,
+                "max_wait_us": self.max_wait_us,
+                "batches": self._batches,
+                "requests": self._requests,
+                "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+                "batch_size_counts": dict(sorted(self._batch_size_counts.items())),
+                "queue_wait_us": _summary(waits),
+                "batch_run_us": _summary(runs),
+                "queue_depth": self._queue.qsize(),
+            }
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            deadline = first[2] + self.max_wait_us / 1e6
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    entry = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is None:
+                    self._run(batch)
+                    return
+                batch.append(entry)
+            self._run(batch)
+
+    def _run(self, batch):
+        started = time.perf_counter()
+        # Skip items whose caller timed out; the rest can no longer be cancelled
+        batch = [entry for entry in batch if entry[1].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        items = [item for item, _, _ in batch]
+        try:
+            results = list(self.batch_fn(items))
+            if len(results) != len(batch):
+                raise RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} items")
+            for (_, future, _), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+        finished = time.perf_counter()
+
+        metrics.BATCH_SIZE.observe(len(batch))
+        for _, _, enqueued in batch:
+            metrics.QUEUE_WAIT_SECONDS.observe(started - enqueued)
+
+        with self._stats_lock:
+            self._batches += 1
+            self._requests += len(batch)
+            self._batch_size_counts[len(batch)] = self._batch_size_counts.get(len(batch), 0) + 1
+            self._queue_waits_us.extend((started - enqueued) * 1e6 for _, _, enqueued in batch)
+            self._batch_run_us.append((finished - started) * 1e6)
+
+def _summary(values):
+    if len(values) == 0:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p99": 0.0, "max": 0.0}
+    return {
+        "count": int(len(values)),
+        "mean": float(values.mean()),
+        "p50": float(np.percentile(values, 50)),
+        "p99": float(np.percentile(values, 99)),
+        "max": float(values.max()),
+    }
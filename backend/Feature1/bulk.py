@@ -0,0 +1,337 @@
+import io
+import os
+import json
+import asyncio
+import tempfile
+
+import numpy as np
+
+from . import logic, metrics
+from .features import INPUT_KEYS
+
+# ------- Bulk scoring -------
+# Block-model CSVs (the columns machinelearning.py trains on) are cut into chunks
+# of whole lines; each chunk is parsed, validated and rock-type encoded
+# column-wise, scored with one batched pass and rendered as NDJSON. Only one
+# chunk is in memory at a time, whatever the file size. Output goes through an
+# OutputSpool, so the upload keeps being read even when the client only starts
+# reading the response after sending the whole body.
+
+# Numeric model inputs; the CSV headers are the same as the logic.py input keys.
+# Which of them a file must have depends on the model version (bulk_columns).
+NUMERIC_COLUMNS = tuple(key for key in INPUT_KEYS if key != "Rock_Type_enc")
+
+ROWS = metrics.registry.register(metrics.Counter(
+    "rockfall_bulk_rows_total", "Rows received by the bulk scoring endpoints", ("outcome",)
+))
+
+def validate_columns(columns, checks=()):
+    """
+    Vectorized version of the RockfallInput validators.
+    columns: dict of float [N] arrays keyed like the input dicts, holding the
+    NUMERIC_COLUMNS the model version reads (NaN where a value is missing or not a number)
+    checks: extra (bool [N] mask of bad rows, message) pairs, tested first (e.g. rock types)
+    Returns: (valid bool [N], object array [N] with the first error of each invalid row)
+    """
+    n = len(columns["X"])
+    checks = list(checks)
+    checks += [(~np.isfinite(columns[name]), f"{name} must be a number") for name in NUMERIC_COLUMNS if name in columns]
+    with np.errstate(invalid="ignore"):
+        if "Ore_Grade (%)" in columns:
+            grade = columns["Ore_Grade (%)"]
+            checks.append(((grade < 0) | (grade > 100), "Ore grade must be between 0 and 100"))
+        if "Tonnage" in columns:
+            checks.append((columns["Tonnage"] <= 0, "Tonnage must be positive"))
+
+    valid = np.ones(n, dtype=bool)
+    errors = np.full(n, None, dtype=object)
+    for mask, message in checks:
+        hit = mask & valid
+        errors[hit] = message
+        valid &= ~hit
+    return valid, errors
+
+def bulk_columns(spec):
+    """Column names a bulk body needs for a version's FeatureSpec (Rock_Type names, not codes)"""
+    return tuple("Rock_Type" if key == "Rock_Type_enc" else key for key in spec.columns)
+
+def describe_errors(valid, errors, examples=5):
+    """One-line summary of validate_columns errors: message, row count and first rows"""
+    invalid = np.flatnonzero(~valid)
+    parts = []
+    for message in dict.fromkeys(errors[invalid]):
+        rows = invalid[errors[invalid] == message]
+        parts.append(f"{message} ({len(rows)} rows, first {rows[:examples].tolist()})")
+    return "; ".join(parts)
+
+class CsvChunker:
+    """
+    Cuts a CSV byte stream into self-contained chunks: the header line plus
+    whole data lines, about chunk_bytes each. Quoted fields must not contain
+    newlines (block-model exports don't have them).
+    """
+
+    def __init__(self, chunk_bytes=1 << 20):
+        self.chunk_bytes = chunk_bytes
+        self.header = None
+        self._buffer = bytearray()
+
+    def feed(self, data):
+        """Add received bytes; returns the chunks that are now complete"""
+        self._buffer += data
+        if self.header is None:
+            end = self._buffer.find(b"\n")
+            if end < 0:
+                return []
+            self.header = bytes(self._buffer[:end + 1])
+            del self._buffer[:end + 1]
+        chunks = []
+        while len(self._buffer) >= self.chunk_bytes:
+            cut = self._buffer.rfind(b"\n") + 1
+            if cut == 0:
+                break  # one very long line; wait for its end
+            chunks.append(self.header + bytes(self._buffer[:cut]))
+            del self._buffer[:cut]
+        return chunks
+
+    def finish(self):
+        """Chunks left at the end of the stream"""
+        if self.header is None:
+            self.header, self._buffer = bytes(self._buffer) + b"\n", bytearray()
+        rest, self._buffer = bytes(self._buffer), bytearray()
+        return [self.header + rest] if rest.strip() else []
+
+    def missing_columns(self, required):
+        """Names in `required` (see bulk_columns) absent from the header"""
+        import pandas as pd
+
+        columns = pd.read_csv(io.BytesIO(self.header), nrows=0, encoding="utf-8-sig").columns
+        return [name for name in required if name not in columns]
+
+def score_csv_chunk(data, first_row, encoding, version):
+    """
+    data: CSV bytes (header + whole lines); first_row: index of its first data row
+    encoding: lowercase rock type -> code; version: pinned ModelVersion
+    Reads the columns bulk_columns(version.features) names; other columns are ignored.
+    Returns: (NDJSON bytes, number of rows, number of invalid rows)
+    One line per row, in input order: {"row", "risk_label", "confidence", "grid_position"}
+    or {"row", "error"}. Blank lines are skipped and not counted as rows.
+    """
+    import pandas as pd
+
+    with metrics.stage("validation"):
+        required = bulk_columns(version.features)
+        frame = pd.read_csv(io.BytesIO(data), usecols=list(required), dtype={"Rock_Type": str}, encoding="utf-8-sig")
+        columns = {
+            name: pd.to_numeric(frame[name], errors="coerce").to_numpy(np.float64)
+            for name in required if name != "Rock_Type"
+        }
+        checks = []
+        if "Rock_Type" in required:
+            rock_types = frame["Rock_Type"].str.strip().str.lower()
+            checks.append(((rock_types.isna() | (rock_types == "")).to_numpy(), "Rock_Type must be a non-empty string"))
+            columns["Rock_Type_enc"] = rock_types.map(encoding).fillna(0).to_numpy(np.float64)
+        valid, errors = validate_columns(columns, checks)
+        rows = np.arange(first_row, first_row + len(frame))
+
+    probs, grid_x, grid_y = logic.score_columns({key: values[valid] for key, values in columns.items()}, version)
+
+    with metrics.stage("serialize"):
+        pred = probs.argmax(axis=1)
+        confidence = probs[np.arange(len(pred)), pred]
+        lines = np.empty(len(frame), dtype=object)
+        lines[valid] = [
+            json.dumps({
+                "row": r,
+                "risk_label": logic.CLASS_LABELS.get(c, "Unknown"),
+                "confidence": p,
+                "grid_position": {"x": x, "y": y},
+            }, separators=(",", ":"))
+            for r, c, p, x, y in zip(
+                rows[valid].tolist(), pred.tolist(), confidence.tolist(), grid_x.tolist(), grid_y.tolist()
+            )
+        ]
+        lines[~valid] = [
+            json.dumps({"row": r, "error": e}, separators=(",", ":"))
+            for r, e in zip(rows[~valid].tolist(), errors[~valid])
+        ]
+    invalid = int(len(frame) - valid.sum())
+    ROWS.inc(len(frame) - invalid, outcome="scored")
+    ROWS.inc(invalid, outcome="invalid")
+    return ("\n".join(lines) + "\n").encode() if len(frame) else b"", len(frame), invalid
+
+# ------- Columnar binary input -------
+# application/octet-stream, all little-endian, N rows:
+#   float32 [N, K] row-major matrix, K numeric columns in the order the request's
+#                  `columns` parameter lists them (default RAW_COLUMNS, the
+#                  original 6-column layout)
+#   uint8   [N]    rock-type codes (the API's ROCK_TYPE_ENCODING values)
+# N is the body length / raw_row_bytes(columns). The columns must cover what the
+# active model version reads (bulk_columns, e.g. the cost columns); the response
+# is float32 [N] risk probabilities followed by uint8 [N] predicted classes.
+# application/vnd.apache.arrow.stream: one Arrow IPC stream whose columns are
+# named like the CSV (Rock_Type as strings or codes); the response is an Arrow
+# stream too. Needs pyarrow, imported only for this format.
+RAW_COLUMNS = ("X", "Y", "Z", "Ore_Grade (%)", "Tonnage", "Ore_Value (¥/tonne)")
+
+def raw_layout(names=None):
+    """Comma-separated float32 column names of a raw body -> tuple (default RAW_COLUMNS)"""
+    if not names:
+        return RAW_COLUMNS
+    layout = tuple(name.strip() for name in names.split(","))
+    unknown = [name for name in layout if name not in NUMERIC_COLUMNS]
+    if unknown:
+        raise ValueError(f"unknown columns {unknown}; raw columns must be among {list(NUMERIC_COLUMNS)}")
+    if len(set(layout)) != len(layout):
+        raise ValueError(f"columns {list(layout)} name a column twice")
+    return layout
+
+def raw_row_bytes(layout):
+    return 4 * len(layout) + 1
+
+def missing_bulk_columns(names, required):
+    """Names in `required` (see bulk_columns) absent from a body's column names"""
+    missing = [name for name in required if name not in names]
+    if missing:
+        raise ValueError(f"missing columns {missing} needed by the active model version")
+
+def parse_raw_columns(body, rock_type_codes, layout, required):
+    """
+    Views into a raw columnar body, nothing is copied.
+    layout: float32 column names in body order (raw_layout); required: bulk_columns of the version
+    Returns: (columns dict keyed like the input dicts, extra validate_columns checks)
+    """
+    missing_bulk_columns(("Rock_Type", *layout), required)
+    row_bytes = raw_row_bytes(layout)
+    if len(body) % row_bytes:
+        raise ValueError(f"Body length {len(body)} is not a multiple of {row_bytes} bytes per row")
+    n = len(body) // row_bytes
+    matrix = np.frombuffer(body, dtype="<f4", count=n * len(layout)).reshape(n, len(layout))
+    codes = np.frombuffer(body, dtype=np.uint8, offset=matrix.nbytes)
+    columns = {name: matrix[:, i] for i, name in enumerate(layout) if name in required}
+    columns["Rock_Type_enc"] = codes
+    known = sorted(set(rock_type_codes))
+    return columns, [(~np.isin(codes, known), f"Rock_Type code must be one of {known}")]
+
+def parse_arrow_columns(body, encoding, required):
+    """
+    Columns of an Arrow IPC stream (zero-copy for float columns without nulls).
+    required: bulk_columns of the version; other columns are ignored
+    Returns: (columns dict keyed like the input dicts, extra validate_columns checks)
+    """
+    import pyarrow as pa
+
+    table = pa.ipc.open_stream(body).read_all()
+    missing_bulk_columns(table.column_names, required)
+    columns, checks = {}, []
+    for name in required:
+        if name == "Rock_Type":
+            continue
+        column = table.column(name)
+        if not pa.types.is_floating(column.type):
+            column = column.cast(pa.float64())
+        columns[name] = column.fill_null(float("nan")).to_numpy()
+    if "Rock_Type" in required:
+        rock_types = table.column("Rock_Type")
+        if pa.types.is_integer(rock_types.type):
+            codes = rock_types.cast(pa.float64()).fill_null(float("nan")).to_numpy()
+            known = sorted(set(encoding.values()))
+            checks.append((~np.isin(codes, known), f"Rock_Type code must be one of {known}"))
+        else:
+            names = rock_types.cast(pa.string()).to_pandas().str.strip().str.lower()
+            codes = names.map(encoding).fillna(0).to_numpy(np.float64)
+            checks.append(((names.isna() | (names == "")).to_numpy(), "Rock_Type must be a non-empty string"))
+        columns["Rock_Type_enc"] = codes
+    return columns, checks
+
+def score_columnar(body, arrow, encoding, max_rows, layout=RAW_COLUMNS):
+    """
+    Parse, validate and score a columnar body (see above) with the active model
+    version; any invalid row rejects the whole body with a ValueError.
+    layout: float32 column order of a raw body (raw_layout)
+    Returns: (class probabilities [N, classes], grid_x [N], grid_y [N], model version)
+    """
+    with logic.acquire_model() as version:
+        required = bulk_columns(version.features)
+        with metrics.stage("validation"):
+            if arrow:
+                columns, checks = parse_arrow_columns(body, encoding, required)
+            else:
+                columns, checks = parse_raw_columns(body, encoding.values(), layout, required)
+            n = len(columns["X"])
+            if not 0 < n <= max_rows:
+                raise ValueError(f"Expected between 1 and {max_rows} rows, got {n}")
+            valid, errors = validate_columns(columns, checks)
+            if not valid.all():
+                raise ValueError(describe_errors(valid, errors))
+        probs, grid_x, grid_y = logic.score_columns(columns, version)
+    ROWS.inc(n, outcome="scored")
+    return probs, grid_x, grid_y, version.version
+
+def encode_raw_result(probs):
+    risk = probs[:, logic.RISK_CLASS].astype("<f4")
+    return risk.tobytes() + probs.argmax(axis=1).astype(np.uint8).tobytes()
+
+def encode_arrow_result(probs, grid_x, grid_y, model_version):
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ("risk_probability", pa.float32()),
+        ("predicted_class", pa.uint8()),
+        ("grid_x", pa.int32()),
+        ("grid_y", pa.int32()),
+    ], metadata={"model_version": model_version, "class_labels": json.dumps(logic.CLASS_LABELS)})
+    batch = pa.record_batch([
+        pa.array(probs[:, logic.RISK_CLASS].astype(np.float32)),
+        pa.array(probs.argmax(axis=1).astype(np.uint8)),
+        pa.array(grid_x.astype(np.int32)),
+        pa.array(grid_y.astype(np.int32)),
+    ], schema=schema)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+class OutputSpool:
+    """
+    Append-only temporary file between a scoring task and the response stream.
+    A client that reads while it uploads gets each chunk's lines as soon as they
+    are written; one that reads only after uploading (most HTTP client libraries)
+    finds them waiting on disk instead of deadlocking the upload.
+    One writer task and one reader.
+    """
+
+    def __init__(self, read_size=1 << 16):
+        self.read_size = read_size
+        self._file = tempfile.TemporaryFile(prefix="rockfall-bulk-")
+        self._size = 0
+        self._done = False
+        self._changed = asyncio.Event()
+
+    def append(self, data):
+        """Blocking write after everything written so far; run it on a worker thread"""
+        os.pwrite(self._file.fileno(), data, self._size)
+        self._size += len(data)
+
+    def notify(self, done=False):
+        """Wake the reader after append(); done=True once nothing more will be written"""
+        self._done = self._done or done
+        self._changed.set()
+
+    async def chunks(self):
+        """Yield what has been written, as it is written, until done"""
+        offset = 0
+        while True:
+            if offset < self._size:
+                data = os.pread(self._file.fileno(), min(self.read_size, self._size - offset), offset)
+                offset += len(data)
+                yield data
+            elif self._done:
+                return
+            else:
+                self._changed.clear()
+                if offset == self._size and not self._done:
+                    await self._changed.wait()
+
+    def close(self):
+        self._file.close()
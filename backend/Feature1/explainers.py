@@ -0,0 +1,290 @@
+import time
+import asyncio
+import threading
+
+from . import metrics
+
+GROQ_MODEL = "openai/gpt-oss-120b"
+
+FALLBACKS = metrics.registry.register(metrics.Counter(
+    "rockfall_explanation_fallbacks_total", "Explanations answered from the local template", ("reason",)
+))
+CIRCUIT_OPEN = metrics.registry.register(metrics.Gauge(
+    "rockfall_explanation_circuit_open", "1 while the explanation circuit breaker is open"
+))
+
+# ------- Explanation backends -------
+class GroqBackend:
+    """
+    Async Groq client with a bounded keep-alive connection pool.
+    base_url points the client at another OpenAI-compatible server (e.g. a local fake).
+    """
+
+    def __init__(self, api_key=None, base_url=None, model=GROQ_MODEL, max_connections=16):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.model = model
+        self.max_connections = max_connections
+        self._client = None
+
+    def _get_client(self):
+        # Created lazily so the client and its pool belong to the explainer's event loop
+        if self._client is None:
+            import httpx
+            from groq import AsyncGroq
+
+            http_client = httpx.AsyncClient(limits=httpx.Limits(
+                max_connections=self.max_connections, max_keepalive_connections=self.max_connections
+            ))
+            self._client = AsyncGroq(
+                api_key=self.api_key, base_url=self.base_url, max_retries=0, http_client=http_client
+            )
+        return self._client
+
+    async def complete(self, prompt):
+        response = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=500,
+        )
+        return response.choices[0].message.content
+
+    async def stream(self, prompt):
+        """Yields explanation text deltas as Groq generates them"""
+        response = await self._get_client().chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=500,
+            stream=True,
+        )
+        async for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+class StubBackend:
+    """Local stand-in for Groq (tests, benchmarks, offline dev)"""
+
+    def __init__(self, latency_s=0.0, content=None, fail=False):
+        self.latency_s = latency_s
+        self.content = content
+        self.fail = fail
+        self.calls = 0
+
+    async def complete(self, prompt):
+        self.calls += 1
+        if self.latency_s:
+            await asyncio.sleep(self.latency_s)
+        if self.fail:
+            raise RuntimeError("Stub backend failure")
+        return self._text(prompt)
+
+    async def stream(self, prompt):
+        """Same text as complete(), one word per chunk, latency spread across the words"""
+        self.calls += 1
+        words = self._text(prompt).split(" ")
+        for i, word in enumerate(words):
+            if self.latency_s:
+                await asyncio.sleep(self.latency_s / len(words))
+            if self.fail and i == len(words) // 2:
+                raise RuntimeError("Stub backend failure")
+            yield word if i == 0 else " " + word
+
+    def _text(self, prompt):
+        if self.content is not None:
+            return self.content
+        return f"Stub explanation ({len(prompt)} prompt chars) from model {GROQ_MODEL}."
+
+def template_explanation(prediction_result, key_factors, safety_recommendations):
+    """Fast local explanation used when the LLM is slow, failing or switched off"""
+    lines = [
+        f"The model rates this location as {prediction_result['risk_label']} "
+        f"with {prediction_result['confidence']:.0%} confidence.",
+    ]
+    if key_factors:
+        lines.append("Key factors: " + "; ".join(key_factors) + ".")
+    if safety_recommendations:
+        lines.append("Recommended measures: " + "; ".join(safety_recommendations) + ".")
+    lines.append("(Automatic summary - the detailed AI explanation is temporarily unavailable.)")
+    return " ".join(lines)
+
+# ------- Circuit breaker -------
+class CircuitBreaker:
+    """
+    Opens after failure_threshold consecutive failures; after reset_timeout_s
+    one trial call is let through (half-open) and its outcome closes or reopens it.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout_s=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_s = reset_timeout_s
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at >= self.reset_timeout_s:
+                return "half-open"
+            return "open"
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at >= self.reset_timeout_s and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_flight = False
+        CIRCUIT_OPEN.set(0)
+
+    def record_abandoned(self):
+        """Call abandoned before any outcome (client went away): just release a half-open trial"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._opened_at is not None or self._failures >= self.failure_threshold:
+                self._opened_at = time.monotonic()
+        if self._opened_at is not None:
+            CIRCUIT_OPEN.set(1)
+
+# ------- Resilient explainer -------
+class ResilientExplainer:
+    """
+    Runs backend calls on a dedicated event loop thread with:
+      - at most max_concurrency calls in flight (semaphore)
+      - a per-call deadline (covers waiting for a slot and the call itself)
+      - a circuit breaker that answers from the template while the backend is failing
+    explain() returns (text, source) with source "llm" or "fallback";
+    stream() yields (source, text) chunks, with the deadline applied between chunks.
+    """
+
+    def __init__(self, backend, max_concurrency=8, timeout_s=10.0, breaker=None):
+        self.backend = backend
+        self.max_concurrency = max_concurrency
+        self.timeout_s = timeout_s
+        self.breaker = breaker or CircuitBreaker()
+        self._loop = None
+        self._semaphore = None
+        self._start_lock = threading.Lock()
+
+    def _ensure_loop(self):
+        with self._start_lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(target=loop.run_forever, name="explainer-loop", daemon=True).start()
+                self._semaphore = asyncio.run_coroutine_threadsafe(self._make_semaphore(), loop).result()
+                self._loop = loop
+        return self._loop
+
+    async def _make_semaphore(self):
+        return asyncio.Semaphore(self.max_concurrency)
+
+    def explain(self, prompt, fallback):
+        """Blocking call for sync code; fallback() builds the template text"""
+        future = asyncio.run_coroutine_threadsafe(self._explain(prompt, fallback), self._ensure_loop())
+        return future.result()
+
+    async def explain_async(self, prompt, fallback):
+        """Awaitable from any event loop (the call itself runs on the explainer loop)"""
+        future = asyncio.run_coroutine_threadsafe(self._explain(prompt, fallback), self._ensure_loop())
+        return await asyncio.wrap_future(future)
+
+    async def stream(self, prompt, fallback):
+        """Async iterator of (source, text) chunks usable from any event loop"""
+        loop = self._ensure_loop()
+        chunks = self._stream(prompt, fallback)
+        try:
+            while True:
+                future = asyncio.run_coroutine_threadsafe(_next_chunk(chunks), loop)
+                chunk = await asyncio.wrap_future(future)
+                if chunk is None:
+                    return
+                yield chunk
+        finally:
+            # Client went away mid-stream: close the backend stream and free its slot
+            asyncio.run_coroutine_threadsafe(chunks.aclose(), loop)
+
+    async def _stream(self, prompt, fallback):
+        if not self.breaker.allow():
+            FALLBACKS.inc(reason="circuit_open")
+            yield "fallback", fallback()
+            return
+        sent = False
+        acquired = False
+        chunks = None
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.timeout_s)
+            acquired = True
+            chunks = self.backend.stream(prompt)
+            while True:
+                chunk = await asyncio.wait_for(_next_chunk(chunks), self.timeout_s)
+                if chunk is None:
+                    break
+                sent = True
+                yield "llm", chunk
+        except Exception as e:
+            timed_out = isinstance(e, asyncio.TimeoutError) or "Timeout" in type(e).__name__
+            self.breaker.record_failure()
+            metrics.GROQ_ERRORS.inc(kind="timeout" if timed_out else "error")
+            FALLBACKS.inc(reason="timeout" if timed_out else "error")
+            # After a partial answer the template is appended rather than replacing it
+            yield "fallback", ("\n\n" if sent else "") + fallback()
+            return
+        except GeneratorExit:
+            if sent:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_abandoned()
+            raise
+        finally:
+            if chunks is not None:
+                await chunks.aclose()
+            if acquired:
+                self._semaphore.release()
+        self.breaker.record_success()
+
+    async def _explain(self, prompt, fallback):
+        if not self.breaker.allow():
+            FALLBACKS.inc(reason="circuit_open")
+            return fallback(), "fallback"
+        try:
+            text = await asyncio.wait_for(self._guarded(prompt), self.timeout_s)
+        except asyncio.TimeoutError:
+            self.breaker.record_failure()
+            metrics.GROQ_ERRORS.inc(kind="timeout")
+            FALLBACKS.inc(reason="timeout")
+            return fallback(), "fallback"
+        except Exception as e:
+            self.breaker.record_failure()
+            metrics.GROQ_ERRORS.inc(kind="timeout" if "Timeout" in type(e).__name__ else "error")
+            FALLBACKS.inc(reason="error")
+            return fallback(), "fallback"
+        self.breaker.record_success()
+        return text, "llm"
+
+    async def _guarded(self, prompt):
+        async with self._semaphore:
+            return await self.backend.complete(prompt)
+
+async def _next_chunk(chunks):
+    """Next item of an async iterator, or None once it is exhausted"""
+    try:
+        return await chunks.__anext__()
+    except StopAsyncIteration:
+        return None
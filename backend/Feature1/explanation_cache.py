@@ -0,0 +1,149 @@
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+from collections import OrderedDict
+
+from . import forksafe, metrics
+
+# Quantization step per input feature: inputs that round to the same steps share an explanation
+DEFAULT_RESOLUTIONS = {
+    "X": 10.0,
+    "Y": 10.0,
+    "Z": 5.0,
+    "Rock_Type_enc": 1,
+    "Ore_Grade (%)": 1.0,
+    "Tonnage": 50.0,
+    "Ore_Value (¥/tonne)": 1.0,
+    "Mining_Cost (¥)": 1.0,
+    "Processing_Cost (¥)": 1.0,
+}
+
+CACHE_LOOKUPS = metrics.registry.register(metrics.Counter(
+    "rockfall_explanation_cache_lookups_total", "Explanation cache lookups", ("result",)
+))
+CACHE_SAVED_SECONDS = metrics.registry.register(metrics.Counter(
+    "rockfall_explanation_cache_saved_seconds_total", "LLM latency avoided by explanation cache hits"
+))
+
+# ------- Content-addressed explanation cache -------
+class ExplanationCache:
+    """
+    LRU + TTL cache of LLM explanations keyed on (risk label, confidence bucket,
+    quantized input features), with an optional SQLite tier that survives restarts.
+    Memory is bounded by max_entries and by max_bytes of cached text.
+    """
+
+    def __init__(self, max_entries=10000, max_bytes=32 * 1024 * 1024, ttl_seconds=24 * 3600,
+                 confidence_bucket=0.05, resolutions=None, sqlite_path=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.confidence_bucket = confidence_bucket
+        self.resolutions = {**DEFAULT_RESOLUTIONS, **(resolutions or {})}
+        self._entries = OrderedDict()  # key -> (explanation, created_at, llm_seconds)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counts = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        self.sqlite_path = sqlite_path
+        self._db = None
+        if sqlite_path:
+            self._open_db()
+            forksafe.register(self, ExplanationCache._after_fork)
+
+    def _open_db(self):
+        self._db = sqlite3.connect(self.sqlite_path, check_same_thread=False)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS explanations ("
+            "key TEXT PRIMARY KEY, explanation TEXT NOT NULL, created_at REAL NOT NULL, llm_seconds REAL)"
+        )
+        self._db.commit()
+
+    def _after_fork(self):
+        # SQLite handles must not cross fork(): each child opens its own
+        self._lock = threading.Lock()
+        self._open_db()
+
+    def make_key(self, prediction_result, input_features):
+        """Stable hash of the risk label, confidence bucket and quantized features"""
+        quantized = {}
+        for name, step in sorted(self.resolutions.items()):
+            value = input_features.get(name)
+            if value is not None:
+                quantized[name] = round(float(value) / step) if step else float(value)
+        payload = {
+            "risk_label": prediction_result["risk_label"],
+            "confidence": int(prediction_result["confidence"] / self.confidence_bucket),
+            "features": quantized,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def get(self, key):
+        """Cached explanation text, or None"""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now - entry[1] <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._record_hit("memory_hits", entry[2])
+                    return entry[0]
+                self._remove(key)
+
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT explanation, created_at, llm_seconds FROM explanations WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[1] <= self.ttl_seconds:
+                    self._insert(key, row[0], row[1], row[2] or 0.0)
+                    self._record_hit("disk_hits", row[2] or 0.0)
+                    return row[0]
+
+            self._counts["misses"] += 1
+            CACHE_LOOKUPS.inc(result="miss")
+            return None
+
+    def put(self, key, explanation, llm_seconds=0.0):
+        now = time.time()
+        with self._lock:
+            self._insert(key, explanation, now, llm_seconds)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO explanations (key, explanation, created_at, llm_seconds) VALUES (?, ?, ?, ?)",
+                    (key, explanation, now, llm_seconds),
+                )
+                self._db.execute("DELETE FROM explanations WHERE created_at < ?", (now - self.ttl_seconds,))
+                self._db.commit()
+
+    def stats(self):
+        with self._lock:
+            hits = self._counts["memory_hits"] + self._counts["disk_hits"]
+            lookups = hits + self._counts["misses"]
+            return {
+                **self._counts,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "saved_llm_seconds": CACHE_SAVED_SECONDS.value(),
+                "sqlite": self._db is not None,
+            }
+
+    def _record_hit(self, kind, llm_seconds):
+        self._counts[kind] += 1
+        CACHE_LOOKUPS.inc(result=kind[:-1])  # memory_hit / disk_hit
+        CACHE_SAVED_SECONDS.inc(llm_seconds)
+
+    def _insert(self, key, explanation, created_at, llm_seconds):
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (explanation, created_at, llm_seconds)
+        self._bytes += len(explanation.encode())
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self._counts["evictions"] += 1
+
+    def _remove(self, key):
+        explanation, _, _ = self._entries.pop(key)
+        self._bytes -= len(explanation.encode())
@@ -0,0 +1,116 @@
+import numpy as np
+
+# ------- Request columns -> CNN inputs, per model version -------
+# A version's manifest records how its training data was prepared
+# (machineLearning/preprocessing.py): the feature columns in channel order, their
+# normalization mean/std, the X/Y bounds mapped onto the grid and the rock-type
+# encoding. FeatureSpec applies the same steps to request columns. Each field
+# falls back on its own to the original fixed layout below when a manifest lacks
+# it (e.g. the bare legacy weights file).
+
+# API rock-type codes: request Rock_Type names -> Rock_Type_enc
+ROCK_TYPE_ENCODING = {
+    "granite": 1,
+    "limestone": 2,
+    "sandstone": 3,
+    "shale": 4,
+    "quartzite": 5,
+    "slate": 6,
+    "marble": 7,
+    "basalt": 8,
+    "andesite": 9,
+    "other": 0
+}
+ROCK_TYPE_NAMES = {code: name for name, code in ROCK_TYPE_ENCODING.items()}
+
+# Input keys the fixed layout is built from, and the extra columns a manifest may name
+FEATURE_INPUT_KEYS = ('X', 'Y', 'Z', 'Rock_Type_enc', 'Ore_Grade (%)', 'Ore_Value (¥/tonne)', 'Tonnage')
+OPTIONAL_INPUT_KEYS = ('Mining_Cost (¥)', 'Processing_Cost (¥)')
+INPUT_KEYS = FEATURE_INPUT_KEYS + OPTIONAL_INPUT_KEYS
+
+# Fixed layout: X, Y, Z, rock type, ore grade, ore value x tonnage, divided by these
+LEGACY_SCALES = np.array([1000.0, 1000.0, 200.0, 10.0, 100.0, 100000.0])
+# Fixed grid mapping: X/Y in [0, LEGACY_EXTENT] metres
+LEGACY_EXTENT = 1000.0
+
+class FeatureSpec:
+    """
+    Preprocessing for one model version, read from its manifest.
+    `columns` lists the input keys the version needs: X/Y for the grid plus the
+    manifest features (FEATURE_INPUT_KEYS for the fixed layout). vectors() rejects
+    input missing any of them rather than guessing a value.
+    """
+
+    def __init__(self, manifest, grid_size=64):
+        self.version = manifest.get("version")
+        self.grid_size = manifest.get("grid_size", grid_size)
+        self.bounds = manifest.get("bounds")
+        normalization = manifest.get("normalization") or {}
+        self.features = manifest.get("features") if normalization.get("mean") and normalization.get("std") else None
+        if self.features is not None:
+            unknown = [name for name in self.features if name not in INPUT_KEYS]
+            if unknown:
+                raise ValueError(f"Model version {manifest.get('version')}: no request column for features {unknown}")
+            self.mean = np.array([float(normalization["mean"][name]) for name in self.features])
+            std = np.array([float(normalization["std"][name]) for name in self.features])
+            self.std = np.where(std > 0, std, 1.0)
+            self.columns = tuple(dict.fromkeys(("X", "Y", *self.features)))
+        else:
+            self.columns = FEATURE_INPUT_KEYS
+        # API code -> the version's code (NaN for rock types it was not trained on)
+        encoding = manifest.get("rock_type_encoding")
+        self.rock_codes = None
+        if encoding:
+            encoding = {str(name).strip().lower(): code for name, code in encoding.items()}
+            self.rock_codes = np.full(max(ROCK_TYPE_NAMES) + 1, np.nan)
+            for code, name in ROCK_TYPE_NAMES.items():
+                self.rock_codes[code] = encoding.get(name, np.nan)
+
+    def rock_type_codes(self, api_codes):
+        """API Rock_Type_enc values -> the codes this version was trained with (NaN if unknown)"""
+        api_codes = np.asarray(api_codes, dtype=np.float64)
+        if self.rock_codes is None:
+            return api_codes
+        index = np.nan_to_num(api_codes, nan=-1).astype(np.int64)
+        known = (index >= 0) & (index < len(self.rock_codes))
+        return np.where(known, self.rock_codes[np.clip(index, 0, len(self.rock_codes) - 1)], np.nan)
+
+    def vectors(self, columns):
+        """
+        columns: dict of equal-length arrays keyed like the input dicts (INPUT_KEYS)
+        Returns: float32 array [N, channels] with the per-channel fill values
+        Raises ValueError naming the columns in self.columns that are missing.
+        """
+        missing = [key for key in self.columns if key not in columns]
+        if missing:
+            raise ValueError(f"Model version {self.version} needs columns {missing}")
+        col = {key: np.asarray(columns[key], dtype=np.float64) for key in self.columns}
+        if 'Rock_Type_enc' in col:
+            col['Rock_Type_enc'] = self.rock_type_codes(col['Rock_Type_enc'])
+        if self.features is None:
+            raw = np.stack([
+                col['X'],                                       # Channel 0: X coordinate
+                col['Y'],                                       # Channel 1: Y coordinate
+                col['Z'],                                       # Channel 2: Z elevation
+                col['Rock_Type_enc'],                           # Channel 3: Rock type
+                col['Ore_Grade (%)'],                           # Channel 4: Ore grade
+                col['Ore_Value (¥/tonne)'] * col['Tonnage'],    # Channel 5: Combined economic factors
+            ], axis=1).reshape(-1, len(LEGACY_SCALES))
+            return np.nan_to_num(raw / LEGACY_SCALES).astype(np.float32)
+        n = len(col['X'])
+        raw = np.stack([col[name] for name in self.features], axis=1).reshape(n, -1)
+        # z-scores as in training; unknown rock types sit at the mean
+        return np.nan_to_num((raw - self.mean) / self.std).astype(np.float32)
+
+    def grid_indices(self, x, y):
+        """X/Y -> (grid_x, grid_y) cell indices, clipped to the grid"""
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        if self.bounds is None:
+            x_min, y_min, x_span, y_span = 0.0, 0.0, LEGACY_EXTENT, LEGACY_EXTENT
+        else:
+            x_min, y_min = self.bounds["x_min"], self.bounds["y_min"]
+            x_span = (self.bounds["x_max"] - x_min) or 1.0
+            y_span = (self.bounds["y_max"] - y_min) or 1.0
+        grid_x = ((x - x_min) / x_span * (self.grid_size - 1)).astype(np.int64)
+        grid_y = ((y - y_min) / y_span * (self.grid_size - 1)).astype(np.int64)
+        return np.clip(grid_x, 0, self.grid_size - 1), np.clip(grid_y, 0, self.grid_size - 1)
@@ -0,0 +1,24 @@
+import os
+import weakref
+
+# ------- Fork safety -------
+# A forked worker (serve.py) inherits objects but not their threads, and must not
+# reuse their SQLite handles. Objects that own either register a restart hook
+# here; it runs in the child right after fork() for every object still alive.
+
+_hooks = weakref.WeakKeyDictionary()  # object -> restart(object)
+
+def register(obj, restart):
+    """
+    Call restart(obj) in every child forked while obj is alive.
+    restart must not hold a reference to obj (pass Class._method, not self._method),
+    or obj is never collected.
+    """
+    _hooks[obj] = restart
+
+def _after_fork_in_child():
+    for obj, restart in list(_hooks.items()):
+        restart(obj)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork_in_child)
@@ -0,0 +1,252 @@
+import math
+import time
+import queue
+import sqlite3
+import threading
+
+from . import forksafe, metrics
+
+# ------- Assessment history -------
+# Scored assessments in SQLite (WAL mode): one row per assessment, plus an R-tree
+# on X/Y kept in sync by triggers. record() only queues the row; a background
+# writer inserts whatever has queued up in one transaction, so requests never
+# wait on the disk. Queries use one read connection per thread, which WAL lets
+# run next to the writer.
+
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS assessments ("
+    "id INTEGER PRIMARY KEY, created_at REAL NOT NULL, "
+    "x REAL NOT NULL, y REAL NOT NULL, z REAL, rock_type TEXT, ore_grade REAL, tonnage REAL, "
+    "risk_label TEXT NOT NULL, confidence REAL NOT NULL, "
+    "explanation TEXT, explanation_source TEXT, model_version TEXT)",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS assessments_xy USING rtree(id, min_x, max_x, min_y, max_y)",
+    "CREATE TRIGGER IF NOT EXISTS assessments_xy_insert AFTER INSERT ON assessments BEGIN "
+    "INSERT INTO assessments_xy VALUES (new.id, new.x, new.x, new.y, new.y); END",
+    "CREATE TRIGGER IF NOT EXISTS assessments_xy_delete AFTER DELETE ON assessments BEGIN "
+    "DELETE FROM assessments_xy WHERE id = old.id; END",
+    # Bounding box of everything written (never shrinks); bounds nearest-neighbour searches
+    "CREATE TABLE IF NOT EXISTS assessments_extent ("
+    "id INTEGER PRIMARY KEY CHECK (id = 1), min_x REAL, max_x REAL, min_y REAL, max_y REAL)",
+    # Exact row count, kept by triggers (max(id) overcounts once rows are deleted)
+    "CREATE TABLE IF NOT EXISTS assessments_count (id INTEGER PRIMARY KEY CHECK (id = 1), n INTEGER NOT NULL)",
+    "INSERT OR IGNORE INTO assessments_count SELECT 1, count(*) FROM assessments",
+    "CREATE TRIGGER IF NOT EXISTS assessments_count_insert AFTER INSERT ON assessments BEGIN "
+    "UPDATE assessments_count SET n = n + 1 WHERE id = 1; END",
+    "CREATE TRIGGER IF NOT EXISTS assessments_count_delete AFTER DELETE ON assessments BEGIN "
+    "UPDATE assessments_count SET n = n - 1 WHERE id = 1; END",
+)
+COLUMNS = (
+    "created_at", "x", "y", "z", "rock_type", "ore_grade", "tonnage",
+    "risk_label", "confidence", "explanation", "explanation_source", "model_version",
+)
+SELECT = "SELECT a.id, " + ", ".join("a." + c for c in COLUMNS)
+
+# Nearest-neighbour search: the search circle is covered by this many R-tree boxes
+CIRCLE_STRIPS = 16
+
+HISTORY_ROWS = metrics.registry.register(metrics.Counter(
+    "rockfall_history_rows_total", "Assessments handed to the history writer", ("outcome",)
+))
+
+class AssessmentHistory:
+    """
+    Persistent, spatially indexed log of scored assessments.
+    max_queue: rows waiting for the writer; beyond it record() drops rows rather than block
+    max_batch: rows per write transaction
+    """
+
+    def __init__(self, path, max_queue=100000, max_batch=1000):
+        self.path = path
+        self.max_batch = max_batch
+        self._max_queue = max_queue
+        db = self._connect()
+        db.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            db.execute(statement)
+        db.commit()
+        db.close()
+        self._start_writer()
+        forksafe.register(self, AssessmentHistory._after_fork)
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    def _start_writer(self):
+        self._queue = queue.Queue(self._max_queue)
+        self._local = threading.local()
+        self._closed = False
+        self._writer = threading.Thread(target=self._loop, name="history-writer", daemon=True)
+        self._writer.start()
+
+    def _after_fork(self):
+        # The child inherits neither the writer thread nor usable connections
+        if not self._closed:
+            self._start_writer()
+
+    def record(self, x, y, z, rock_type, ore_grade, tonnage, risk_label, confidence,
+               explanation=None, explanation_source=None, model_version=None):
+        """Queue one assessment for writing; never blocks"""
+        if self._closed:
+            return
+        row = (time.time(), float(x), float(y), float(z), rock_type, ore_grade, tonnage,
+               risk_label, float(confidence), explanation, explanation_source, model_version)
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            HISTORY_ROWS.inc(outcome="dropped")
+
+    def flush(self):
+        """Block until everything queued so far is written"""
+        self._queue.join()
+
+    def close(self):
+        """Write what is queued and stop the writer"""
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._writer.join()
+
+    def recent(self, limit=50):
+        """Most recently written assessments, newest first"""
+        return self._rows(f"{SELECT} FROM assessments a ORDER BY a.id DESC LIMIT ?", (limit,))
+
+    def bbox(self, x_min, y_min, x_max, y_max, limit=1000):
+        """
+        Assessments with x_min <= X <= x_max and y_min <= Y <= y_max, in index order.
+        Returns (rows, truncated) where truncated means more than `limit` matched.
+        """
+        rows = self._rows(
+            f"{SELECT} FROM assessments_xy r JOIN assessments a ON a.id = r.id "
+            "WHERE r.max_x >= ? AND r.min_x <= ? AND r.max_y >= ? AND r.min_y <= ? "
+            # The R-tree stores float32 boxes; recheck against the exact coordinates
+            "AND a.x BETWEEN ? AND ? AND a.y BETWEEN ? AND ? LIMIT ?",
+            (x_min, x_max, y_min, y_max, x_min, x_max, y_min, y_max, limit + 1),
+        )
+        return rows[:limit], len(rows) > limit
+
+    def nearest(self, x, y, n=10):
+        """
+        The n assessments closest to (x, y) in the X/Y plane, nearest first, each
+        with its distance. Grows a search circle until it holds n assessments,
+        narrows it until it holds only a few more, then sorts just those.
+        """
+        db = self._db()
+        total = self._count(db)
+        extent = db.execute("SELECT min_x, max_x, min_y, max_y FROM assessments_extent").fetchone()
+        if total == 0 or extent is None:
+            return []
+        min_x, max_x, min_y, max_y = extent
+        # Distance from (x, y) to the extent, and a circle radius that covers all of it
+        gap = math.hypot(max(min_x - x, 0.0, x - max_x), max(min_y - y, 0.0, y - max_y))
+        reach = math.hypot(max(x - min_x, max_x - x), max(y - min_y, max_y - y))
+        # Start where a uniform spread of `total` points over the extent would put n of them
+        area = max((max_x - min_x) * (max_y - min_y), 1.0)
+        step = max(1.0, math.sqrt(n * area / (math.pi * total)))
+        cap = max(4 * n, 64)
+
+        low, high = gap, gap + step
+        while high < reach and self._count_within(x, y, high, extent, n) < n:
+            low, step = high, step * 2
+            high = gap + step
+        for _ in range(32):
+            if self._count_within(x, y, high, extent, cap) < cap:
+                break
+            middle = (low + high) / 2
+            if self._count_within(x, y, middle, extent, n) >= n:
+                high = middle
+            else:
+                low = middle
+        sql, params = self._circle(x, y, high, extent)
+        rows = self._rows(f"SELECT * FROM ({sql}) WHERE d2 <= ? ORDER BY d2 LIMIT ?", (*params, high * high, n))
+        for row in rows:
+            row["distance"] = math.sqrt(row.pop("d2"))
+        return rows
+
+    def _count_within(self, x, y, radius, extent, limit):
+        """Assessments within radius of (x, y), counting no further than limit"""
+        sql, params = self._circle(x, y, radius, extent)
+        return self._db().execute(
+            f"SELECT count(*) FROM (SELECT 1 FROM ({sql}) WHERE d2 <= ? LIMIT ?)", (*params, radius * radius, limit)
+        ).fetchone()[0]
+
+    def _circle(self, x, y, radius, extent):
+        """
+        Query for the assessments in CIRCLE_STRIPS horizontal R-tree boxes that cover
+        the part of the circle inside the extent, with their squared distance d2.
+        One bounding square would take in far more of the site whenever the point
+        lies off to the side of it.
+        """
+        _, _, min_y, max_y = extent
+        bottom, top = max(y - radius, min_y), min(y + radius, max_y)
+        height = max(top - bottom, 0.0) / CIRCLE_STRIPS
+        parts, params = [], []
+        for i in range(CIRCLE_STRIPS):
+            # The last strip ends exactly at top: bottom + 16 * height can round below it
+            y0, y1 = bottom + i * height, top if i == CIRCLE_STRIPS - 1 else bottom + (i + 1) * height
+            dy = 0.0 if y0 <= y <= y1 else min(abs(y0 - y), abs(y1 - y))
+            half_width = math.sqrt(max(radius * radius - dy * dy, 0.0))
+            # Strips are half-open on the exact Y so no assessment is counted twice
+            parts.append(
+                f"{SELECT}, (a.x - ?) * (a.x - ?) + (a.y - ?) * (a.y - ?) AS d2 "
+                "FROM assessments_xy r JOIN assessments a ON a.id = r.id "
+                "WHERE r.max_x >= ? AND r.min_x <= ? AND r.max_y >= ? AND r.min_y <= ? "
+                f"AND a.y >= ? AND a.y {'<=' if i == CIRCLE_STRIPS - 1 else '<'} ?"
+            )
+            params += [x, x, y, y, x - half_width, x + half_width, y0, y1, y0, y1]
+        return " UNION ALL ".join(parts), params
+
+    def _count(self, db):
+        return db.execute("SELECT n FROM assessments_count").fetchone()[0]
+
+    def stats(self):
+        return {
+            "rows": self._count(self._db()),
+            "queued": self._queue.qsize(),
+            **{outcome: HISTORY_ROWS.value(outcome=outcome) for outcome in ("written", "dropped", "failed")},
+            "path": self.path,
+        }
+
+    def _db(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = self._connect()
+        return db
+
+    def _rows(self, sql, params):
+        cursor = self._db().execute(sql, params)
+        names = [d[0] for d in cursor.description]
+        return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+    def _loop(self):
+        db = self._connect()
+        insert = f"INSERT INTO assessments ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})"
+        while True:
+            # Take whatever queued up while the previous batch was being written
+            batch = [self._queue.get()]
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            rows = [row for row in batch if row is not None]
+            if rows:
+                try:
+                    with db:
+                        db.executemany(insert, rows)
+                        db.execute(
+                            "INSERT INTO assessments_extent VALUES (1, ?, ?, ?, ?) ON CONFLICT (id) DO UPDATE SET "
+                            "min_x = min(min_x, excluded.min_x), max_x = max(max_x, excluded.max_x), "
+                            "min_y = min(min_y, excluded.min_y), max_y = max(max_y, excluded.max_y)",
+                            (min(r[1] for r in rows), max(r[1] for r in rows),
+                             min(r[2] for r in rows), max(r[2] for r in rows)),
+                        )
+                    HISTORY_ROWS.inc(len(rows), outcome="written")
+                except sqlite3.Error:
+                    HISTORY_ROWS.inc(len(rows), outcome="failed")
+            for _ in batch:
+                self._queue.task_done()
+            if batch[-1] is None:
+                db.close()
+                return
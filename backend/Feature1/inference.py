@@ -0,0 +1,167 @@
+import copy
+import warnings
+
+import numpy as np
+import torch
+
+from .pointeval import fold_conv_bn
+
+# Full-grid inference engines for SimpleCNN
+#   eager  : the training model as-is (fp32, separate BatchNorm, both heads)
+#   fused  : BatchNorm folded into the convs, softmax-only head
+#   script : fused, traced and frozen TorchScript graph
+#   bf16   : fused, weights and activations in bfloat16
+#   int8   : fused, static post-training int8 quantization (calibrated)
+ENGINE_MODES = ("eager", "fused", "script", "bf16", "int8")
+
+class FusedSimpleCNN(torch.nn.Module):
+    """
+    Serving form of SimpleCNN: BatchNorm folded into conv1/conv2 and a head that
+    returns only softmax probabilities. The quant/dequant stubs are no-ops
+    unless the module is quantized.
+    """
+
+    def __init__(self, model):
+        super(FusedSimpleCNN, self).__init__()
+        model = model.cpu().eval()
+        self.quant = torch.ao.quantization.QuantStub()
+        self.conv1 = _folded_conv(model.conv1, model.bn1)
+        self.relu1 = torch.nn.ReLU()
+        self.conv2 = _folded_conv(model.conv2, model.bn2)
+        self.relu2 = torch.nn.ReLU()
+        self.conv3 = copy.deepcopy(model.conv3)
+        self.dequant = torch.ao.quantization.DeQuantStub()
+        self.eval()
+
+    def forward(self, x):
+        x = self.quant(x)
+        x = self.relu1(self.conv1(x))
+        x = self.relu2(self.conv2(x))
+        x = self.dequant(self.conv3(x))
+        return torch.softmax(x, dim=1)
+
+class _ProbabilitiesOnly(torch.nn.Module):
+    """Eager SimpleCNN returning only the softmax output"""
+
+    def __init__(self, model):
+        super(_ProbabilitiesOnly, self).__init__()
+        self.model = model
+
+    def forward(self, x):
+        return self.model(x)[1]
+
+class _CastInputs(torch.nn.Module):
+    """Runs a module in another dtype; inputs and outputs stay float32"""
+
+    def __init__(self, module, dtype):
+        super(_CastInputs, self).__init__()
+        self.module = module.to(dtype)
+        self.dtype = dtype
+
+    def forward(self, x):
+        return self.module(x.to(self.dtype)).float()
+
+def _folded_conv(conv, bn):
+    weight, bias = fold_conv_bn(conv, bn)
+    folded = torch.nn.Conv2d(
+        conv.in_channels, conv.out_channels, conv.kernel_size, stride=conv.stride, padding=conv.padding
+    )
+    with torch.no_grad():
+        folded.weight.copy_(torch.from_numpy(weight))
+        folded.bias.copy_(torch.from_numpy(bias))
+    return folded
+
+def reference_grids(count=64, channels=6, grid_size=64, seed=0):
+    """
+    Reference inputs for parity checks and int8 calibration: half constant-fill
+    grids like the API builds (values in the normalized feature range), half
+    noisy survey-like grids.
+    """
+    rng = np.random.default_rng(seed)
+    constant = rng.uniform(0.0, 1.5, size=(count - count // 2, channels, 1, 1)).astype(np.float32)
+    constant = np.broadcast_to(constant, (len(constant), channels, grid_size, grid_size))
+    noisy = rng.uniform(0.0, 1.5, size=(count // 2, channels, 1, 1)) + rng.normal(
+        0.0, 0.25, size=(count // 2, channels, grid_size, grid_size)
+    )
+    return torch.from_numpy(np.concatenate([constant, noisy.astype(np.float32)]))
+
+def quantize_int8(fused, calibration, backend=None):
+    """Static post-training quantization of a FusedSimpleCNN, calibrated on `calibration` grids"""
+    backend = backend or ("x86" if "x86" in torch.backends.quantized.supported_engines else "qnnpack")
+    # The engine is process-wide; only switch it while observing and converting
+    previous = torch.backends.quantized.engine
+    torch.backends.quantized.engine = backend
+    try:
+        quantized = copy.deepcopy(fused).eval()
+        # Newer torch releases point eager-mode quantization at torchao; the API still works
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            torch.ao.quantization.fuse_modules(quantized, [["conv1", "relu1"], ["conv2", "relu2"]], inplace=True)
+            quantized.qconfig = torch.ao.quantization.get_default_qconfig(backend)
+            torch.ao.quantization.prepare(quantized, inplace=True)
+            with torch.no_grad():
+                for batch in torch.split(calibration, 16):
+                    quantized(batch)
+            torch.ao.quantization.convert(quantized, inplace=True)
+    finally:
+        torch.backends.quantized.engine = previous
+    return quantized
+
+def build_engine(model, mode="fused", calibration=None, example_batch=8, grid_size=64):
+    """
+    Returns a module mapping float32 [N, C, H, W] grids to float32 [N, classes, H, W]
+    softmax probabilities, built from a trained SimpleCNN.
+    """
+    if mode not in ENGINE_MODES:
+        raise ValueError(f"Unknown engine {mode!r}, expected one of {ENGINE_MODES}")
+    model = model.cpu().eval()
+    if mode == "eager":
+        return _ProbabilitiesOnly(model).eval()
+
+    fused = FusedSimpleCNN(model)
+    if mode == "fused":
+        return fused
+    if mode == "bf16":
+        return _CastInputs(fused, torch.bfloat16).eval()
+    if mode == "int8":
+        if calibration is None:
+            calibration = reference_grids(channels=model.conv1.in_channels, grid_size=grid_size, seed=1)
+        return quantize_int8(fused, calibration)
+
+    example = torch.zeros(example_batch, model.conv1.in_channels, grid_size, grid_size)
+    with torch.no_grad():
+        traced = torch.jit.trace(fused, example)
+    return torch.jit.optimize_for_inference(torch.jit.freeze(traced.eval()))
+
+def check_parity(model, engine, grids=None):
+    """
+    Compare an engine with the fp32 eager model on reference grids.
+    Returns max/mean absolute probability difference and the share of cells
+    whose predicted class agrees.
+    """
+    grids = reference_grids(channels=model.conv1.in_channels) if grids is None else grids
+    model = model.cpu().eval()
+    with torch.no_grad():
+        expected = model(grids)[1]
+        actual = engine(grids)
+    diff = (expected - actual).abs()
+    return {
+        "max_abs_diff": float(diff.max()),
+        "mean_abs_diff": float(diff.mean()),
+        "label_agreement": float((expected.argmax(dim=1) == actual.argmax(dim=1)).float().mean()),
+    }
+
+# Accuracy budget per engine (max |p - p_eager|); int8/bf16 trade exactness for speed
+PARITY_TOLERANCE = {"eager": 0.0, "fused": 1e-5, "script": 1e-5, "bf16": 5e-2, "int8": 5e-2}
+
+if __name__ == "__main__":
+    # Run from backend/: python -m Feature1.inference
+    from .logic import model
+
+    for mode in ENGINE_MODES:
+        parity = check_parity(model, build_engine(model, mode))
+        print(
+            f"{mode:>6}: max |diff| {parity['max_abs_diff']:.2e}  mean {parity['mean_abs_diff']:.2e}  "
+            f"label agreement {parity['label_agreement']:.4%}"
+        )
+        assert parity["max_abs_diff"] <= PARITY_TOLERANCE[mode], f"{mode} engine exceeds its accuracy budget"
@@ -0,0 +1,92 @@
+import time
+import uuid
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# ------- Background explanation jobs -------
+class JobQueueFull(RuntimeError):
+    """max_pending explanations are already queued or running"""
+
+class ExplanationJobs:
+    """
+    Runs explanation calls on a worker pool so predictions can return immediately.
+    explain_fn: callable(prediction_result, input_features) -> explanation dict
+    max_jobs: number of job records kept in memory (oldest finished jobs are dropped)
+    max_pending: jobs queued or running at once; submit() raises JobQueueFull beyond it
+    ttl_seconds: finished jobs older than this are dropped
+    """
+
+    def __init__(self, explain_fn, max_workers=4, max_jobs=10000, max_pending=1000, ttl_seconds=3600):
+        self.explain_fn = explain_fn
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="explain")
+        self._jobs = OrderedDict()
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def submit(self, prediction_result, input_features):
+        """Queue an explanation and return its job id (JobQueueFull if max_pending are unfinished)"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise JobQueueFull(f"{self._pending} explanations are already pending")
+            self._pending += 1
+            self._evict()
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "pending",
+                "created_at": time.time(),
+                "completed_at": None,
+                "result": None,
+                "error": None,
+            }
+        self._executor.submit(self._run, job_id, dict(prediction_result), dict(input_features))
+        return job_id
+
+    def get(self, job_id):
+        """Return a copy of the job record, or None for unknown/expired ids"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def pending(self):
+        """Jobs queued or running"""
+        with self._lock:
+            return self._pending
+
+    def shutdown(self, wait=False):
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, job_id, prediction_result, input_features):
+        self._update(job_id, status="running")
+        try:
+            result = self.explain_fn(prediction_result, input_features)
+            self._update(job_id, finished=True, status="completed", result=result, completed_at=time.time())
+        except Exception as e:
+            self._update(job_id, finished=True, status="failed", error=str(e), completed_at=time.time())
+
+    def _update(self, job_id, finished=False, **fields):
+        with self._lock:
+            if finished:
+                self._pending -= 1
+            job = self._jobs.get(job_id)
+            if job is not None:
+                job.update(fields)
+
+    def _evict(self):
+        # Called with the lock held; only finished jobs are ever dropped
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["completed_at"] is not None and now - job["completed_at"] > self.ttl_seconds
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+        if len(self._jobs) >= self.max_jobs:
+            for job_id in [j for j, job in self._jobs.items() if job["completed_at"] is not None]:
+                del self._jobs[job_id]
+                if len(self._jobs) < self.max_jobs:
+                    break
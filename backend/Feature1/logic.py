@@ -1,41 +1,232 @@
 import os
 import json
-import torch
+import time
+import threading
 import numpy as np
 from dotenv import load_dotenv
-from groq import Groq
+from . import metrics
+from .explainers import GroqBackend, StubBackend, CircuitBreaker, ResilientExplainer, template_explanation
+from .batching import MicroBatcher
+from .registry import ModelRegistry, UncertaintyUnavailable
+from .features import INPUT_KEYS
+from .explanation_cache import ExplanationCache
 
 # Load environment vars
 load_dotenv()
 
-# Groq client for explanations only
-client = Groq(api_key=os.environ.get("GROQ_API_KEY"))
-
-# Load local PyTorch rockfall model
-MODEL_PATH = "rockfall_model.pt"
-
-class SimpleCNN(torch.nn.Module):
-    def __init__(self, in_channels):
-        super(SimpleCNN, self).__init__()
-        self.conv1 = torch.nn.Conv2d(in_channels, 16, 3, padding=1)
-        self.bn1 = torch.nn.BatchNorm2d(16)
-        self.conv2 = torch.nn.Conv2d(16, 32, 3, padding=1)
-        self.bn2 = torch.nn.BatchNorm2d(32)
-        self.conv3 = torch.nn.Conv2d(32, 2, 1)
-        self.logsoftmax = torch.nn.LogSoftmax(dim=1)
-        self.softmax = torch.nn.Softmax(dim=1)
-
-    def forward(self, x):
-        x = torch.relu(self.bn1(self.conv1(x)))
-        x = torch.relu(self.bn2(self.conv2(x)))
-        out = self.conv3(x)
-        return self.logsoftmax(out), self.softmax(out)
-
-# Initialize and load model
-device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model = SimpleCNN(in_channels=6)
-model.load_state_dict(torch.load(MODEL_PATH, map_location=device))
-model.eval()
+# Groq backend for explanations only (GROQ_STUB=1 uses a local stub, no network;
+# GROQ_BASE_URL points at another OpenAI-compatible server, e.g. a local fake)
+if os.environ.get("GROQ_STUB"):
+    explanation_backend = StubBackend(latency_s=float(os.environ.get("GROQ_STUB_LATENCY", "0")))
+else:
+    explanation_backend = GroqBackend(
+        api_key=os.environ.get("GROQ_API_KEY"),
+        base_url=os.environ.get("GROQ_BASE_URL"),
+        max_connections=int(os.environ.get("GROQ_MAX_CONCURRENCY", "8")),
+    )
+
+# Concurrency limit, per-call deadline and circuit breaker around the LLM;
+# while it is slow or failing, explanations come from a local template instead
+explainer = ResilientExplainer(
+    explanation_backend,
+    max_concurrency=int(os.environ.get("GROQ_MAX_CONCURRENCY", "8")),
+    timeout_s=float(os.environ.get("GROQ_TIMEOUT_S", "10")),
+    breaker=CircuitBreaker(
+        failure_threshold=int(os.environ.get("GROQ_BREAKER_FAILURES", "5")),
+        reset_timeout_s=float(os.environ.get("GROQ_BREAKER_RESET_S", "30")),
+    ),
+)
+
+# Cache of LLM explanations for repeated / near-identical requests
+# (ROCKFALL_EXPLANATION_CACHE=0 disables it, *_SQLITE adds a persistent tier)
+if os.environ.get("ROCKFALL_EXPLANATION_CACHE", "1") == "1":
+    explanation_cache = ExplanationCache(
+        max_entries=int(os.environ.get("ROCKFALL_EXPLANATION_CACHE_SIZE", "10000")),
+        ttl_seconds=float(os.environ.get("ROCKFALL_EXPLANATION_CACHE_TTL", "86400")),
+        confidence_bucket=float(os.environ.get("ROCKFALL_EXPLANATION_CACHE_CONFIDENCE_BUCKET", "0.05")),
+        resolutions=json.loads(os.environ.get("ROCKFALL_EXPLANATION_CACHE_RESOLUTIONS", "{}")),
+        sqlite_path=os.environ.get("ROCKFALL_EXPLANATION_CACHE_SQLITE"),
+    )
+else:
+    explanation_cache = None
+
+# Local PyTorch rockfall model: the version CURRENT points at in the model registry,
+# else the bare weights file (both next to app.py unless overridden)
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.environ.get("ROCKFALL_MODEL_PATH", os.path.join(BACKEND_DIR, "rockfall_model.pt"))
+MODEL_REGISTRY_DIR = os.environ.get("ROCKFALL_MODEL_REGISTRY", os.path.join(BACKEND_DIR, "models"))
+
+# Seconds between checks of the registry's CURRENT pointer (0 = only reload on request)
+MODEL_WATCH_S = float(os.environ.get("ROCKFALL_MODEL_WATCH_S", "0"))
+
+# Grid layout shared by single and batched inference
+CHANNELS = 6
+GRID_SIZE = 64
+CLASS_LABELS = {0: "Safe", 1: "Risk"}
+RISK_CLASS = 1
+
+# Upper bound on blocks per forward pass (keeps [N, 6, 64, 64] activations in memory)
+BATCH_CHUNK_SIZE = 128
+
+# "point" evaluates only the receptive field of the requested cell,
+# "full" runs the whole 64x64 grid through the CNN
+INFERENCE_MODE = os.environ.get("ROCKFALL_INFERENCE_MODE", "point")
+
+# Engine for the full forward pass: eager, fused, script, bf16 or int8 (see inference.py)
+INFERENCE_ENGINE = os.environ.get("ROCKFALL_INFERENCE_ENGINE", "fused")
+
+# Coalesce concurrent single-block predictions into one forward pass
+# (max batch size 0 disables the scheduler)
+MICROBATCH_MAX_SIZE = int(os.environ.get("ROCKFALL_MICROBATCH_MAX_SIZE", "0"))
+MICROBATCH_MAX_WAIT_US = int(os.environ.get("ROCKFALL_MICROBATCH_MAX_WAIT_US", "1000"))
+MICROBATCH_TIMEOUT_S = float(os.environ.get("ROCKFALL_MICROBATCH_TIMEOUT_S", "30"))
+
+# Batch sizes given a dummy forward pass after loading, so the first real requests
+# don't pay for allocator growth and kernel selection
+WARMUP_BATCH_SIZES = [
+    int(n) for n in os.environ.get("ROCKFALL_WARMUP_BATCH_SIZES", "1,8,32,128").split(",") if n.strip()
+]
+
+# Uncertainty mode (uncertainty=true): the version's ensemble members, or K MC-dropout
+# passes at the rate its weights were trained with, in one batched pass; the interval
+# is the central UNCERTAINTY_INTERVAL share of the K risk probabilities (see uncertainty.py).
+# Versions with neither refuse the request (409) rather than report noise.
+UNCERTAINTY_SAMPLES = int(os.environ.get("ROCKFALL_UNCERTAINTY_SAMPLES", "32"))
+UNCERTAINTY_INTERVAL = float(os.environ.get("ROCKFALL_UNCERTAINTY_INTERVAL", "0.9"))
+
+# How long a request waits for a model that is still loading before failing with 503
+MODEL_WAIT_S = float(os.environ.get("ROCKFALL_MODEL_WAIT_S", "30"))
+
+# ------- Model loading (torch is imported here, not at module import) -------
+# Requests pin the active model version with registry.acquire(); reload_model()
+# loads and warms a new version next to it and swaps it in atomically.
+# logic.model / point_evaluator / device / full_engine resolve to the active version.
+class ModelNotReady(RuntimeError):
+    """The model is still loading (or failed to load)"""
+
+registry = ModelRegistry(
+    MODEL_REGISTRY_DIR,
+    legacy_path=MODEL_PATH,
+    inference_mode=INFERENCE_MODE,
+    engine=INFERENCE_ENGINE,
+    defaults={"channels": CHANNELS, "grid_size": GRID_SIZE, "class_labels": {str(k): v for k, v in CLASS_LABELS.items()}},
+    uncertainty={"samples": UNCERTAINTY_SAMPLES},
+)
+
+model_status = {"state": "not_loaded", "error": None, "load_seconds": None, "warmup_seconds": None, "version": None}
+_model_loaded = threading.Event()
+_load_lock = threading.Lock()
+
+def load_model(warmup=True):
+    """
+    Import torch and load the active version (weights + manifest), idempotent.
+    warmup=True also runs warmup_model, which builds the version's engines; the
+    prefork master passes False so that nothing runs before fork().
+    """
+    with _load_lock:
+        if not _model_loaded.is_set():
+            model_status["state"] = "loading"
+            started = time.perf_counter()
+            try:
+                registry.reload()
+            except Exception as e:
+                model_status.update(state="failed", error=f"{type(e).__name__}: {e}")
+                raise
+            model_status.update(
+                state="loaded", error=None, load_seconds=time.perf_counter() - started,
+                version=registry.current.version,
+            )
+            _model_loaded.set()
+    if warmup and model_status["warmup_seconds"] is None:
+        started = time.perf_counter()
+        try:
+            warmup_model(registry.current)
+        except Exception as e:
+            model_status.update(state="failed", error=f"Warmup failed: {type(e).__name__}: {e}")
+            raise
+        model_status.update(state="ready", error=None, warmup_seconds=time.perf_counter() - started)
+
+def warmup_model(version, batch_sizes=None):
+    """Dummy forward pass at each expected batch size"""
+    for n in batch_sizes or WARMUP_BATCH_SIZES:
+        vectors = np.full((n, version.model.conv1.in_channels), 0.5, dtype=np.float32)
+        cells = np.full(n, version.features.grid_size // 2, dtype=np.int64)
+        for _ in range(2):  # traced engines optimize on their second run
+            predict_probabilities(vectors, cells, cells, version)
+
+def reload_model(version=None):
+    """
+    Load `version` (default: the registry's CURRENT) and warm it up while the old
+    version keeps serving, then swap. In-flight requests finish on the old version.
+    Returns the new version name, or None if it was already active.
+    """
+    ensure_model()
+    new = registry.reload(version, prepare=warmup_model)
+    if new is None:
+        return None
+    model_status["version"] = new.version
+    return new.version
+
+def _watch_registry():
+    while True:
+        time.sleep(MODEL_WATCH_S)
+        try:
+            new = registry.reload_if_changed(prepare=warmup_model)
+            if new is not None:
+                # Loaded and warmed up, which also recovers from a failed first load
+                model_status.update(state="ready", error=None, version=new.version)
+                _model_loaded.set()
+        except Exception as e:
+            # Keep serving the old version; the error shows up in /ready and /models
+            model_status["error"] = f"Reload failed: {type(e).__name__}: {e}"
+
+def start_background_load():
+    """Load and warm up the model on a daemon thread (the app keeps serving meanwhile)"""
+    def run():
+        try:
+            load_model(warmup=True)
+        except Exception:
+            pass  # recorded in model_status; /ready reports it
+        # Watch even after a failed load, so publishing a fixed version recovers
+        if MODEL_WATCH_S > 0:
+            _watch_registry()
+    thread = threading.Thread(target=run, name="model-loader", daemon=True)
+    thread.start()
+    return thread
+
+def is_ready():
+    return model_status["state"] == "ready"
+
+def ensure_model(timeout=None):
+    """
+    Block until the model is loaded. Loads it on the calling thread if nobody
+    has started loading (scripts, benchmarks); raises ModelNotReady on timeout
+    or if loading failed.
+    """
+    if _model_loaded.is_set():
+        return
+    if model_status["state"] == "not_loaded":
+        load_model(warmup=False)
+        return
+    if model_status["state"] == "failed" or not _model_loaded.wait(MODEL_WAIT_S if timeout is None else timeout):
+        raise ModelNotReady(f"Model not ready ({model_status['state']})" + (
+            f": {model_status['error']}" if model_status["error"] else ""
+        ))
+
+def acquire_model():
+    """Context manager pinning the active model version for one request"""
+    ensure_model()
+    return registry.acquire()
+
+def __getattr__(name):
+    # model, device, point_evaluator and full_engine of the active version
+    if name in ("model", "device", "point_evaluator", "full_engine"):
+        ensure_model()
+        return getattr(registry.current, name)
+    if name == "SimpleCNN":
+        from .network import SimpleCNN
+        return SimpleCNN
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ------- Prediction logic (using local PyTorch model) -------
 def predict_with_local_model(input_tensor, grid_y, grid_x):
@@ -43,24 +234,278 @@ def predict_with_local_model(input_tensor, grid_y, grid_x):
     input_tensor: torch tensor shaped [1, channels, H, W]
     grid_y, grid_x: coordinates of interest in the grid
     """
-    with torch.no_grad():
-        _, probs = model(input_tensor.to(device))
+    import torch
+
+    with acquire_model() as version, torch.no_grad():
+        _, probs = version.model(input_tensor.to(version.device))
         probs = probs.squeeze(0).cpu().numpy()
     
     pred_class = int(np.argmax(probs[:, grid_y, grid_x]))
     confidence = float(probs[pred_class, grid_y, grid_x])
-    CLASS_LABELS = {0: "Safe", 1: "Risk"}
     return CLASS_LABELS.get(pred_class, "Unknown"), confidence
 
+# ------- Batched prediction logic -------
+# Inputs are preprocessed by the model version that scores them: its manifest's
+# normalization, grid bounds and rock-type encoding (see features.py)
+
+def _active_version(version):
+    if version is None:
+        ensure_model()
+        version = registry.current
+    return version
+
+def build_feature_vectors(inputs, version=None):
+    """
+    inputs: list of input dicts (same keys as predict_rockfall_with_groq)
+    version: ModelVersion whose preprocessing applies (default: the active one, unpinned)
+    Returns: float32 array [N, channels] with the per-channel fill values
+    """
+    keys = [key for key in INPUT_KEYS if key in inputs[0]]
+    return feature_vectors_from_columns({key: [d[key] for d in inputs] for key in keys}, version)
+
+def feature_vectors_from_columns(columns, version=None):
+    """
+    columns: dict of equal-length arrays keyed like the input dicts; must hold at
+    least the version's FeatureSpec.columns (ValueError otherwise)
+    Returns: float32 array [N, channels] with the per-channel fill values
+    """
+    return _active_version(version).features.vectors(columns)
+
+def map_to_grid_indices(x, y, version=None):
+    """Vectorized X/Y -> (grid_x, grid_y) mapping onto the version's training grid"""
+    return _active_version(version).features.grid_indices(x, y)
+
+def predict_probabilities(feature_vectors, grid_y, grid_x, version=None):
+    """
+    feature_vectors: float32 array [N, channels], one constant fill per channel
+    grid_y, grid_x: int arrays [N] with the cell of interest for each block
+    version: ModelVersion to use (default: the active one, unpinned)
+    Returns: float32 array [N, 2] with class probabilities at each block's cell
+    """
+    version = _active_version(version)
+    if INFERENCE_MODE == "point":
+        return version.point_evaluator.predict_constant(feature_vectors, grid_y, grid_x, version.features.grid_size)
+    return predict_probabilities_full(feature_vectors, grid_y, grid_x, version)
+
+def predict_probabilities_full(feature_vectors, grid_y, grid_x, version=None):
+    """Same as predict_probabilities, but runs the full 64x64 forward pass"""
+    import torch
+
+    version = _active_version(version)
+    engine = version.full_engine
+    grid_size = version.features.grid_size
+    n = len(feature_vectors)
+    out = np.empty((n, len(CLASS_LABELS)), dtype=np.float32)
+    for start in range(0, n, BATCH_CHUNK_SIZE):
+        stop = min(start + BATCH_CHUNK_SIZE, n)
+        chunk = feature_vectors[start:stop]
+        # Broadcast each block's channel values over the whole grid -> [n, C, H, W]
+        feature_grid = np.broadcast_to(
+            chunk[:, :, None, None], (stop - start, chunk.shape[1], grid_size, grid_size)
+        )
+        input_tensor = torch.from_numpy(np.ascontiguousarray(feature_grid))
+        with torch.no_grad():
+            probs = engine(input_tensor)
+            # Gather only the requested cell for each block -> [n, 2]
+            rows = torch.arange(stop - start, device=probs.device)
+            ys = torch.as_tensor(grid_y[start:stop], device=probs.device)
+            xs = torch.as_tensor(grid_x[start:stop], device=probs.device)
+            out[start:stop] = probs[rows, :, ys, xs].cpu().numpy()
+    return out
+
+def predict_batch(inputs, uncertainty=False):
+    """
+    Score many blocks with a single vectorized forward pass (no Groq call).
+    inputs: list of input dicts (same keys as predict_rockfall_with_groq)
+    uncertainty: also estimate the spread of the risk probability (predict_uncertainty)
+    Returns: list of dicts with risk_label, confidence and grid_position
+    """
+    if not inputs:
+        return []
+    with acquire_model() as version:
+        with metrics.stage("preprocess"):
+            feature_vectors = build_feature_vectors(inputs, version)
+            grid_x, grid_y = map_to_grid_indices(
+                [d['X'] for d in inputs], [d['Y'] for d in inputs], version
+            )
+        if uncertainty:
+            return predict_uncertainty(feature_vectors, grid_y, grid_x, version)
+        with metrics.stage("inference"):
+            probs = predict_probabilities(feature_vectors, grid_y, grid_x, version)
+    return [to_prediction(p, gx, gy, version.version) for p, gx, gy in zip(probs, grid_x, grid_y)]
+
+def predict_uncertainty(feature_vectors, grid_y, grid_x, version):
+    """
+    K stochastic (MC-dropout) or ensemble passes per block, batched into one pass.
+    risk_label and confidence come from the mean probabilities; "uncertainty" adds
+    the mean risk probability, its variance across passes and an interval.
+    version: pinned ModelVersion; raises UncertaintyUnavailable when it supports neither method.
+    """
+    from .uncertainty import summarize
+
+    with metrics.stage("inference"):
+        estimator = version.uncertainty
+        samples = estimator.sample(feature_vectors, grid_y, grid_x, version.features.grid_size)
+    mean, variance, interval = summarize(samples, RISK_CLASS, UNCERTAINTY_INTERVAL)
+    predictions = []
+    for i, (p, gx, gy) in enumerate(zip(mean, grid_x, grid_y)):
+        prediction = to_prediction(p, gx, gy, version.version)
+        prediction["uncertainty"] = {
+            "method": estimator.method,
+            "samples": estimator.samples,
+            "mean_risk_probability": float(p[RISK_CLASS]),
+            "variance": float(variance[i]),
+            "std": float(np.sqrt(variance[i])),
+            "interval": [float(interval[i, 0]), float(interval[i, 1])],
+            "interval_level": UNCERTAINTY_INTERVAL,
+        }
+        predictions.append(prediction)
+    return predictions
+
+def score_columns(columns, version):
+    """
+    Batched scoring of already validated columnar input (no per-block dicts).
+    columns: dict of [N] arrays keyed like the input dicts (at least version.features.columns)
+    version: pinned ModelVersion (from acquire_model())
+    Returns: (class probabilities float32 [N, classes], grid_x [N], grid_y [N])
+    """
+    with metrics.stage("preprocess"):
+        feature_vectors = feature_vectors_from_columns(columns, version)
+        grid_x, grid_y = map_to_grid_indices(columns['X'], columns['Y'], version)
+    with metrics.stage("inference"):
+        probs = predict_probabilities(feature_vectors, grid_y, grid_x, version)
+    return probs, grid_x, grid_y
+
+def predict_sweep(base_input, axes, version=None):
+    """
+    What-if sweep: score every combination of one or two parameter ranges around
+    base_input in one batched pass (no Groq call).
+    base_input: input dict; axes: list of (input key, values) pairs
+    version: pinned ModelVersion (default: pins the active one)
+    Returns: dict with risk_probability and predicted_class shaped [len(values_1)]
+    or [len(values_1), len(values_2)], plus the model version used
+    """
+    if version is None:
+        with acquire_model() as version:
+            return predict_sweep(base_input, axes, version)
+    with metrics.stage("preprocess"):
+        grids = np.meshgrid(*[np.asarray(values, dtype=np.float64) for _, values in axes], indexing="ij")
+        shape = grids[0].shape
+        n = grids[0].size
+        columns = {key: np.full(n, float(base_input[key])) for key in INPUT_KEYS if key in base_input}
+        for (key, _), grid in zip(axes, grids):
+            columns[key] = grid.ravel()
+    probs, _, _ = score_columns(columns, version)
+    return {
+        "shape": list(shape),
+        "risk_probability": probs[:, RISK_CLASS].reshape(shape),
+        "predicted_class": probs.argmax(axis=1).reshape(shape),
+        "model_version": version.version,
+    }
+
+def to_prediction(cell_probs, grid_x, grid_y, model_version=None):
+    """Turn one cell's class probabilities into the prediction dict"""
+    pred_class = int(np.argmax(cell_probs))
+    return {
+        "risk_label": CLASS_LABELS.get(pred_class, "Unknown"),
+        "confidence": float(cell_probs[pred_class]),
+        "grid_position": {"x": int(grid_x), "y": int(grid_y)},
+        "model_version": model_version,
+    }
+
+def _score_microbatch(items):
+    """MicroBatcher callback: items are input dicts, preprocessed by the version that scores them"""
+    with acquire_model() as version:
+        feature_vectors = build_feature_vectors(items, version)
+        grid_x, grid_y = map_to_grid_indices([d['X'] for d in items], [d['Y'] for d in items], version)
+        probs = predict_probabilities(feature_vectors, grid_y, grid_x, version)
+    return [(p, gx, gy, version.version) for p, gx, gy in zip(probs, grid_x, grid_y)]
+
+scheduler = (
+    MicroBatcher(_score_microbatch, MICROBATCH_MAX_SIZE, MICROBATCH_MAX_WAIT_US, timeout_s=MICROBATCH_TIMEOUT_S)
+    if MICROBATCH_MAX_SIZE > 0 else None
+)
+
 # ------- Explainability logic (using Groq API) -------
 def get_explanation_from_groq(prediction_result, input_features):
     """
     prediction_result: dict with prediction and confidence from local model
     input_features: original input data for context
-    Returns: natural language explanation
+    Returns: natural language explanation (explanation_source: llm, cache or fallback)
+    """
+    prompt = build_explanation_prompt(prediction_result, input_features)
+    key_factors = extract_key_factors(input_features, prediction_result)
+    safety_recommendations = get_safety_recommendations(prediction_result['risk_label'])
+    
+    cache_key = None
+    if explanation_cache is not None:
+        cache_key = explanation_cache.make_key(prediction_result, input_features)
+        explanation = explanation_cache.get(cache_key)
+        if explanation is not None:
+            return {
+                "explanation": explanation,
+                "explanation_source": "cache",
+                "key_factors": key_factors,
+                "safety_recommendations": safety_recommendations
+            }
+    
+    started = time.perf_counter()
+    with metrics.stage("explanation"):
+        explanation, source = explainer.explain(
+            prompt, lambda: template_explanation(prediction_result, key_factors, safety_recommendations)
+        )
+    if source == "llm" and cache_key is not None and explanation:
+        explanation_cache.put(cache_key, explanation, time.perf_counter() - started)
+    
+    return {
+        "explanation": explanation,
+        "explanation_source": source,
+        "key_factors": key_factors,
+        "safety_recommendations": safety_recommendations
+    }
+
+async def stream_explanation_from_groq(prediction_result, input_features):
+    """
+    Streaming variant of get_explanation_from_groq (async generator).
+    Yields ("token", text) chunks of the explanation, then one ("done", data)
+    with explanation_source, key_factors and safety_recommendations.
     """
+    prompt = build_explanation_prompt(prediction_result, input_features)
+    key_factors = extract_key_factors(input_features, prediction_result)
+    safety_recommendations = get_safety_recommendations(prediction_result['risk_label'])
     
-    # Create a natural language prompt for Groq
+    cache_key = None
+    cached = None
+    if explanation_cache is not None:
+        cache_key = explanation_cache.make_key(prediction_result, input_features)
+        cached = explanation_cache.get(cache_key)
+    
+    if cached is not None:
+        source = "cache"
+        yield "token", cached
+    else:
+        started = time.perf_counter()
+        source = "llm"
+        parts = []
+        async for chunk_source, text in explainer.stream(
+            prompt, lambda: template_explanation(prediction_result, key_factors, safety_recommendations)
+        ):
+            if chunk_source == "fallback":
+                source = "fallback"
+            parts.append(text)
+            yield "token", text
+        metrics.record_stage("explanation", time.perf_counter() - started)
+        if source == "llm" and cache_key is not None and parts:
+            explanation_cache.put(cache_key, "".join(parts), time.perf_counter() - started)
+    
+    yield "done", {
+        "explanation_source": source,
+        "key_factors": key_factors,
+        "safety_recommendations": safety_recommendations
+    }
+
+def build_explanation_prompt(prediction_result, input_features):
+    """Natural language prompt for the LLM"""
     prompt = f"""
     You are a geological expert explaining rockfall risk predictions. 
     
@@ -84,30 +529,7 @@ def get_explanation_from_groq(prediction_result, input_features):
     
     Keep the explanation concise and practical for mining engineers.
     """
-    
-    try:
-        response = client.chat.completions.create(
-            model="openai/gpt-oss-120b",  # Using a more standard Groq model
-            messages=[
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=500
-        )
-        
-        explanation = response.choices[0].message.content
-        return {
-            "explanation": explanation,
-            "key_factors": extract_key_factors(input_features, prediction_result),
-            "safety_recommendations": get_safety_recommendations(prediction_result['risk_label'])
-        }
-        
-    except Exception as e:
-        return {
-            "explanation": f"Error generating explanation: {str(e)}",
-            "key_factors": [],
-            "safety_recommendations": []
-        }
+    return prompt
 
 def extract_key_factors(input_features, prediction_result):
     """Extract key contributing factors based on input values"""
@@ -148,49 +570,35 @@ def get_safety_recommendations(risk_level):
         ]
 
 # ------- Complete inference wrapper -------
-def predict_rockfall_with_groq(input_data):
+def predict_rockfall(input_data, uncertainty=False):
     """
-    1) Preprocess input_data to multi-channel tensor and get grid coords
-    2) Predict locally with rockfall.pt model  
-    3) Get natural language explanation from Groq
-    Returns combined dict with prediction + explanation
+    1) Preprocess input_data to per-channel values and get grid coords
+    2) Predict locally with rockfall.pt model (batch of one)
+    Returns prediction dict (no Groq call)
     """
+    if scheduler is None or uncertainty:
+        return predict_batch([input_data], uncertainty=uncertainty)[0]
     
-    # Preprocessing for PyTorch model
-    channels = 6
-    GRID_SIZE = 64
-    feature_grid = np.zeros((channels, GRID_SIZE, GRID_SIZE), dtype=np.float32)
-    
-    # Map coordinates to grid indices (adjust scaling as needed)
-    grid_x = min(int((input_data['X'] / 1000) * (GRID_SIZE - 1)), GRID_SIZE - 1)
-    grid_y = min(int((input_data['Y'] / 1000) * (GRID_SIZE - 1)), GRID_SIZE - 1)
-    
-    # Fill feature channels (adjust based on your actual preprocessing)
-    # Channel 0: X coordinate normalized
-    feature_grid[0, :, :] = input_data['X'] / 1000.0
-    # Channel 1: Y coordinate normalized  
-    feature_grid[1, :, :] = input_data['Y'] / 1000.0
-    # Channel 2: Z elevation normalized
-    feature_grid[2, :, :] = input_data['Z'] / 200.0
-    # Channel 3: Rock type
-    feature_grid[3, :, :] = input_data['Rock_Type_enc'] / 10.0
-    # Channel 4: Ore grade
-    feature_grid[4, :, :] = input_data['Ore_Grade (%)'] / 100.0
-    # Channel 5: Combined economic factors
-    economic_factor = (input_data['Ore_Value (¥/tonne)'] * input_data['Tonnage']) / 100000.0
-    feature_grid[5, :, :] = economic_factor
-    
-    # Convert to torch tensor with batch dimension
-    input_tensor = torch.tensor(feature_grid).unsqueeze(0)
-    
-    # Get prediction from local PyTorch model
-    pred_label, confidence = predict_with_local_model(input_tensor, grid_y, grid_x)
-    
-    prediction_result = {
-        "risk_label": pred_label,
-        "confidence": confidence,
-        "grid_position": {"x": grid_x, "y": grid_y}
+    # Share preprocessing and a forward pass with other in-flight requests
+    with metrics.stage("inference"):
+        cell_probs, grid_x, grid_y, model_version = scheduler(input_data)
+    return to_prediction(cell_probs, grid_x, grid_y, model_version)
+
+def summarize_input(input_data):
+    """Short human-readable summary of the request inputs"""
+    return {
+        "location": f"({input_data['X']}, {input_data['Y']}, {input_data['Z']})",
+        "ore_grade": f"{input_data['Ore_Grade (%)']}%",
+        "tonnage": f"{input_data['Tonnage']} tonnes"
     }
+
+def predict_rockfall_with_groq(input_data, uncertainty=False):
+    """
+    1) Predict locally with rockfall.pt model (predict_rockfall)
+    2) Get natural language explanation from Groq
+    Returns combined dict with prediction + explanation
+    """
+    prediction_result = predict_rockfall(input_data, uncertainty=uncertainty)
     
     # Get explanation from Groq (separate from prediction)
     explanation_data = get_explanation_from_groq(prediction_result, input_data)
@@ -199,14 +607,10 @@ def predict_rockfall_with_groq(input_data):
     return {
         **prediction_result,
         **explanation_data,
-        "input_summary": {
-            "location": f"({input_data['X']}, {input_data['Y']}, {input_data['Z']})",
-            "ore_grade": f"{input_data['Ore_Grade (%)']}%",
-            "tonnage": f"{input_data['Tonnage']} tonnes"
-        }
+        "input_summary": summarize_input(input_data)
     }
 
-# Example standalone test
+# Example standalone test (run from backend/: python -m Feature1.logic)
 if __name__ == "__main__":
     sample_input = {
         "X": 500.0, 
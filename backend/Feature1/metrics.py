@@ -0,0 +1,220 @@
+import os
+import time
+import bisect
+import threading
+import contextvars
+from contextlib import contextmanager
+
+# ------- Lightweight Prometheus-style metrics (no extra dependency) -------
+# Each observation is a bisect plus a few additions under a lock,
+# cheap enough to leave on under full load.
+
+LATENCY_BUCKETS = (
+    0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+    0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+def _format_labels(labelnames, values, extra=None):
+    pairs = list(zip(labelnames, values))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            items = sorted(self._values.items())
+            lines.extend(self._render_items(items))
+        return lines
+
+    def _render_items(self, items):
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {value}" for key, value in items]
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def _render_items(self, items):
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, c in zip(self.buckets, counts):
+                cumulative += c
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', bound))} {cumulative}")
+            lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, key, ('le', '+Inf'))} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+registry = Registry()
+
+STAGE_SECONDS = registry.register(Histogram(
+    "rockfall_stage_seconds", "Time spent in each prediction stage", ("stage",)
+))
+STAGE_ERRORS = registry.register(Counter(
+    "rockfall_stage_errors_total", "Exceptions raised inside each prediction stage", ("stage", "error")
+))
+GROQ_ERRORS = registry.register(Counter(
+    "rockfall_groq_errors_total", "Failed Groq explanation calls", ("kind",)
+))
+HTTP_SECONDS = registry.register(Histogram(
+    "rockfall_http_request_duration_seconds", "HTTP request latency", ("method", "path", "status")
+))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "rockfall_http_requests_in_flight", "HTTP requests currently being served"
+))
+BATCH_SIZE = registry.register(Histogram(
+    "rockfall_microbatch_size", "Requests per micro-batched forward pass",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256),
+))
+QUEUE_WAIT_SECONDS = registry.register(Histogram(
+    "rockfall_microbatch_queue_wait_seconds", "Time a request waits for its micro-batch to start"
+))
+
+# ------- Per-request stage timings -------
+# The middleware puts a dict in this context var; stages add their durations to it
+# so they can be returned in a Server-Timing header.
+_request_timings = contextvars.ContextVar("rockfall_request_timings", default=None)
+
+@contextmanager
+def stage(name):
+    """Time a block as one prediction stage (histogram + optional timing header)"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        STAGE_ERRORS.inc(stage=name, error=type(e).__name__)
+        raise
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+def record_stage(name, seconds):
+    STAGE_SECONDS.observe(seconds, stage=name)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings["stages"][name] = timings["stages"].get(name, 0.0) + seconds
+
+def mark_validated():
+    """Call at the top of a handler: time since the request arrived is parsing + validation"""
+    timings = _request_timings.get()
+    if timings is not None and "validation" not in timings["stages"]:
+        record_stage("validation", time.perf_counter() - timings["start"])
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording request latency and in-flight requests.
+    Adds a Server-Timing header when timing_headers is on, or when the
+    client sends 'X-Request-Timing: 1'.
+    """
+
+    def __init__(self, app, timing_headers=None):
+        self.app = app
+        if timing_headers is None:
+            timing_headers = os.environ.get("ROCKFALL_TIMING_HEADERS") == "1"
+        self.timing_headers = timing_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timings = {"start": start, "stages": {}}
+        token = _request_timings.set(timings)
+        want_header = self.timing_headers or (b"x-request-timing", b"1") in scope.get("headers", [])
+        status = {"code": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                if want_header:
+                    parts = [f"{name};dur={seconds * 1e3:.3f}" for name, seconds in timings["stages"].items()]
+                    parts.append(f"total;dur={(time.perf_counter() - start) * 1e3:.3f}")
+                    message = dict(message)
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"server-timing", ", ".join(parts).encode())
+                    ]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            _request_timings.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            HTTP_SECONDS.observe(
+                time.perf_counter() - start, method=scope.get("method", ""), path=path, status=status["code"]
+            )
@@ -0,0 +1,19 @@
+import torch
+
+# Must match the architecture in machineLearning/network.py
+class SimpleCNN(torch.nn.Module):
+    def __init__(self, in_channels):
+        super(SimpleCNN, self).__init__()
+        self.conv1 = torch.nn.Conv2d(in_channels, 16, 3, padding=1)
+        self.bn1 = torch.nn.BatchNorm2d(16)
+        self.conv2 = torch.nn.Conv2d(16, 32, 3, padding=1)
+        self.bn2 = torch.nn.BatchNorm2d(32)
+        self.conv3 = torch.nn.Conv2d(32, 2, 1)
+        self.logsoftmax = torch.nn.LogSoftmax(dim=1)
+        self.softmax = torch.nn.Softmax(dim=1)
+
+    def forward(self, x):
+        x = torch.relu(self.bn1(self.conv1(x)))
+        x = torch.relu(self.bn2(self.conv2(x)))
+        out = self.conv3(x)
+        return self.logsoftmax(out), self.softmax(out)
@@ -0,0 +1,154 @@
+import numpy as np
+import torch
+
+# Receptive field of SimpleCNN: two 3x3 convs (padding=1) followed by a 1x1 conv
+RADIUS = 2
+WINDOW = 2 * RADIUS + 1
+
+def fold_conv_bn(conv, bn):
+    """
+    Fold an eval-mode BatchNorm2d into the preceding Conv2d.
+    Returns (weight, bias) as float32 numpy arrays.
+    """
+    with torch.no_grad():
+        scale = bn.weight.double() / torch.sqrt(bn.running_var.double() + bn.eps)
+        weight = conv.weight.double() * scale[:, None, None, None]
+        bias = conv.bias.double() if conv.bias is not None else torch.zeros_like(bn.running_mean.double())
+        bias = (bias - bn.running_mean.double()) * scale + bn.bias.double()
+    return weight.float().cpu().numpy(), bias.float().cpu().numpy()
+
+def normalize_indices(idx, size):
+    """Apply numpy's negative-index semantics so results match probs[:, y, x] lookups"""
+    idx = np.asarray(idx, dtype=np.int64)
+    if np.any(idx < -size) or np.any(idx >= size):
+        raise IndexError(f"grid index out of range for size {size}")
+    return np.where(idx < 0, idx + size, idx)
+
+def window_inside(grid_y, grid_x, height, width):
+    """[N, 5] row and column masks: which cells of each 5x5 window lie inside the grid"""
+    offsets = np.arange(-RADIUS, RADIUS + 1)
+    ys = grid_y[:, None] + offsets
+    xs = grid_x[:, None] + offsets
+    return (ys >= 0) & (ys < height), (xs >= 0) & (xs < width)
+
+def constant_windows(feature_vectors, grid_y, grid_x, grid_size):
+    """
+    5x5 input windows around each cell of a grid filled with one value per channel.
+    Returns window float32 [N, C, 5, 5] (zero outside the grid) and the [N, 3]
+    row/column masks of the conv1 outputs that lie inside the grid.
+    """
+    feature_vectors = np.asarray(feature_vectors, dtype=np.float32)
+    grid_y = normalize_indices(grid_y, grid_size)
+    grid_x = normalize_indices(grid_x, grid_size)
+    inside_y, inside_x = window_inside(grid_y, grid_x, grid_size, grid_size)
+    inside = inside_y[:, :, None] & inside_x[:, None, :]  # [N, 5, 5]
+    window = feature_vectors[:, :, None, None] * inside[:, None, :, :]
+    return window, inside_y[:, 1:-1], inside_x[:, 1:-1]
+
+# ------- Point inference engine -------
+class PointEvaluator:
+    """
+    Exact SimpleCNN output at single grid cells.
+    Only the 5x5 input window around each requested cell is evaluated; cells
+    outside the grid are treated as the zero padding the full model sees.
+    """
+
+    def __init__(self, model):
+        model = model.cpu().eval()
+        w1, b1 = fold_conv_bn(model.conv1, model.bn1)
+        w2, b2 = fold_conv_bn(model.conv2, model.bn2)
+        self.in_channels = w1.shape[1]
+        # im2col layouts: patches are flattened in (channel, ky, kx) order
+        self.w1 = np.ascontiguousarray(w1.reshape(w1.shape[0], -1).T)  # [C*9, 16]
+        self.b1 = b1
+        self.w2 = np.ascontiguousarray(w2.reshape(w2.shape[0], -1).T)  # [16*9, 32]
+        self.b2 = b2
+        with torch.no_grad():
+            self.w3 = np.ascontiguousarray(model.conv3.weight[:, :, 0, 0].float().cpu().numpy().T)  # [32, classes]
+            self.b3 = model.conv3.bias.float().cpu().numpy()
+
+    def predict_constant(self, feature_vectors, grid_y, grid_x, grid_size):
+        """
+        feature_vectors: float32 array [N, channels], each channel filled across the grid
+        grid_y, grid_x: int arrays [N] with the cell of interest
+        Returns: float32 array [N, classes] of softmax probabilities
+        """
+        window, inside_y, inside_x = constant_windows(feature_vectors, grid_y, grid_x, grid_size)
+        return self._forward_window(window, inside_y, inside_x)
+
+    def predict_grid(self, grids, grid_y, grid_x):
+        """
+        grids: float32 array or tensor [N, channels, H, W] (arbitrary contents)
+        grid_y, grid_x: int arrays [N] with the cell of interest
+        Returns: float32 array [N, classes] of softmax probabilities
+        """
+        if isinstance(grids, torch.Tensor):
+            grids = grids.detach().cpu().numpy()
+        grids = np.asarray(grids, dtype=np.float32)
+        n, _, height, width = grids.shape
+        grid_y = normalize_indices(grid_y, height)
+        grid_x = normalize_indices(grid_x, width)
+        padded = np.pad(grids, ((0, 0), (0, 0), (RADIUS, RADIUS), (RADIUS, RADIUS)))
+        offsets = np.arange(WINDOW)
+        ys = grid_y[:, None] + offsets  # padded coordinates of the window rows
+        xs = grid_x[:, None] + offsets
+        rows = np.arange(n)[:, None, None]
+        window = padded[rows, :, ys[:, :, None], xs[:, None, :]]  # [N, 5, 5, C]
+        window = window.transpose(0, 3, 1, 2)
+        inside_y, inside_x = window_inside(grid_y, grid_x, height, width)
+        return self._forward_window(window, inside_y[:, 1:-1], inside_x[:, 1:-1])
+
+    def _forward_window(self, window, inside_y, inside_x):
+        # window: [N, C, 5, 5]; inside_y/inside_x: [N, 3] masks for the conv1 outputs
+        n = window.shape[0]
+        # conv1 (valid) over the 5x5 window -> 3x3 positions, as one matmul
+        patches = np.lib.stride_tricks.sliding_window_view(window, (3, 3), axis=(2, 3))
+        patches = patches.transpose(0, 2, 3, 1, 4, 5).reshape(n, 9, -1)  # [N, 9, C*9]
+        h1 = np.maximum(patches @ self.w1 + self.b1, 0.0)  # [N, 9, 16]
+        # conv1 outputs that fall outside the grid are conv2's zero padding
+        h1 *= (inside_y[:, :, None] & inside_x[:, None, :]).reshape(n, 9, 1)
+        h1 = h1.transpose(0, 2, 1).reshape(n, -1)  # [N, 16*9] in (channel, ky, kx) order
+        h2 = np.maximum(h1 @ self.w2 + self.b2, 0.0)  # [N, 32]
+        logits = h2 @ self.w3 + self.b3
+        logits -= logits.max(axis=1, keepdims=True)
+        exp = np.exp(logits)
+        return (exp / exp.sum(axis=1, keepdims=True)).astype(np.float32)
+
+def check_parity(model, evaluator=None, samples=256, grid_size=64, seed=0):
+    """
+    Compare PointEvaluator against the full forward pass on random inputs,
+    including border cells. Returns the max absolute probability difference.
+    """
+    evaluator = evaluator or PointEvaluator(model)
+    rng = np.random.default_rng(seed)
+    vectors = rng.uniform(-1.0, 2.0, size=(samples, evaluator.in_channels)).astype(np.float32)
+    grid_y = rng.integers(0, grid_size, size=samples)
+    grid_x = rng.integers(0, grid_size, size=samples)
+    # Force corners and edges into the sample
+    grid_y[:4], grid_x[:4] = [0, 0, grid_size - 1, grid_size - 1], [0, grid_size - 1, 0, grid_size - 1]
+
+    grids = np.ascontiguousarray(np.broadcast_to(
+        vectors[:, :, None, None], (samples, evaluator.in_channels, grid_size, grid_size)
+    ))
+    # Also check arbitrary (non-constant) grids
+    noisy = grids + rng.normal(0.0, 0.5, size=grids.shape).astype(np.float32)
+
+    model = model.cpu().eval()
+    worst = 0.0
+    with torch.no_grad():
+        for full_input, point_probs in (
+            (grids, evaluator.predict_constant(vectors, grid_y, grid_x, grid_size)),
+            (noisy, evaluator.predict_grid(noisy, grid_y, grid_x)),
+        ):
+            _, probs = model(torch.from_numpy(full_input))
+            expected = probs[np.arange(samples), :, grid_y, grid_x].numpy()
+            worst = max(worst, float(np.abs(expected - point_probs).max()))
+    return worst
+
+if __name__ == "__main__":
+    # Run from backend/: python -m Feature1.pointeval
+    from .logic import model
+
+    max_diff = check_parity(model)
+    print(f"Max |point - full| probability difference: {max_diff:.2e}")
+    assert max_diff < 1e-5, "Point evaluator diverges from the full forward pass"
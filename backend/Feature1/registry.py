@@ -0,0 +1,359 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+
+from . import metrics
+
+# ------- Versioned model registry -------
+# Layout (written by publish(): machineLearning/export.py or `python -m Feature1.registry publish`):
+#   <root>/<version>/model.pt       : SimpleCNN state_dict
+#   <root>/<version>/manifest.json  : version, sha256, channels, grid_size, features,
+#                                     normalization {mean, std}, bounds, rock_type_encoding,
+#                                     class_labels, source, created_at
+#                                     [, dropout: rate the weights were trained with]
+#                                     [, ensemble: [{weights, sha256}, ...]]
+#   <root>/<version>/member-<i>.pt  : optional ensemble members for uncertainty estimates
+# Uncertainty estimates need ensemble members or weights trained with dropout.
+#   <root>/CURRENT                  : name of the version to serve
+# Version directories are written under a temporary name and renamed into place,
+# and CURRENT is replaced atomically, so readers never see a half-written version.
+
+ACTIVE_VERSION = metrics.registry.register(metrics.Gauge(
+    "rockfall_model_active", "1 for the model version currently serving", ("version",)
+))
+IN_FLIGHT = metrics.registry.register(metrics.Gauge(
+    "rockfall_model_in_flight", "Requests currently using each model version", ("version",)
+))
+SWAPS = metrics.registry.register(metrics.Counter(
+    "rockfall_model_swaps_total", "Model versions activated"
+))
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def read_current(root):
+    """Version name in <root>/CURRENT, or None"""
+    try:
+        with open(os.path.join(root, "CURRENT")) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+def write_current(root, version):
+    fd, tmp = tempfile.mkstemp(dir=root, prefix=".CURRENT.")
+    with os.fdopen(fd, "w") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(root, "CURRENT"))
+
+def list_versions(root):
+    """Manifests of all published versions, oldest first"""
+    manifests = []
+    if os.path.isdir(root):
+        for name in os.listdir(root):
+            path = os.path.join(root, name, "manifest.json")
+            if not name.startswith(".") and os.path.exists(path):
+                with open(path) as f:
+                    manifests.append(json.load(f))
+    return sorted(manifests, key=lambda m: (m.get("created_at", ""), m["version"]))
+
+def publish(root, weights_path, manifest, activate=True, members=()):
+    """
+    Copy weights + manifest into <root>/<version> atomically; optionally point CURRENT at it.
+    members: extra weights files (same architecture) served as an ensemble for uncertainty
+    """
+    os.makedirs(root, exist_ok=True)
+    sha = file_sha256(weights_path)
+    manifest = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        **manifest,
+        "sha256": sha,
+        "weights": "model.pt",
+    }
+    manifest.setdefault("version", time.strftime("%Y%m%d-%H%M%S") + "-" + sha[:8])
+    target = os.path.join(root, manifest["version"])
+    if os.path.exists(target):
+        raise FileExistsError(f"Model version {manifest['version']} already exists")
+    staging = tempfile.mkdtemp(dir=root, prefix=".staging-")
+    try:
+        shutil.copyfile(weights_path, os.path.join(staging, "model.pt"))
+        if members:
+            manifest["ensemble"] = []
+            for i, member in enumerate(members):
+                shutil.copyfile(member, os.path.join(staging, f"member-{i}.pt"))
+                manifest["ensemble"].append({"weights": f"member-{i}.pt", "sha256": file_sha256(member)})
+        with open(os.path.join(staging, "manifest.json"), "w") as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    if activate:
+        write_current(root, manifest["version"])
+    return manifest
+
+class UncertaintyUnavailable(RuntimeError):
+    """The model version has neither ensemble members nor dropout-trained weights"""
+
+class ModelVersion:
+    """
+    One loaded model version, its inference engines and its in-flight request count.
+    Loading reads only weights and manifest; the whole-grid engine (jit.trace, int8
+    calibration, ...) is built on first use, so a prefork master that loads the
+    model never runs inference before fork() (warmup builds it in each worker).
+    """
+
+    def __init__(self, manifest, weights_path, inference_mode="point", engine="fused", uncertainty=None):
+        import torch
+        from .network import SimpleCNN
+        from .pointeval import PointEvaluator
+        from .inference import build_engine
+        from .features import FeatureSpec
+
+        self.version = manifest["version"]
+        self.manifest = manifest
+        self.weights_path = weights_path
+        self.engine_name = engine
+        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.model = SimpleCNN(in_channels=manifest.get("channels", 6))
+        self.model.load_state_dict(torch.load(weights_path, map_location=self.device))
+        self.model.eval()
+        # The manifest's normalization, grid bounds and rock-type encoding for request inputs
+        self.features = FeatureSpec(manifest)
+        # BatchNorm-folded copy of the weights for single-cell inference
+        self.point_evaluator = PointEvaluator(self.model)
+        self._build_engine = build_engine
+        self._engine_lock = threading.Lock()
+        self.inference_mode = inference_mode
+        self._full_engine = None
+        self._uncertainty_options = uncertainty or {}
+        self._uncertainty = None
+        self.refs = 0
+        self.retired = False
+        self.loaded_at = time.time()
+
+    @property
+    def full_engine(self):
+        """Whole-grid engine, built on first use (warmup, in full inference mode)"""
+        if self._full_engine is None:
+            with self._engine_lock:
+                if self._full_engine is None:
+                    self._full_engine = self._build_engine(self.model, self.engine_name)
+        return self._full_engine
+
+    @property
+    def uncertainty(self):
+        """
+        UncertaintyEstimator over the manifest's ensemble members, else MC-dropout at the
+        training dropout rate; built on first use. Raises UncertaintyUnavailable without either.
+        """
+        if self._uncertainty is None:
+            with self._engine_lock:
+                if self._uncertainty is None:
+                    self._uncertainty = self._build_uncertainty()
+        return self._uncertainty
+
+    def _build_uncertainty(self):
+        import torch
+        from .network import SimpleCNN
+        from .uncertainty import UncertaintyEstimator
+
+        members = self.manifest.get("ensemble", [])
+        dropout = self.manifest.get("dropout") or 0.0
+        if not members and dropout <= 0:
+            # Dropout on weights trained without it is injected noise, not model uncertainty
+            raise UncertaintyUnavailable(
+                f"Model version {self.version} has no ensemble members and was not trained with dropout; "
+                "publish it with ensemble members (--member) or retrain with ROCKFALL_DROPOUT"
+            )
+        models = [self.model]
+        directory = os.path.dirname(self.weights_path)
+        for member in members:
+            path = os.path.join(directory, member["weights"])
+            if member.get("sha256") and file_sha256(path) != member["sha256"]:
+                raise ValueError(f"Model version {self.version}: {member['weights']} does not match manifest sha256")
+            models.append(SimpleCNN(in_channels=self.manifest.get("channels", 6)))
+            models[-1].load_state_dict(torch.load(path, map_location="cpu"))
+        return UncertaintyEstimator(models, dropout=dropout, **self._uncertainty_options)
+
+    def info(self):
+        return {
+            "version": self.version,
+            "in_flight": self.refs,
+            "retired": self.retired,
+            "loaded_at": self.loaded_at,
+            "columns": list(self.features.columns),
+            "manifest": self.manifest,
+        }
+
+class ModelRegistry:
+    """
+    Serves one active ModelVersion and swaps in new ones without dropping requests.
+    acquire() pins the active version for the length of a request; activate()
+    replaces it atomically, and the old version is released once its last
+    in-flight request finishes.
+    Without a published version, the bare legacy weights file is served as
+    version "legacy-<sha256 prefix>".
+    """
+
+    def __init__(self, root, legacy_path=None, inference_mode="point", engine="fused", defaults=None,
+                 uncertainty=None):
+        self.root = root
+        self.legacy_path = legacy_path
+        self.inference_mode = inference_mode
+        self.engine = engine
+        self.defaults = defaults or {}
+        self.uncertainty = uncertainty
+        self.current = None
+        self._lock = threading.Lock()
+        self._swap_lock = threading.Lock()
+        self._draining = {}
+        self._pointer = None
+
+    def load(self, version=None):
+        """Load a version (default: what CURRENT points at) without activating it"""
+        version = version or read_current(self.root)
+        if version is None:
+            if not self.legacy_path:
+                raise FileNotFoundError(f"No model version published in {self.root}")
+            manifest = {
+                **self.defaults,
+                "version": "legacy-" + file_sha256(self.legacy_path)[:8],
+                "source": os.path.basename(self.legacy_path),
+            }
+            return ModelVersion(manifest, self.legacy_path, self.inference_mode, self.engine, self.uncertainty)
+        # Only names of published versions, never a path (e.g. "../..") from a request or CURRENT
+        if version not in {m["version"] for m in list_versions(self.root)}:
+            raise FileNotFoundError(f"No published model version {version!r} in {self.root}")
+        directory = os.path.join(self.root, version)
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = {**self.defaults, **json.load(f)}
+        weights_path = os.path.join(directory, manifest.get("weights", "model.pt"))
+        if manifest.get("sha256") and file_sha256(weights_path) != manifest["sha256"]:
+            raise ValueError(f"Model version {version}: weights do not match manifest sha256")
+        return ModelVersion(manifest, weights_path, self.inference_mode, self.engine, self.uncertainty)
+
+    def activate(self, model_version):
+        """Make model_version the one new requests use; returns the previous one"""
+        with self._lock:
+            previous, self.current = self.current, model_version
+            if previous is not None and previous is not model_version:
+                previous.retired = True
+                if previous.refs:
+                    self._draining[previous.version] = previous
+        if previous is not None and previous is not model_version:
+            ACTIVE_VERSION.set(0, version=previous.version)
+        ACTIVE_VERSION.set(1, version=model_version.version)
+        SWAPS.inc()
+        return previous
+
+    def reload(self, version=None, prepare=None):
+        """
+        Load `version` (default: CURRENT) next to the serving one, run prepare(new)
+        (e.g. warmup), then swap it in. Returns the new version, or None if it is
+        already active.
+        """
+        with self._swap_lock:
+            self._pointer = self._pointer_stamp()
+            target = version or read_current(self.root)
+            if self.current is not None and target in (None, self.current.version):
+                return None
+            new = self.load(target)
+            if prepare is not None:
+                prepare(new)
+            self.activate(new)
+            return new
+
+    def reload_if_changed(self, prepare=None):
+        """Reload when CURRENT was rewritten since the last load (cheap stat call)"""
+        if self._pointer_stamp() == self._pointer:
+            return None
+        return self.reload(prepare=prepare)
+
+    @contextmanager
+    def acquire(self):
+        """Pin the active version for the duration of one request"""
+        with self._lock:
+            model_version = self.current
+            if model_version is None:
+                raise RuntimeError("No model version is active")
+            model_version.refs += 1
+        IN_FLIGHT.inc(version=model_version.version)
+        try:
+            yield model_version
+        finally:
+            IN_FLIGHT.dec(version=model_version.version)
+            with self._lock:
+                model_version.refs -= 1
+                if model_version.retired and model_version.refs == 0:
+                    # Last request on a replaced version: drop it so its memory is freed
+                    self._draining.pop(model_version.version, None)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "root": self.root,
+                "current": self.current.info() if self.current else None,
+                "draining": [v.info() for v in self._draining.values()],
+                "pointer": read_current(self.root),
+            }
+
+    def _pointer_stamp(self):
+        try:
+            stat = os.stat(os.path.join(self.root, "CURRENT"))
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+if __name__ == "__main__":
+    # Run from backend/: python -m Feature1.registry publish rockfall_model.pt [--version v] [--no-activate]
+    #                        [--member seed1.pt --member seed2.pt ...] [--dropout 0.1]
+    #                    python -m Feature1.registry list | activate <version>
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rockfall model registry")
+    parser.add_argument("--root", default=os.environ.get(
+        "ROCKFALL_MODEL_REGISTRY", os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "models")
+    ))
+    commands = parser.add_subparsers(dest="command", required=True)
+    publish_cmd = commands.add_parser("publish", help="add a weights file as a new version")
+    publish_cmd.add_argument("weights")
+    publish_cmd.add_argument("--version")
+    publish_cmd.add_argument("--manifest", help="JSON file with extra manifest fields")
+    publish_cmd.add_argument("--no-activate", action="store_true")
+    publish_cmd.add_argument("--member", action="append", default=[],
+                             help="ensemble member weights for uncertainty estimates (repeatable)")
+    publish_cmd.add_argument("--dropout", type=float,
+                             help="dropout rate the weights were trained with (enables MC-dropout uncertainty)")
+    commands.add_parser("list", help="list published versions")
+    activate_cmd = commands.add_parser("activate", help="point CURRENT at a version")
+    activate_cmd.add_argument("version")
+    args = parser.parse_args()
+
+    if args.command == "publish":
+        extra = {}
+        if args.manifest:
+            with open(args.manifest) as f:
+                extra = json.load(f)
+        if args.version:
+            extra["version"] = args.version
+        if args.dropout is not None:
+            extra["dropout"] = args.dropout
+        extra.setdefault("source", os.path.basename(args.weights))
+        print(json.dumps(publish(args.root, args.weights, extra, activate=not args.no_activate, members=args.member), indent=2))
+    elif args.command == "list":
+        current = read_current(args.root)
+        for manifest in list_versions(args.root):
+            print(("* " if manifest["version"] == current else "  ") + manifest["version"], manifest.get("source", ""))
+    else:
+        if not os.path.exists(os.path.join(args.root, args.version, "manifest.json")):
+            parser.error(f"unknown version {args.version}")
+        write_current(args.root, args.version)
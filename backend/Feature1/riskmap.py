@@ -0,0 +1,99 @@
+import os
+import json
+import time
+import numpy as np
+
+# ------- Precomputed site risk map -------
+# Artifact layout (written by machinelearning.py or build/save below):
+#   <name>.npy  : float16 array [classes, H, W] of per-cell class probabilities
+#   <name>.json : {"grid_size", "bounds": {x_min, x_max, y_min, y_max}, "class_labels", ...}
+
+def build_risk_map(model, feature_grid, device="cpu"):
+    """
+    Run the full site grid through the CNN once.
+    feature_grid: float32 array [channels, H, W] (training preprocessing)
+    Returns: float32 array [classes, H, W] of class probabilities
+    """
+    import torch
+
+    with torch.no_grad():
+        _, probs = model(torch.as_tensor(feature_grid, dtype=torch.float32).unsqueeze(0).to(device))
+    return probs.squeeze(0).cpu().numpy()
+
+def save_risk_map(path, probs, bounds, class_labels, source=None):
+    """
+    Write the .json sidecar, then the .npy probabilities next to it. Each file is
+    replaced atomically, so a running API that has the old map memory-mapped keeps
+    reading it until it sees the new .npy (it reloads on mtime).
+    """
+    base, _ = os.path.splitext(path)
+    meta = {
+        "grid_size": int(probs.shape[-1]),
+        "bounds": {k: float(v) for k, v in bounds.items()},
+        "class_labels": {str(k): v for k, v in class_labels.items()},
+        "created_at": time.time(),
+        "source": source,
+    }
+    with open(base + ".json.tmp", "w") as f:
+        json.dump(meta, f, indent=2)
+    os.replace(base + ".json.tmp", base + ".json")
+    with open(base + ".npy.tmp", "wb") as f:
+        np.save(f, np.asarray(probs, dtype=np.float16))
+    os.replace(base + ".npy.tmp", base + ".npy")
+    return base + ".npy"
+
+class RiskMap:
+    """Memory-mapped risk map; every lookup is an array read, not a forward pass"""
+
+    def __init__(self, path):
+        base, _ = os.path.splitext(path)
+        self.path = base + ".npy"
+        self.probs = np.load(self.path, mmap_mode="r")  # [classes, H, W]
+        with open(base + ".json") as f:
+            self.meta = json.load(f)
+        self.bounds = self.meta["bounds"]
+        self.class_labels = {int(k): v for k, v in self.meta["class_labels"].items()}
+        _, self.height, self.width = self.probs.shape
+
+    def to_grid(self, x, y):
+        """Map X/Y in metres to grid indices (same scaling as training map_to_grid)"""
+        b = self.bounds
+        grid_x = int((x - b["x_min"]) / max(b["x_max"] - b["x_min"], 1e-12) * (self.width - 1))
+        grid_y = int((y - b["y_min"]) / max(b["y_max"] - b["y_min"], 1e-12) * (self.height - 1))
+        return min(max(grid_x, 0), self.width - 1), min(max(grid_y, 0), self.height - 1)
+
+    def cell(self, grid_y, grid_x):
+        if not (0 <= grid_y < self.height and 0 <= grid_x < self.width):
+            raise IndexError(f"Cell ({grid_x}, {grid_y}) is outside the {self.width}x{self.height} map")
+        probs = np.asarray(self.probs[:, grid_y, grid_x], dtype=np.float32)
+        pred_class = int(np.argmax(probs))
+        return {
+            "risk_label": self.class_labels.get(pred_class, "Unknown"),
+            "confidence": float(probs[pred_class]),
+            "probabilities": {self.class_labels.get(i, str(i)): float(p) for i, p in enumerate(probs)},
+            "grid_position": {"x": grid_x, "y": grid_y},
+        }
+
+    def window(self, y0, x0, y1, x1):
+        """Inclusive cell window, clipped to the map; returns (bounds, probs [classes, h, w])"""
+        y0, y1 = sorted((max(y0, 0), min(y1, self.height - 1)))
+        x0, x1 = sorted((max(x0, 0), min(x1, self.width - 1)))
+        return (y0, x0, y1, x1), np.asarray(self.probs[:, y0:y1 + 1, x0:x1 + 1], dtype=np.float32)
+
+    def tile(self):
+        return np.asarray(self.probs, dtype=np.float32)
+
+if __name__ == "__main__":
+    # Generate a map on demand from a saved feature grid.
+    # Run from backend/: python -m Feature1.riskmap feature_grid.npy bounds.json [risk_map.npy]
+    # bounds.json may be a plain {x_min, x_max, y_min, y_max} dict or an existing risk map sidecar
+    import sys
+    from .logic import model, CLASS_LABELS
+
+    feature_grid = np.load(sys.argv[1])
+    with open(sys.argv[2]) as f:
+        bounds = json.load(f)
+    bounds = bounds.get("bounds", bounds)
+    out = sys.argv[3] if len(sys.argv) > 3 else "risk_map.npy"
+    probs = build_risk_map(model, feature_grid)
+    print(f"Saved risk map to {save_risk_map(out, probs, bounds, CLASS_LABELS, source=sys.argv[1])}")
@@ -0,0 +1,121 @@
+import numpy as np
+import torch
+
+from .pointeval import constant_windows, fold_conv_bn
+
+# ------- Uncertainty estimates -------
+# K stochastic passes (MC-dropout) or K ensemble members for every requested
+# cell, run as ONE batched pass instead of K sequential ones. Like PointEvaluator
+# it only evaluates the 5x5 receptive-field window around each cell (the rest of
+# the 64x64 grid cannot change that cell's output), with BatchNorm folded in and
+# the convolutions written as im2col matmuls.
+#   mc_dropout : conv1 runs once per cell; its output is repeated into a
+#                [K*N, 16*9] batch and conv2/conv3 run on that batch with
+#                independent dropout masks on the hidden activations
+#   ensemble   : the members' weights are stacked into [K, in, out] matrices,
+#                so every layer is one batched matmul over all members
+# MC-dropout only means something for weights trained with dropout (manifest
+# "dropout", ROCKFALL_DROPOUT in machinelearning.py) and runs at that rate; the
+# registry refuses it otherwise. An ensemble (manifest "ensemble", e.g. sweep.py
+# seeds) works for any weights.
+
+UNCERTAINTY_METHODS = ("mc_dropout", "ensemble")
+
+class UncertaintyEstimator:
+    """
+    models: one SimpleCNN (MC-dropout) or the members of an ensemble (same widths)
+    samples: stochastic passes per cell for MC-dropout (an ensemble uses one per member)
+    dropout: MC-dropout probability on the conv1/conv2 activations (the training rate)
+    """
+
+    def __init__(self, models, samples=32, dropout=0.1):
+        self.method = "ensemble" if len(models) > 1 else "mc_dropout"
+        self.samples = len(models) if self.method == "ensemble" else samples
+        self.dropout = dropout
+        layers = []
+        for model in models:
+            model = model.cpu().eval()
+            w1, b1 = fold_conv_bn(model.conv1, model.bn1)
+            w2, b2 = fold_conv_bn(model.conv2, model.bn2)
+            with torch.no_grad():
+                w3 = model.conv3.weight[:, :, 0, 0].float().cpu().numpy()
+                b3 = model.conv3.bias.float().cpu().numpy()
+            # im2col layouts as in PointEvaluator: [in * ky * kx, out]
+            layers.append((w1.reshape(w1.shape[0], -1).T, b1, w2.reshape(w2.shape[0], -1).T, b2, w3.T, b3))
+        # Stacked per member: weights [K, in, out], biases [K, 1, out]
+        self.w1, self.b1, self.w2, self.b2, self.w3, self.b3 = (
+            torch.from_numpy(np.ascontiguousarray(np.stack(group))) for group in zip(*layers)
+        )
+        self.b1, self.b2, self.b3 = self.b1[:, None], self.b2[:, None], self.b3[:, None]
+        self.in_channels = self.w1.shape[1] // 9
+        self.classes = self.w3.shape[2]
+
+    def sample(self, feature_vectors, grid_y, grid_x, grid_size):
+        """
+        feature_vectors: float32 array [N, channels], each channel filled across the grid
+        grid_y, grid_x: int arrays [N] with the cell of interest
+        Returns: float32 array [K, N, classes], the softmax output of every pass
+        """
+        window, inside_y, inside_x = constant_windows(feature_vectors, grid_y, grid_x, grid_size)
+        n, k = len(window), self.samples
+        patches = np.lib.stride_tricks.sliding_window_view(window, (3, 3), axis=(2, 3))
+        patches = torch.from_numpy(np.ascontiguousarray(patches.transpose(0, 2, 3, 1, 4, 5).reshape(n * 9, -1)))
+        # conv1 outputs outside the grid are conv2's zero padding
+        inside = torch.from_numpy((inside_y[:, :, None] & inside_x[:, None, :]).reshape(n * 9, 1))
+        with torch.no_grad():
+            if self.method == "ensemble":
+                h1 = torch.relu(torch.matmul(patches, self.w1) + self.b1) * inside  # [K, N*9, 16]
+                h1 = h1.view(k, n, 9, -1).transpose(2, 3).reshape(k, n, -1)  # (channel, ky, kx) order
+                h2 = torch.relu(torch.bmm(h1, self.w2) + self.b2)  # [K, N, 32]
+                logits = torch.bmm(h2, self.w3) + self.b3
+            else:
+                h1 = torch.relu(patches @ self.w1[0] + self.b1[0]) * inside  # [N*9, 16], computed once
+                h1 = h1.view(n, 9, -1).transpose(1, 2).reshape(1, n, -1).expand(k, n, -1)
+                h1 = torch.dropout(h1, self.dropout, True)  # [K, N, 16*9], one mask per pass
+                h2 = torch.dropout(torch.relu(torch.matmul(h1, self.w2[0]) + self.b2[0]), self.dropout, True)
+                logits = torch.matmul(h2, self.w3[0]) + self.b3[0]
+            return torch.softmax(logits, dim=2).numpy()
+
+def summarize(samples, risk_class=1, interval=0.9):
+    """
+    samples: [K, N, classes] from UncertaintyEstimator.sample
+    Returns: mean class probabilities [N, classes], and for the risk class its
+    variance across passes [N] and the central `interval` range [N, 2]
+    """
+    mean = samples.mean(axis=0)
+    risk = samples[:, :, risk_class]
+    tail = (1.0 - interval) / 2 * 100
+    bounds = np.percentile(risk, [tail, 100 - tail], axis=0).T
+    return mean, risk.var(axis=0), bounds
+
+def check_parity(model, samples=256, grid_size=64, seed=0):
+    """
+    With dropout 0 every MC pass must equal the full forward pass, and an ensemble
+    of copies must agree with it too. Returns the max absolute probability difference.
+    """
+    rng = np.random.default_rng(seed)
+    in_channels = model.conv1.in_channels
+    vectors = rng.uniform(-1.0, 2.0, size=(samples, in_channels)).astype(np.float32)
+    grid_y = rng.integers(0, grid_size, size=samples)
+    grid_x = rng.integers(0, grid_size, size=samples)
+    grid_y[:4], grid_x[:4] = [0, 0, grid_size - 1, grid_size - 1], [0, grid_size - 1, 0, grid_size - 1]
+    grids = np.ascontiguousarray(np.broadcast_to(
+        vectors[:, :, None, None], (samples, in_channels, grid_size, grid_size)
+    ))
+    model = model.cpu().eval()
+    with torch.no_grad():
+        _, probs = model(torch.from_numpy(grids))
+    expected = probs[np.arange(samples), :, grid_y, grid_x].numpy()
+    worst = 0.0
+    for estimator in (UncertaintyEstimator([model], samples=4, dropout=0.0), UncertaintyEstimator([model] * 3)):
+        passes = estimator.sample(vectors, grid_y, grid_x, grid_size)
+        worst = max(worst, float(np.abs(passes - expected[None]).max()))
+    return worst
+
+if __name__ == "__main__":
+    # Run from backend/: python -m Feature1.uncertainty
+    from .logic import model
+
+    max_diff = check_parity(model)
+    print(f"Max |batched pass - full forward| probability difference: {max_diff:.2e}")
+    assert max_diff < 1e-5, "Batched uncertainty passes diverge from the full forward pass"
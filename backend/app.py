@@ -1,17 +1,39 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, validator
-from typing import Optional
+from typing import List, Optional, Union
+from contextlib import asynccontextmanager
 import os
+import hmac
+import json
+import asyncio
+import numpy as np
 from dotenv import load_dotenv
 
 # Load environment variables from .env file early
 load_dotenv()
 
 # Import your logic module
-from Feature1 import logic
+from Feature1 import bulk, logic, metrics
+from Feature1.jobs import ExplanationJobs, JobQueueFull
+from Feature1.riskmap import RiskMap
+from Feature1.registry import list_versions
+# API rock-type codes; each model version maps them to its own training encoding
+from Feature1.features import ROCK_TYPE_ENCODING, ROCK_TYPE_NAMES
+from Feature1.history import AssessmentHistory
 
-app = FastAPI(title="Rockfall Prediction API", version="1.0")
+@asynccontextmanager
+async def lifespan(app):
+    # Start accepting connections at once; torch import, model load and warmup
+    # happen on a background thread (/ready turns 200 when they are done)
+    logic.start_background_load()
+    yield
+    if assessment_history is not None:
+        assessment_history.close()  # write what is still queued
+
+app = FastAPI(title="Rockfall Prediction API", version="1.0", lifespan=lifespan)
 
 # Add CORS middleware to allow cross-origin requests
 app.add_middleware(
@@ -20,21 +42,68 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
-# Rock type encoding mapping (adjust based on your training data)
-ROCK_TYPE_ENCODING = {
-    "granite": 1,
-    "limestone": 2,
-    "sandstone": 3,
-    "shale": 4,
-    "quartzite": 5,
-    "slate": 6,
-    "marble": 7,
-    "basalt": 8,
-    "andesite": 9,
-    "other": 0
-}
+# Per-stage latency histograms, in-flight requests and optional Server-Timing headers
+# (ROCKFALL_TIMING_HEADERS=1, or send 'X-Request-Timing: 1' per request)
+app.add_middleware(metrics.MetricsMiddleware)
+
+# Scored /predict and /predict-stream assessments, queryable by area, proximity and time
+# (off unless ROCKFALL_HISTORY_DB names the SQLite file, e.g. under /var/lib)
+if os.environ.get("ROCKFALL_HISTORY_DB"):
+    assessment_history = AssessmentHistory(os.environ["ROCKFALL_HISTORY_DB"])
+else:
+    assessment_history = None
+
+def record_assessment(data_dict: dict, prediction: dict, explanation: dict):
+    """Queue an assessment for the history (written off the request path)"""
+    if assessment_history is None:
+        return
+    assessment_history.record(
+        x=data_dict["X"],
+        y=data_dict["Y"],
+        z=data_dict["Z"],
+        rock_type=ROCK_TYPE_NAMES.get(data_dict["Rock_Type_enc"], "other"),
+        ore_grade=data_dict["Ore_Grade (%)"],
+        tonnage=data_dict["Tonnage"],
+        risk_label=prediction["risk_label"],
+        confidence=prediction["confidence"],
+        explanation=explanation.get("explanation"),
+        explanation_source=explanation.get("explanation_source"),
+        model_version=prediction.get("model_version"),
+    )
+
+def explain_and_record(prediction_result, input_features):
+    """Background explanation job; the assessment is recorded once its explanation exists"""
+    result = logic.get_explanation_from_groq(prediction_result, input_features)
+    record_assessment(input_features, prediction_result, result)
+    return result
+
+# Background worker pool for explanations requested with explanation_mode=async;
+# beyond EXPLANATION_MAX_PENDING queued or running jobs, async requests get a 503
+explanation_jobs = ExplanationJobs(
+    explain_and_record,
+    max_workers=int(os.environ.get("EXPLANATION_WORKERS", "4")),
+    max_pending=int(os.environ.get("EXPLANATION_MAX_PENDING", "1000")),
+)
+
+# Precomputed site risk map (written by machineLearning/machinelearning.py)
+RISK_MAP_PATH = os.environ.get(
+    "ROCKFALL_RISK_MAP", os.path.join(os.path.dirname(os.path.abspath(__file__)), "risk_map.npy")
+)
+_risk_map = None
+
+def get_risk_map() -> RiskMap:
+    """Load the memory-mapped risk map, reloading it when the file is regenerated"""
+    global _risk_map
+    try:
+        mtime = os.path.getmtime(RISK_MAP_PATH)
+    except OSError:
+        raise HTTPException(status_code=404, detail=f"Risk map not available: {RISK_MAP_PATH}")
+    if _risk_map is None or _risk_map[0] != mtime:
+        _risk_map = (mtime, RiskMap(RISK_MAP_PATH))
+    return _risk_map[1]
 
 # Pydantic model for input validation
 class RockfallInput(BaseModel):
@@ -66,11 +135,110 @@ class RockfallInput(BaseModel):
             raise ValueError('Tonnage must be positive')
         return v
 
+# Maximum number of blocks accepted by /predict-batch in one request
+MAX_BATCH_ITEMS = 4096
+
+class RockfallBatchInput(BaseModel):
+    items: List[RockfallInput] = Field(..., description="Mining blocks to score in one pass")
+
+    @validator('items')
+    def valid_batch_size(cls, v):
+        if not v:
+            raise ValueError('items must contain at least one block')
+        if len(v) > MAX_BATCH_ITEMS:
+            raise ValueError(f'At most {MAX_BATCH_ITEMS} items are allowed per batch')
+        return v
+
+# RockfallInput fields /predict-sweep knows, mapped to their logic.py input keys.
+# Which of them a sweep may vary depends on the active model version: X/Y plus
+# its features (sweep_parameters); any other field would give a flat curve.
+SWEEP_PARAMETERS = {
+    "X": "X",
+    "Y": "Y",
+    "Z": "Z",
+    "Rock_Type": "Rock_Type_enc",
+    "Ore_Grade (%)": "Ore_Grade (%)",
+    "Tonnage": "Tonnage",
+    "Ore_Value (¥/tonne)": "Ore_Value (¥/tonne)",
+    "Mining_Cost (¥)": "Mining_Cost (¥)",
+    "Processing_Cost (¥)": "Processing_Cost (¥)",
+}
+
+def sweep_parameters(version) -> list:
+    """SWEEP_PARAMETERS names that feed a model version (X/Y plus its features)"""
+    return [name for name, key in SWEEP_PARAMETERS.items() if key in version.features.columns]
+
+# Maximum number of points (product of all range lengths) in one sweep
+MAX_SWEEP_POINTS = MAX_BATCH_ITEMS
+
+class SweepRange(BaseModel):
+    parameter: str = Field(..., example="Z", description=f"One of {', '.join(SWEEP_PARAMETERS)}")
+    start: Optional[float] = Field(None, example=0.0, description="First value of an evenly spaced range")
+    stop: Optional[float] = Field(None, example=200.0, description="Last value of an evenly spaced range (inclusive)")
+    steps: Optional[int] = Field(None, example=21, description="Number of values from start to stop")
+    values: Optional[List[Union[float, str]]] = Field(None, description="Explicit values instead of start/stop/steps (rock type names for Rock_Type)")
+
+    @validator('parameter')
+    def valid_parameter(cls, v):
+        if v not in SWEEP_PARAMETERS:
+            raise ValueError(f"parameter must be one of {', '.join(SWEEP_PARAMETERS)}")
+        return v
+
+    def expand(self) -> list:
+        """Values of this range, encoded like to_logic_input does"""
+        if self.values is not None:
+            values = self.values
+        elif None in (self.start, self.stop, self.steps):
+            raise ValueError(f"{self.parameter}: give either values or start, stop and steps")
+        elif not 1 <= self.steps <= MAX_SWEEP_POINTS:
+            raise ValueError(f"{self.parameter}: steps must be between 1 and {MAX_SWEEP_POINTS}")
+        else:
+            values = np.linspace(self.start, self.stop, self.steps).tolist()
+        if not values:
+            raise ValueError(f"{self.parameter}: the range is empty")
+        if self.parameter == "Rock_Type":
+            return [encode_rock_type(str(v)) for v in values]
+        try:
+            values = [float(v) for v in values]
+        except ValueError:
+            raise ValueError(f"{self.parameter}: values must be numbers")
+        if self.parameter == "Ore_Grade (%)" and not all(0 <= v <= 100 for v in values):
+            raise ValueError('Ore grade must be between 0 and 100')
+        if self.parameter == "Tonnage" and not all(v > 0 for v in values):
+            raise ValueError('Tonnage must be positive')
+        return values
+
+class RockfallSweepInput(BaseModel):
+    base: RockfallInput = Field(..., description="Block whose other parameters stay fixed")
+    ranges: List[SweepRange] = Field(..., description="One range (response curve) or two (response surface)")
+
+    @validator('ranges')
+    def valid_ranges(cls, v):
+        if not 1 <= len(v) <= 2:
+            raise ValueError('ranges must contain one or two parameter ranges')
+        if len({r.parameter for r in v}) != len(v):
+            raise ValueError('ranges must vary different parameters')
+        return v
+
 def encode_rock_type(rock_type: str) -> int:
     """Convert rock type string to encoded integer"""
     normalized = rock_type.strip().lower()
     return ROCK_TYPE_ENCODING.get(normalized, 0)  # Default to 0 for unknown types
 
+def to_logic_input(input_data: RockfallInput) -> dict:
+    """Convert Pydantic model to dict with keys matching logic.py input"""
+    return {
+        "X": input_data.X,
+        "Y": input_data.Y,
+        "Z": input_data.Z,
+        "Rock_Type_enc": encode_rock_type(input_data.Rock_Type),  # Use encoded version
+        "Ore_Grade (%)": input_data.Ore_Grade_percent,
+        "Tonnage": input_data.Tonnage,
+        "Ore_Value (¥/tonne)": input_data.Ore_Value_per_tonne,
+        "Mining_Cost (¥)": input_data.Mining_Cost,
+        "Processing_Cost (¥)": input_data.Processing_Cost,
+    }
+
 @app.get("/")
 def root():
     return {
@@ -88,28 +256,42 @@ def get_rock_types():
     }
 
 @app.post("/predict", summary="Predict rockfall risk for a mining block")
-def predict_rockfall(input_data: RockfallInput):
+def predict_rockfall(
+    input_data: RockfallInput,
+    explanation_mode: str = Query(
+        "sync",
+        pattern="^(sync|async)$",
+        description="sync waits for the Groq explanation; async returns an explanation job id",
+    ),
+    uncertainty: bool = Query(
+        False, description="Also estimate the spread of the risk probability (ensemble or MC-dropout; "
+        "409 if the model version supports neither)",
+    ),
+):
+    metrics.mark_validated()
     try:
-        # Encode rock type to integer
-        rock_type_encoded = encode_rock_type(input_data.Rock_Type)
-        
-        # Convert Pydantic model to dict with keys matching your logic.py input
-        data_dict = {
-            "X": input_data.X,
-            "Y": input_data.Y,
-            "Z": input_data.Z,
-            "Rock_Type_enc": rock_type_encoded,  # Use encoded version
-            "Ore_Grade (%)": input_data.Ore_Grade_percent,
-            "Tonnage": input_data.Tonnage,
-            "Ore_Value (¥/tonne)": input_data.Ore_Value_per_tonne,
-            "Mining_Cost (¥)": input_data.Mining_Cost,
-            "Processing_Cost (¥)": input_data.Processing_Cost,
-        }
+        # Convert Pydantic model to dict (rock type encoded to integer)
+        data_dict = to_logic_input(input_data)
+        rock_type_encoded = data_dict["Rock_Type_enc"]
         
-        # Call your Groq.ai integrated logic inference function
-        result = logic.predict_rockfall_with_groq(data_dict)
+        if explanation_mode == "async":
+            # Prediction only; the Groq explanation runs on the background pool
+            prediction = logic.predict_rockfall(data_dict, uncertainty=uncertainty)
+            job_id = explanation_jobs.submit(prediction, data_dict)
+            result = {
+                **prediction,
+                "explanation": None,
+                "key_factors": logic.extract_key_factors(data_dict, prediction),
+                "safety_recommendations": logic.get_safety_recommendations(prediction["risk_label"]),
+                "input_summary": logic.summarize_input(data_dict),
+            }
+        else:
+            # Call your Groq.ai integrated logic inference function
+            job_id = None
+            result = logic.predict_rockfall_with_groq(data_dict, uncertainty=uncertainty)
+            record_assessment(data_dict, result, result)
         
-        return {
+        response = {
             "success": True,
             "prediction": {
                 "risk_label": result["risk_label"],
@@ -117,16 +299,29 @@ def predict_rockfall(input_data: RockfallInput):
                 "grid_position": result.get("grid_position", {}),
             },
             "explanation": result.get("explanation", ""),
+            "explanation_source": result.get("explanation_source"),
             "key_factors": result.get("key_factors", []),
             "safety_recommendations": result.get("safety_recommendations", []),
             "input_summary": result.get("input_summary", {}),
             "metadata": {
                 "rock_type_original": input_data.Rock_Type,
                 "rock_type_encoded": rock_type_encoded,
-                "model_version": "1.0"
+                "model_version": result.get("model_version")
             }
         }
+        if "uncertainty" in result:
+            response["prediction"]["uncertainty"] = result["uncertainty"]
+        if job_id is not None:
+            response["explanation_job_id"] = job_id
+            response["explanation_url"] = f"/explanations/{job_id}"
+        return response
         
+    except logic.ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except logic.UncertaintyUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except JobQueueFull as e:
+        raise HTTPException(status_code=503, detail=f"Explanation queue is full: {str(e)}", headers={"Retry-After": "5"})
     except ValueError as ve:
         raise HTTPException(status_code=400, detail=f"Input validation error: {str(ve)}")
     except FileNotFoundError as fe:
@@ -134,43 +329,497 @@ def predict_rockfall(input_data: RockfallInput):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
+def sse_event(event, data):
+    """One server-sent event frame"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/predict-stream", summary="Predict, then stream the explanation as server-sent events")
+async def predict_rockfall_stream(input_data: RockfallInput):
+    """
+    Events, in order:
+      prediction : risk_label, confidence, grid_position (as soon as the CNN is done)
+      token      : {"text": ...} explanation chunks as the LLM generates them
+      done       : explanation_source, key_factors, safety_recommendations, input_summary, metadata
+      error      : {"detail": ...} if something fails after the stream has started
+    """
+    metrics.mark_validated()
+    try:
+        data_dict = to_logic_input(input_data)
+        # CNN inference is blocking, keep it off the event loop
+        prediction = await run_in_threadpool(logic.predict_rockfall, data_dict)
+    except logic.ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"Input validation error: {str(ve)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
+
+    async def events():
+        yield sse_event("prediction", {
+            "risk_label": prediction["risk_label"],
+            "confidence": prediction["confidence"],
+            "grid_position": prediction.get("grid_position", {}),
+        })
+        try:
+            parts = []
+            async for kind, payload in logic.stream_explanation_from_groq(prediction, data_dict):
+                if kind == "token":
+                    parts.append(payload)
+                    yield sse_event("token", {"text": payload})
+                else:
+                    record_assessment(data_dict, prediction, {**payload, "explanation": "".join(parts)})
+                    yield sse_event("done", {
+                        **payload,
+                        "input_summary": logic.summarize_input(data_dict),
+                        "metadata": {
+                            "rock_type_original": input_data.Rock_Type,
+                            "rock_type_encoded": data_dict["Rock_Type_enc"],
+                            "model_version": prediction.get("model_version")
+                        }
+                    })
+        except Exception as e:
+            yield sse_event("error", {"detail": f"Explanation failed: {str(e)}"})
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        # no-transform / X-Accel-Buffering stop proxies from buffering the stream
+        headers={"Cache-Control": "no-cache, no-transform", "X-Accel-Buffering": "no"},
+    )
+
 @app.post("/predict-simple", summary="Simple prediction endpoint (basic output)")
 def predict_rockfall_simple(input_data: RockfallInput):
     """Simplified endpoint that returns only risk label and confidence"""
+    metrics.mark_validated()
     try:
-        rock_type_encoded = encode_rock_type(input_data.Rock_Type)
-        
-        data_dict = {
-            "X": input_data.X,
-            "Y": input_data.Y,
-            "Z": input_data.Z,
-            "Rock_Type_enc": rock_type_encoded,
-            "Ore_Grade (%)": input_data.Ore_Grade_percent,
-            "Tonnage": input_data.Tonnage,
-            "Ore_Value (¥/tonne)": input_data.Ore_Value_per_tonne,
-            "Mining_Cost (¥)": input_data.Mining_Cost,
-            "Processing_Cost (¥)": input_data.Processing_Cost,
-        }
+        data_dict = to_logic_input(input_data)
         
-        result = logic.predict_rockfall_with_groq(data_dict)
+        # Prediction only: this endpoint never returns the explanation
+        result = logic.predict_rockfall(data_dict)
         
         return {
             "risk_label": result["risk_label"],
             "confidence": result["confidence"]
         }
         
+    except logic.ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
-# Health check endpoint
+@app.post("/predict-batch", summary="Predict rockfall risk for many mining blocks at once")
+def predict_rockfall_batch(
+    batch: RockfallBatchInput,
+    uncertainty: bool = Query(False, description="Add ensemble / MC-dropout uncertainty to every prediction "
+                              "(409 if the model version supports neither)"),
+):
+    """Scores all blocks with one vectorized forward pass (no explanations)"""
+    metrics.mark_validated()
+    try:
+        data_dicts = [to_logic_input(item) for item in batch.items]
+        predictions = logic.predict_batch(data_dicts, uncertainty=uncertainty)
+        
+        return {
+            "success": True,
+            "count": len(predictions),
+            "predictions": predictions,
+            "metadata": {
+                "model_version": predictions[0]["model_version"] if predictions else logic.model_status["version"]
+            }
+        }
+        
+    except logic.ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except logic.UncertaintyUnavailable as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"Input validation error: {str(ve)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {str(e)}")
+
+@app.post("/predict-sweep", summary="What-if sweep: risk over one or two parameter ranges")
+def predict_rockfall_sweep(sweep: RockfallSweepInput):
+    """
+    Scores the Cartesian product of the ranges around the base block in one
+    vectorized pass (no explanations). risk_probability is indexed
+    [first range] or [first range][second range]. Only parameters the active
+    model version reads can be swept (400 otherwise, listing them).
+    """
+    metrics.mark_validated()
+    try:
+        axes = [(SWEEP_PARAMETERS[r.parameter], r.expand()) for r in sweep.ranges]
+        points = 1
+        for _, values in axes:
+            points *= len(values)
+        if points > MAX_SWEEP_POINTS:
+            raise ValueError(f"The sweep has {points} points; at most {MAX_SWEEP_POINTS} are allowed")
+
+        with logic.acquire_model() as version:
+            sweepable = sweep_parameters(version)
+            unused = [r.parameter for r in sweep.ranges if r.parameter not in sweepable]
+            if unused:
+                raise ValueError(
+                    f"Model version {version.version} does not use {', '.join(unused)}; "
+                    f"sweepable parameters: {', '.join(sweepable)}"
+                )
+            result = logic.predict_sweep(to_logic_input(sweep.base), axes, version)
+
+        return {
+            "success": True,
+            "parameters": [
+                {"name": r.parameter, "values": r.values if r.values is not None else values}
+                for r, (_, values) in zip(sweep.ranges, axes)
+            ],
+            "shape": result["shape"],
+            "risk_probability": result["risk_probability"].astype(float).round(4).tolist(),
+            "predicted_class": result["predicted_class"].tolist(),
+            "class_labels": logic.CLASS_LABELS,
+            "metadata": {
+                "points": points,
+                "model_version": result["model_version"]
+            }
+        }
+
+    except logic.ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"Input validation error: {str(ve)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Sweep prediction failed: {str(e)}")
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse whose body is produced while the request body is still
+    being read. The stock class listens for client disconnects on receive()
+    while streaming, which would swallow the rest of the upload; here the
+    generator notices a disconnect itself (request.stream() raises ClientDisconnect).
+    """
+
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+# Bytes of CSV parsed and scored per batch by /predict-csv (about 10k rows per MiB)
+CSV_CHUNK_BYTES = int(os.environ.get("ROCKFALL_CSV_CHUNK_BYTES", str(1 << 20)))
+
+@app.post("/predict-csv", summary="Score a whole block-model CSV upload, streamed back as NDJSON")
+async def predict_rockfall_csv(request: Request):
+    """
+    Request body: CSV with the columns the active model version reads, named like
+    the /predict fields (Rock_Type, X, Y, Ore_Grade (%), Tonnage, Ore_Value (¥/tonne),
+    plus Z or Mining_Cost (¥) / Processing_Cost (¥) where the version uses them;
+    GET /models lists them as current.columns). Other columns are ignored, e.g.
+      curl -T blocks.csv -X POST -H 'Content-Type: text/csv' http://localhost:8000/predict-csv
+    Response: one JSON line per row, in input order (see bulk.score_csv_chunk), then
+    {"summary": {...}}. Rows are scored in chunks as the upload arrives, so a client
+    that reads while uploading gets results before it finishes; a failure
+    mid-stream ends it with {"error": ...}.
+    """
+    metrics.mark_validated()
+    try:
+        await run_in_threadpool(logic.ensure_model)
+    except logic.ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+
+    # Read up to the header line first, so a wrong file still gets a plain 400
+    body = request.stream()
+    chunker = bulk.CsvChunker(CSV_CHUNK_BYTES)
+    pending = []
+    finished = True
+    async for data in body:
+        pending += chunker.feed(data)
+        if chunker.header is not None:
+            finished = False
+            break
+    if finished:
+        pending += chunker.finish()
+    if not chunker.header.strip():
+        raise HTTPException(status_code=400, detail="Input validation error: the CSV is empty")
+    with logic.acquire_model() as version:
+        missing = chunker.missing_columns(bulk.bulk_columns(version.features))
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Input validation error: missing columns {missing}")
+
+    async def chunks():
+        for data in pending:
+            yield data
+        if not finished:
+            async for data in body:
+                for chunk in chunker.feed(data):
+                    yield chunk
+            for chunk in chunker.finish():
+                yield chunk
+
+    spool = bulk.OutputSpool()
+
+    async def score():
+        rows = invalid = 0
+        try:
+            # One model version for the whole file, even across a hot swap
+            with logic.acquire_model() as version:
+                async for data in chunks():
+                    out, count, bad = await run_in_threadpool(
+                        bulk.score_csv_chunk, data, rows, ROCK_TYPE_ENCODING, version
+                    )
+                    rows += count
+                    invalid += bad
+                    await run_in_threadpool(spool.append, out)
+                    spool.notify()
+            summary = {"summary": {
+                "rows": rows,
+                "scored_rows": rows - invalid,
+                "invalid_rows": invalid,
+                "model_version": version.version
+            }}
+            await run_in_threadpool(spool.append, (json.dumps(summary) + "\n").encode())
+        except Exception as e:
+            error = {"error": f"Bulk scoring failed after {rows} rows: {str(e)}"}
+            await run_in_threadpool(spool.append, (json.dumps(error) + "\n").encode())
+        finally:
+            spool.notify(done=True)
+
+    async def lines():
+        task = asyncio.create_task(score())
+        try:
+            async for data in spool.chunks():
+                yield data
+        finally:
+            # Client gone or stream finished: stop scoring before the spool file is closed
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+            spool.close()
+
+    return UploadStreamingResponse(lines(), media_type="application/x-ndjson")
+
+# Rows accepted by /predict-columnar in one body (about 25 MB as raw float32)
+MAX_COLUMNAR_ROWS = int(os.environ.get("ROCKFALL_MAX_COLUMNAR_ROWS", "1000000"))
+RAW_CONTENT_TYPE = "application/octet-stream"
+ARROW_CONTENT_TYPE = "application/vnd.apache.arrow.stream"
+
+@app.post("/predict-columnar", summary="Batch prediction from a columnar binary body (raw float32 or Arrow IPC)")
+async def predict_rockfall_columnar(
+    request: Request,
+    columns: Optional[str] = Query(
+        None, description="Raw bodies: comma-separated float32 column names in body order "
+        "(default X,Y,Z,Ore_Grade (%),Tonnage,Ore_Value (¥/tonne))",
+    ),
+):
+    """
+    Content-Type application/octet-stream: little-endian float32 [N, K] matrix,
+    its K columns listed in `columns`, followed by uint8 [N] rock-type codes from
+    /rock-types. Response: float32 [N] risk probabilities, then uint8 [N]
+    predicted classes; X-Rows / X-Model-Version headers.
+    Content-Type application/vnd.apache.arrow.stream: Arrow IPC in and out
+    (needs pyarrow), columns named like the CSV. See Feature1/bulk.py for both layouts.
+    Either way the body must carry every column the active model version reads
+    (GET /models, current.columns), cost columns included; 400 otherwise.
+    The body is validated with the /predict checks, column-wise; any bad row
+    rejects the request with 400.
+    """
+    metrics.mark_validated()
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in (RAW_CONTENT_TYPE, ARROW_CONTENT_TYPE):
+        raise HTTPException(status_code=415, detail=f"Content-Type must be {RAW_CONTENT_TYPE} or {ARROW_CONTENT_TYPE}")
+    arrow = content_type == ARROW_CONTENT_TYPE
+    try:
+        layout = bulk.raw_layout(columns)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"Input validation error: {str(ve)}")
+    if arrow:
+        try:
+            import pyarrow  # noqa: F401  (optional dependency, only needed for Arrow bodies)
+        except ImportError:
+            raise HTTPException(status_code=415, detail="Arrow bodies need pyarrow installed on the server")
+    elif int(request.headers.get("content-length") or 0) > MAX_COLUMNAR_ROWS * bulk.raw_row_bytes(layout):
+        raise HTTPException(status_code=413, detail=f"At most {MAX_COLUMNAR_ROWS} rows are allowed per request")
+    body = await request.body()
+    try:
+        probs, grid_x, grid_y, model_version = await run_in_threadpool(
+            bulk.score_columnar, body, arrow, ROCK_TYPE_ENCODING, MAX_COLUMNAR_ROWS, layout
+        )
+        headers = {"X-Rows": str(len(probs)), "X-Model-Version": model_version}
+        if arrow:
+            content = await run_in_threadpool(bulk.encode_arrow_result, probs, grid_x, grid_y, model_version)
+            return Response(content, media_type=ARROW_CONTENT_TYPE, headers=headers)
+        return Response(bulk.encode_raw_result(probs), media_type=RAW_CONTENT_TYPE, headers=headers)
+
+    except logic.ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=f"Input validation error: {str(ve)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Columnar prediction failed: {str(e)}")
+
+@app.get("/explanations/{job_id}", summary="Fetch an explanation produced in the background")
+def get_explanation(job_id: str):
+    job = explanation_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Explanation job not found: {job_id}")
+    
+    response = {
+        "job_id": job_id,
+        "status": job["status"],
+    }
+    if job["status"] == "completed":
+        response.update(job["result"])
+    elif job["status"] == "failed":
+        response["error"] = job["error"]
+    return response
+
+# Shared secret for the model admin endpoints (X-Admin-Token header); they are
+# disabled when it is not set
+ADMIN_TOKEN = os.environ.get("ROCKFALL_ADMIN_TOKEN")
+
+@app.get("/models", summary="Active, draining and published model versions")
+def list_models():
+    return {
+        **logic.registry.stats(),
+        "published": [m["version"] for m in list_versions(logic.MODEL_REGISTRY_DIR)],
+        "status": logic.model_status,
+    }
+
+@app.post("/models/reload", summary="Load a model version next to the active one and swap it in")
+def reload_models(version: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """Without `version`, loads whatever the registry's CURRENT file points at"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Model reload is disabled (set ROCKFALL_ADMIN_TOKEN)")
+    if not hmac.compare_digest(x_admin_token or "", ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    try:
+        activated = logic.reload_model(version)
+    except logic.ModelNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except FileNotFoundError as fe:
+        raise HTTPException(status_code=404, detail=f"Model version not found: {str(fe)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model reload failed: {str(e)}")
+    return {"activated": activated, "active_version": logic.registry.current.version}
+
+@app.get("/scheduler/stats", summary="Micro-batching scheduler metrics")
+def scheduler_stats():
+    """Batch-size and queue-wait metrics of the /predict request coalescer"""
+    if logic.scheduler is None:
+        return {"enabled": False}
+    return {"enabled": True, **logic.scheduler.stats()}
+
+@app.get("/risk-map/cell", summary="Risk for one cell of the precomputed site map")
+def risk_map_cell(
+    x: Optional[float] = Query(None, description="X coordinate in meters"),
+    y: Optional[float] = Query(None, description="Y coordinate in meters"),
+    grid_x: Optional[int] = Query(None, ge=0),
+    grid_y: Optional[int] = Query(None, ge=0),
+):
+    risk_map = get_risk_map()
+    if grid_x is None or grid_y is None:
+        if x is None or y is None:
+            raise HTTPException(status_code=400, detail="Provide either x and y, or grid_x and grid_y")
+        grid_x, grid_y = risk_map.to_grid(x, y)
+    try:
+        return risk_map.cell(grid_y, grid_x)
+    except IndexError as ie:
+        raise HTTPException(status_code=400, detail=str(ie))
+
+@app.get("/risk-map/window", summary="Risk for a bounding box of the precomputed site map")
+def risk_map_window(
+    x_min: float = Query(..., description="Bounding box in meters"),
+    y_min: float = Query(...),
+    x_max: float = Query(...),
+    y_max: float = Query(...),
+):
+    risk_map = get_risk_map()
+    gx0, gy0 = risk_map.to_grid(x_min, y_min)
+    gx1, gy1 = risk_map.to_grid(x_max, y_max)
+    (y0, x0, y1, x1), probs = risk_map.window(gy0, gx0, gy1, gx1)
+    return {
+        "grid_window": {"x0": x0, "y0": y0, "x1": x1, "y1": y1},
+        "risk_probability": probs[1].round(4).tolist(),
+        "risk_label": probs.argmax(axis=0).tolist(),
+        "class_labels": risk_map.class_labels,
+    }
+
+@app.get("/risk-map", summary="Whole precomputed site risk map as one tile")
+def risk_map_tile(format: str = Query("json", pattern="^(json|npy)$")):
+    risk_map = get_risk_map()
+    if format == "npy":
+        # Raw float16 [classes, H, W] array, as stored on disk
+        with open(risk_map.path, "rb") as f:
+            return Response(content=f.read(), media_type="application/octet-stream")
+    probs = risk_map.tile()
+    return {
+        "grid_size": risk_map.meta["grid_size"],
+        "bounds": risk_map.bounds,
+        "class_labels": risk_map.class_labels,
+        "risk_probability": probs[1].round(4).tolist(),
+        "risk_label": probs.argmax(axis=0).tolist(),
+    }
+
+# Most rows any /assessments query returns
+MAX_HISTORY_ROWS = 10000
+
+def get_history() -> AssessmentHistory:
+    if assessment_history is None:
+        raise HTTPException(status_code=404, detail="Assessment history is disabled (set ROCKFALL_HISTORY_DB to enable it)")
+    return assessment_history
+
+@app.get("/assessments/recent", summary="Most recent scored assessments, newest first")
+def recent_assessments(limit: int = Query(50, ge=1, le=MAX_HISTORY_ROWS)):
+    return {"assessments": get_history().recent(limit)}
+
+@app.get("/assessments/bbox", summary="Scored assessments inside a bounding box")
+def assessments_in_bbox(
+    x_min: float = Query(..., description="Bounding box in meters"),
+    y_min: float = Query(...),
+    x_max: float = Query(...),
+    y_max: float = Query(...),
+    limit: int = Query(1000, ge=1, le=MAX_HISTORY_ROWS),
+):
+    if x_min > x_max or y_min > y_max:
+        raise HTTPException(status_code=400, detail="x_min/y_min must not exceed x_max/y_max")
+    rows, truncated = get_history().bbox(x_min, y_min, x_max, y_max, limit)
+    return {"assessments": rows, "truncated": truncated}
+
+@app.get("/assessments/nearest", summary="Scored assessments nearest to a point")
+def nearest_assessments(
+    x: float = Query(..., description="X coordinate in meters"),
+    y: float = Query(..., description="Y coordinate in meters"),
+    n: int = Query(10, ge=1, le=1000),
+):
+    return {"assessments": get_history().nearest(x, y, n)}
+
+@app.get("/assessments/stats", summary="Assessment history size and writer counters")
+def assessment_history_stats():
+    return get_history().stats()
+
+@app.get("/explanation-cache/stats", summary="Explanation cache hit/miss counters")
+def explanation_cache_stats():
+    if logic.explanation_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **logic.explanation_cache.stats()}
+
+@app.get("/metrics", summary="Prometheus metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+# Liveness: the process is up and serving (even while the model is still loading)
 @app.get("/health")
 def health_check():
     return {
         "status": "healthy",
         "message": "Rockfall Prediction API is running",
-        "model_loaded": os.path.exists("/home/lenovo/Desktop/OtherOpenSource/GeoGurdians-SIH/backend/rockfall_model.pt")
+        "model_loaded": logic.model_status["state"] in ("loaded", "ready"),
+        "model_state": logic.model_status["state"],
+        "model_file_present": os.path.exists(logic.MODEL_PATH)
     }
 
+# Readiness: 200 once the model is loaded and warmed up, 503 before (or if loading failed)
+@app.get("/ready")
+def readiness_check(response: Response):
+    ready = logic.is_ready()
+    if not ready:
+        response.status_code = 503
+    return {"ready": ready, "model_path": logic.MODEL_PATH, **logic.model_status}
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+Batch request formats: JSON /predict-batch (one RockfallInput per item) vs the
+raw float32 /predict-columnar body, through an in-process ASGI client.
+Run from backend/: python -m benchmarks.bench_columnar
+"""
+import asyncio
+import numpy as np
+import httpx
+
+from benchmarks.common import measure
+from benchmarks.bench_http import SAMPLE_REQUEST
+from Feature1 import bulk, logic
+
+def _payloads(n, encoding, seed=0):
+    rng = np.random.default_rng(seed)
+    # All numeric columns (bulk.NUMERIC_COLUMNS order), so any model version finds its features
+    matrix = np.stack([
+        rng.uniform(0, 1000, n), rng.uniform(0, 1000, n), rng.uniform(0, 300, n),
+        rng.uniform(0, 100, n), rng.uniform(0, 100, n), rng.uniform(1, 3000, n),
+        rng.uniform(0, 60, n), rng.uniform(0, 30, n),
+    ], axis=1).astype("<f4")
+    names = list(encoding)
+    codes = rng.integers(0, len(names), n)
+    items = [
+        dict(SAMPLE_REQUEST, **{
+            "X": float(x), "Y": float(y), "Z": float(z), "Ore_Grade (%)": float(grade),
+            "Ore_Value (¥/tonne)": float(value), "Tonnage": float(tonnage),
+            "Mining_Cost (¥)": float(mining), "Processing_Cost (¥)": float(processing), "Rock_Type": names[code],
+        })
+        for (x, y, z, grade, value, tonnage, mining, processing), code in zip(matrix.tolist(), codes)
+    ]
+    raw = matrix.tobytes() + np.array([encoding[names[c]] for c in codes], dtype=np.uint8).tobytes()
+    return {"items": items}, raw
+
+def run(batch_sizes=(256, 4096), repeats=20):
+    import app as app_module
+
+    logic.ensure_model()
+    loop = asyncio.new_event_loop()
+    client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app_module.app), base_url="http://bench")
+    results = []
+    try:
+        for n in batch_sizes:
+            batch_json, raw = _payloads(n, app_module.ROCK_TYPE_ENCODING)
+
+            def post_json():
+                response = loop.run_until_complete(client.post("/predict-batch", json=batch_json))
+                assert response.status_code == 200, response.text
+
+            def post_raw():
+                response = loop.run_until_complete(client.post(
+                    "/predict-columnar", content=raw, headers={"Content-Type": "application/octet-stream"},
+                    params={"columns": ",".join(bulk.NUMERIC_COLUMNS)},
+                ))
+                assert response.status_code == 200, response.text
+
+            json_latency = measure(post_json, repeats)
+            raw_latency = measure(post_raw, repeats)
+            results.append({
+                "batch_size": n,
+                "json": json_latency,
+                "columnar": raw_latency,
+                "json_rows_per_s": n / (json_latency["mean_ms"] / 1e3),
+                "columnar_rows_per_s": n / (raw_latency["mean_ms"] / 1e3),
+                "speedup": json_latency["mean_ms"] / raw_latency["mean_ms"],
+            })
+    finally:
+        loop.run_until_complete(client.aclose())
+        loop.close()
+    return {"cases": results}
+
+if __name__ == "__main__":
+    for case in run()["cases"]:
+        print(
+            f"batch {case['batch_size']:>5}: json {case['json']['mean_ms']:8.2f} ms  "
+            f"columnar {case['columnar']['mean_ms']:7.2f} ms  {case['speedup']:5.1f}x"
+        )
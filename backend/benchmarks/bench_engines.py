@@ -0,0 +1,46 @@
+"""
+Full-grid inference engines (eager / fused / script / bf16 / int8): accuracy
+parity against the fp32 eager model, latency and throughput per batch size.
+Run from backend/: python -m benchmarks.bench_engines
+"""
+import torch
+
+from benchmarks.common import measure
+from Feature1 import logic
+from Feature1.inference import ENGINE_MODES, build_engine, check_parity, reference_grids
+
+def run(batch_sizes=(1, 8, 64), repeats=30, modes=ENGINE_MODES):
+    grids = reference_grids(count=max(batch_sizes), channels=logic.CHANNELS, grid_size=logic.GRID_SIZE, seed=2)
+    results = []
+    for mode in modes:
+        engine = build_engine(logic.model, mode)
+        case = {"engine": mode, "parity": check_parity(logic.model, engine), "batches": []}
+        for batch_size in batch_sizes:
+            batch = grids[:batch_size]
+
+            def forward():
+                with torch.no_grad():
+                    engine(batch)
+
+            latency = measure(forward, repeats)
+            case["batches"].append({
+                "batch_size": batch_size,
+                "latency": latency,
+                "grids_per_s": batch_size / (latency["mean_ms"] / 1e3),
+            })
+        results.append(case)
+    return {"torch_threads": torch.get_num_threads(), "cases": results}
+
+if __name__ == "__main__":
+    report = run()
+    for case in report["cases"]:
+        parity = case["parity"]
+        print(
+            f"{case['engine']:>6}  max |diff| {parity['max_abs_diff']:.1e}  "
+            f"labels {parity['label_agreement']:.4%}"
+        )
+        for batch in case["batches"]:
+            print(
+                f"        batch {batch['batch_size']:>3}: {batch['latency']['mean_ms']:8.2f} ms  "
+                f"{batch['grids_per_s']:8.1f} grids/s"
+            )
@@ -0,0 +1,82 @@
+"""
+End-to-end HTTP throughput and latency through an in-process ASGI client
+(no sockets, Groq replaced by the local stub).
+Run from backend/: python -m benchmarks.bench_http
+"""
+import time
+import asyncio
+import httpx
+
+from benchmarks.common import summarize
+from Feature1 import logic
+from Feature1.explainers import StubBackend
+
+SAMPLE_REQUEST = {
+    "X": 500.0,
+    "Y": 400.0,
+    "Z": 50.0,
+    "Rock_Type": "Granite",
+    "Ore_Grade (%)": 35.0,
+    "Tonnage": 1200.0,
+    "Ore_Value (¥/tonne)": 50.0,
+    "Mining_Cost (¥)": 30.0,
+    "Processing_Cost (¥)": 15.0,
+}
+
+async def _drive(app, path, requests, concurrency):
+    latencies = []
+    errors = 0
+    queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(i)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal errors
+            while True:
+                try:
+                    i = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                payload = dict(SAMPLE_REQUEST, X=float(i % 1000))
+                start = time.perf_counter()
+                response = await client.post(path, json=payload)
+                latencies.append(time.perf_counter() - start)
+                if response.status_code != 200:
+                    errors += 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "path": path,
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "throughput_rps": requests / elapsed,
+        "latency": summarize(latencies),
+    }
+
+def run(requests=300, concurrency_levels=(1, 8, 32), llm_latency_s=0.0, explanation_cache=False):
+    import app as app_module
+
+    original_backend, original_cache = logic.explainer.backend, logic.explanation_cache
+    logic.explainer.backend = StubBackend(latency_s=llm_latency_s)
+    if not explanation_cache:
+        # Requests repeat quickly, so cache hits would hide the LLM cost being measured
+        logic.explanation_cache = None
+    try:
+        results = []
+        for path in ("/predict-simple", "/predict", "/predict?explanation_mode=async"):
+            for concurrency in concurrency_levels:
+                results.append(asyncio.run(_drive(app_module.app, path, requests, concurrency)))
+        return {"llm_stub_latency_s": llm_latency_s, "explanation_cache": explanation_cache, "cases": results}
+    finally:
+        logic.explainer.backend, logic.explanation_cache = original_backend, original_cache
+
+if __name__ == "__main__":
+    for case in run()["cases"]:
+        print(f"{case['path']:<36} c={case['concurrency']:<3} {case['throughput_rps']:8.1f} req/s  "
+              f"p50 {case['latency']['p50_ms']:7.2f} ms  p99 {case['latency']['p99_ms']:7.2f} ms")
@@ -0,0 +1,78 @@
+"""
+Model latency at several torch thread counts, and request preprocessing cost.
+Run from backend/: python -m benchmarks.bench_inference
+"""
+import os
+import numpy as np
+import torch
+
+from benchmarks.common import measure
+from Feature1 import logic
+
+SAMPLE_INPUT = {
+    "X": 500.0,
+    "Y": 400.0,
+    "Z": 50.0,
+    "Rock_Type_enc": 2,
+    "Ore_Grade (%)": 35.0,
+    "Tonnage": 1200.0,
+    "Ore_Value (¥/tonne)": 50.0,
+    "Mining_Cost (¥)": 30.0,
+    "Processing_Cost (¥)": 15.0,
+}
+
+def thread_counts():
+    cpus = os.cpu_count() or 1
+    counts = [1]
+    while counts[-1] * 2 <= cpus:
+        counts.append(counts[-1] * 2)
+    if counts[-1] != cpus:
+        counts.append(cpus)
+    return counts
+
+def legacy_feature_grid(input_data):
+    """The original per-request channel fills of predict_rockfall_with_groq"""
+    feature_grid = np.zeros((logic.CHANNELS, logic.GRID_SIZE, logic.GRID_SIZE), dtype=np.float32)
+    feature_grid[0, :, :] = input_data['X'] / 1000.0
+    feature_grid[1, :, :] = input_data['Y'] / 1000.0
+    feature_grid[2, :, :] = input_data['Z'] / 200.0
+    feature_grid[3, :, :] = input_data['Rock_Type_enc'] / 10.0
+    feature_grid[4, :, :] = input_data['Ore_Grade (%)'] / 100.0
+    feature_grid[5, :, :] = (input_data['Ore_Value (¥/tonne)'] * input_data['Tonnage']) / 100000.0
+    return torch.tensor(feature_grid).unsqueeze(0)
+
+def run(repeats=200):
+    input_tensor = legacy_feature_grid(SAMPLE_INPUT)
+    original_threads = torch.get_num_threads()
+    model_latency = []
+    try:
+        for threads in thread_counts():
+            torch.set_num_threads(threads)
+            model_latency.append({
+                "threads": threads,
+                "predict_with_local_model": measure(
+                    lambda: logic.predict_with_local_model(input_tensor, 25, 31), repeats
+                ),
+                "predict_rockfall": measure(lambda: logic.predict_rockfall(SAMPLE_INPUT), repeats),
+            })
+    finally:
+        torch.set_num_threads(original_threads)
+
+    return {
+        "inference_mode": logic.INFERENCE_MODE,
+        "model_latency": model_latency,
+        "preprocessing": {
+            "legacy_feature_grid": measure(lambda: legacy_feature_grid(SAMPLE_INPUT), repeats),
+            "feature_vectors": measure(
+                lambda: (
+                    logic.build_feature_vectors([SAMPLE_INPUT]),
+                    logic.map_to_grid_indices(SAMPLE_INPUT['X'], SAMPLE_INPUT['Y']),
+                ),
+                repeats,
+            ),
+        },
+    }
+
+if __name__ == "__main__":
+    import json
+    print(json.dumps(run(), indent=2))
@@ -0,0 +1,47 @@
+"""
+Point inference vs full 64x64 forward pass.
+Run from backend/: python -m benchmarks.bench_point_inference
+"""
+import time
+import numpy as np
+import torch
+
+from benchmarks.common import measure  # noqa: F401  (sets up the Groq stub before logic is imported)
+from Feature1 import logic
+from Feature1.pointeval import check_parity
+
+def time_call(fn, repeats):
+    fn()  # warmup
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+def run(batch_sizes=(1, 16, 256), repeats=50, seed=0):
+    rng = np.random.default_rng(seed)
+    results = {"parity_max_abs_diff": check_parity(logic.model, logic.point_evaluator), "cases": []}
+    for n in batch_sizes:
+        vectors = rng.uniform(0.0, 1.0, size=(n, logic.CHANNELS)).astype(np.float32)
+        grid_y = rng.integers(0, logic.GRID_SIZE, size=n)
+        grid_x = rng.integers(0, logic.GRID_SIZE, size=n)
+        full_s = time_call(lambda: logic.predict_probabilities_full(vectors, grid_y, grid_x), repeats)
+        point_s = time_call(
+            lambda: logic.point_evaluator.predict_constant(vectors, grid_y, grid_x, logic.GRID_SIZE), repeats
+        )
+        results["cases"].append({
+            "batch_size": n,
+            "full_ms": full_s * 1e3,
+            "point_ms": point_s * 1e3,
+            "full_us_per_block": full_s * 1e6 / n,
+            "point_us_per_block": point_s * 1e6 / n,
+            "speedup": full_s / point_s,
+        })
+    return results
+
+if __name__ == "__main__":
+    results = run()
+    print(f"Parity (max |point - full|): {results['parity_max_abs_diff']:.2e}")
+    print(f"{'batch':>6} {'full ms':>10} {'point ms':>10} {'speedup':>9}")
+    for case in results["cases"]:
+        print(f"{case['batch_size']:>6} {case['full_ms']:>10.3f} {case['point_ms']:>10.3f} {case['speedup']:>8.1f}x")
+    print(f"torch threads: {torch.get_num_threads()}")
@@ -0,0 +1,108 @@
+"""
+Multi-process serving (serve.py): throughput and memory per worker count.
+Starts real servers on a local port, so this measures sockets + uvicorn too.
+Run from backend/: python -m benchmarks.bench_serve
+"""
+import os
+import sys
+import time
+import signal
+import socket
+import subprocess
+import concurrent.futures as cf
+
+import httpx
+
+from benchmarks.common import BACKEND_DIR, summarize
+from benchmarks.bench_http import SAMPLE_REQUEST
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def _memory_kb(pid):
+    """Pss / Private_Dirty of one process (Linux only)"""
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                name, _, rest = line.partition(":")
+                if name in ("Rss", "Pss", "Private_Dirty"):
+                    fields[name.lower() + "_kb"] = int(rest.split()[0])
+    except OSError:
+        pass
+    return fields
+
+def _children(pid):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+def _drive(url, requests, concurrency):
+    with httpx.Client(timeout=30) as client:
+        def one(i):
+            start = time.perf_counter()
+            response = client.post(url, json=dict(SAMPLE_REQUEST, X=float(i % 1000)))
+            return response.status_code, time.perf_counter() - start
+
+        started = time.perf_counter()
+        with cf.ThreadPoolExecutor(concurrency) as pool:
+            results = list(pool.map(one, range(requests)))
+        elapsed = time.perf_counter() - started
+    latencies = [seconds for status, seconds in results if status == 200]
+    return elapsed, len(results) - len(latencies), latencies
+
+def run(worker_counts=None, requests=2000, concurrency=32):
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    worker_counts = worker_counts or sorted({1, 2, cpus})
+    results = []
+    for workers in worker_counts:
+        port = _free_port()
+        env = dict(os.environ, ROCKFALL_WORKERS=str(workers), PORT=str(port), HOST="127.0.0.1")
+        proc = subprocess.Popen(
+            [sys.executable, "serve.py"], cwd=BACKEND_DIR, env=env,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            base = f"http://127.0.0.1:{port}"
+            deadline = time.time() + 60
+            while True:
+                try:
+                    if httpx.get(f"{base}/", timeout=1).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.time() > deadline or proc.poll() is not None:
+                    raise RuntimeError(f"serve.py with {workers} workers did not start")
+                time.sleep(0.2)
+
+            _drive(f"{base}/predict-simple", 100, concurrency)  # warm every worker
+            elapsed, errors, latencies = _drive(f"{base}/predict-simple", requests, concurrency)
+            worker_memory = [_memory_kb(pid) for pid in _children(proc.pid)]
+            results.append({
+                "workers": workers,
+                "requests": requests,
+                "concurrency": concurrency,
+                "errors": errors,
+                "throughput_rps": requests / elapsed,
+                "latency": summarize(latencies),
+                "master_memory": _memory_kb(proc.pid),
+                "worker_memory": worker_memory,
+            })
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=30)
+    return {"cpus": cpus, "cases": results}
+
+if __name__ == "__main__":
+    report = run()
+    for case in report["cases"]:
+        private = [m.get("private_dirty_kb", 0) for m in case["worker_memory"]]
+        print(
+            f"{case['workers']:>2} workers: {case['throughput_rps']:8.1f} req/s  "
+            f"p50 {case['latency']['p50_ms']:6.2f} ms  p99 {case['latency']['p99_ms']:6.2f} ms  "
+            f"private per worker {private} kB"
+        )
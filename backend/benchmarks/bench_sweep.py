@@ -0,0 +1,41 @@
+"""
+What-if sweeps: one batched pass over the Cartesian product vs one
+prediction per point.
+Run from backend/: python -m benchmarks.bench_sweep
+"""
+import numpy as np
+
+from benchmarks.common import measure
+from benchmarks.bench_inference import SAMPLE_INPUT
+from Feature1 import logic
+
+def run(shapes=((20,), (20, 15), (64, 64)), repeats=30):
+    logic.ensure_model()
+    fields = ("Z", "Tonnage")
+    results = []
+    for shape in shapes:
+        axes = [(field, np.linspace(1.0, 300.0 * (i + 1), n)) for i, (field, n) in enumerate(zip(fields, shape))]
+        points = int(np.prod(shape))
+        sweep = measure(lambda: logic.predict_sweep(SAMPLE_INPUT, axes), repeats)
+        grids = np.meshgrid(*[values for _, values in axes], indexing="ij")
+        inputs = [
+            dict(SAMPLE_INPUT, **{field: float(grid.flat[i]) for (field, _), grid in zip(axes, grids)})
+            for i in range(points)
+        ]
+        per_point = measure(lambda: [logic.predict_batch([item]) for item in inputs], max(3, repeats // 10), warmup=1)
+        results.append({
+            "shape": list(shape),
+            "points": points,
+            "sweep": sweep,
+            "per_point": per_point,
+            "speedup": per_point["mean_ms"] / sweep["mean_ms"],
+        })
+    return {"cases": results}
+
+if __name__ == "__main__":
+    for case in run()["cases"]:
+        print(
+            f"{'x'.join(map(str, case['shape'])):>6} ({case['points']:>4} points): "
+            f"sweep {case['sweep']['mean_ms']:7.2f} ms  per point {case['per_point']['mean_ms']:8.2f} ms  "
+            f"{case['speedup']:6.1f}x"
+        )
@@ -0,0 +1,79 @@
+"""
+Training preprocessing time (CSV load, normalization, grid construction)
+for synthetic survey CSVs of increasing size, in-memory and streaming.
+Run from backend/: python -m benchmarks.bench_training
+"""
+import os
+import sys
+import time
+import tempfile
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import ML_DIR
+
+if ML_DIR not in sys.path:
+    sys.path.insert(0, ML_DIR)
+from preprocessing import build_grids
+from ingest import scan_csv, stream_grids
+
+FEATURES = [
+    'Ore_Grade (%)',
+    'Tonnage',
+    'Ore_Value (¥/tonne)',
+    'Mining_Cost (¥)',
+    'Processing_Cost (¥)',
+    'Rock_Type_enc'
+]
+ROCK_TYPES = ["Granite", "Limestone", "Sandstone", "Shale", "Basalt"]
+
+def write_synthetic_csv(path, rows, seed=0):
+    rng = np.random.default_rng(seed)
+    pd.DataFrame({
+        "X": rng.uniform(0, 1000, rows),
+        "Y": rng.uniform(0, 1000, rows),
+        "Z": rng.uniform(0, 200, rows),
+        "Rock_Type": rng.choice(ROCK_TYPES, rows),
+        "Ore_Grade (%)": rng.uniform(0, 100, rows),
+        "Tonnage": rng.uniform(1, 3000, rows),
+        "Ore_Value (¥/tonne)": rng.uniform(1, 100, rows),
+        "Mining_Cost (¥)": rng.uniform(1, 100, rows),
+        "Processing_Cost (¥)": rng.uniform(1, 100, rows),
+        "Target": rng.integers(0, 2, rows),
+    }).to_csv(path, index=False)
+
+def in_memory(path, grid_size):
+    df = pd.read_csv(path)
+    codes = {r: i for i, r in enumerate(sorted(df["Rock_Type"].unique()))}
+    df["Rock_Type_enc"] = df["Rock_Type"].map(codes)
+    df[FEATURES] = (df[FEATURES] - df[FEATURES].mean()) / df[FEATURES].std()
+    return build_grids(df, FEATURES, grid_size)
+
+def streaming(path, grid_size, out_dir, chunksize):
+    stats = scan_csv(path, FEATURES[:-1], chunksize=chunksize)
+    return stream_grids(path, stats, FEATURES, grid_size, out_dir, chunksize=chunksize)
+
+def run(sizes=(10_000, 100_000, 1_000_000), grid_size=64, chunksize=200_000):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in sizes:
+            path = os.path.join(tmp, f"survey_{rows}.csv")
+            write_synthetic_csv(path, rows)
+            start = time.perf_counter()
+            in_memory(path, grid_size)
+            in_memory_s = time.perf_counter() - start
+            start = time.perf_counter()
+            streaming(path, grid_size, os.path.join(tmp, f"grids_{rows}"), chunksize)
+            streaming_s = time.perf_counter() - start
+            results.append({
+                "rows": rows,
+                "csv_mb": os.path.getsize(path) / 1e6,
+                "in_memory_s": in_memory_s,
+                "streaming_s": streaming_s,
+            })
+    return results
+
+if __name__ == "__main__":
+    for case in run():
+        print(f"{case['rows']:>9} rows ({case['csv_mb']:.1f} MB): in-memory {case['in_memory_s']:.2f} s, "
+              f"streaming {case['streaming_s']:.2f} s")
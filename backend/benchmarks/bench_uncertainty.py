@@ -0,0 +1,71 @@
+"""
+Uncertainty mode: K MC-dropout passes / K ensemble members batched into one
+pass vs K sequential passes, next to the plain single-pass prediction (point
+evaluator) and the single full 64x64 forward pass.
+Run from backend/: python -m benchmarks.bench_uncertainty
+"""
+import copy
+import numpy as np
+import torch
+
+from benchmarks.common import measure
+from Feature1 import logic
+from Feature1.pointeval import PointEvaluator
+from Feature1.uncertainty import UncertaintyEstimator
+
+# Timing only: the rate does not change the cost of a pass
+DROPOUT = 0.1
+
+def perturbed_members(model, k, scale=0.05, seed=0):
+    """Stand-in ensemble: copies of the served model with jittered weights"""
+    generator = torch.Generator().manual_seed(seed)
+    members = [model]
+    for _ in range(k - 1):
+        member = copy.deepcopy(model)
+        with torch.no_grad():
+            for p in member.parameters():
+                p.add_(torch.randn(p.shape, generator=generator) * scale * p.abs().mean())
+        members.append(member)
+    return members
+
+def run(batch_sizes=(1, 64, 1024), samples=(8, 32), repeats=30, seed=0):
+    logic.ensure_model()
+    model = logic.model
+    rng = np.random.default_rng(seed)
+    results = []
+    for n in batch_sizes:
+        vectors = rng.uniform(0.0, 1.0, size=(n, logic.CHANNELS)).astype(np.float32)
+        grid_y = rng.integers(0, logic.GRID_SIZE, size=n)
+        grid_x = rng.integers(0, logic.GRID_SIZE, size=n)
+        args = (vectors, grid_y, grid_x, logic.GRID_SIZE)
+        single = measure(lambda: logic.point_evaluator.predict_constant(*args), repeats)
+        full = measure(lambda: logic.predict_probabilities_full(vectors, grid_y, grid_x), max(3, repeats // 3))
+        for k in samples:
+            mc = UncertaintyEstimator([model], samples=k, dropout=DROPOUT)
+            mc_one = UncertaintyEstimator([model], samples=1, dropout=DROPOUT)
+            members = perturbed_members(model, k)
+            ensemble = UncertaintyEstimator(members)
+            evaluators = [PointEvaluator(m) for m in members]
+            case = {
+                "batch_size": n,
+                "samples": k,
+                "single_pass": single,
+                "full_grid_pass": full,
+                "mc_batched": measure(lambda: mc.sample(*args), repeats),
+                "mc_sequential": measure(lambda: [mc_one.sample(*args) for _ in range(k)], max(3, repeats // 3)),
+                "ensemble_batched": measure(lambda: ensemble.sample(*args), repeats),
+                "ensemble_sequential": measure(lambda: [e.predict_constant(*args) for e in evaluators], max(3, repeats // 3)),
+            }
+            results.append(case)
+    return {"torch_threads": torch.get_num_threads(), "cases": results}
+
+if __name__ == "__main__":
+    report = run()
+    print(f"{'N':>5} {'K':>3} {'single':>9} {'full grid':>10} {'mc batch':>9} {'mc seq':>9} {'ens batch':>10} {'ens seq':>9}  (mean ms)")
+    for case in report["cases"]:
+        print(
+            f"{case['batch_size']:>5} {case['samples']:>3} {case['single_pass']['mean_ms']:>9.3f} "
+            f"{case['full_grid_pass']['mean_ms']:>10.3f} "
+            f"{case['mc_batched']['mean_ms']:>9.3f} {case['mc_sequential']['mean_ms']:>9.3f} "
+            f"{case['ensemble_batched']['mean_ms']:>10.3f} {case['ensemble_sequential']['mean_ms']:>9.3f}"
+        )
@@ -0,0 +1,39 @@
+import os
+import sys
+import time
+import numpy as np
+
+# Benchmarks never touch the network: use the local Groq stub unless told otherwise.
+# Must run before Feature1.logic is imported.
+os.environ.setdefault("GROQ_STUB", "1")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REPO_DIR = os.path.dirname(BACKEND_DIR)
+ML_DIR = os.path.join(REPO_DIR, "machineLearning")
+
+# logic.py loads rockfall_model.pt relative to the working directory
+os.chdir(BACKEND_DIR)
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+def summarize(samples_s):
+    """Latency summary in milliseconds"""
+    ms = np.asarray(samples_s, dtype=np.float64) * 1e3
+    return {
+        "count": int(len(ms)),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max()),
+    }
+
+def measure(fn, repeats, warmup=3):
+    """Call fn repeatedly and return per-call latency summary"""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
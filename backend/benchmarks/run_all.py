@@ -0,0 +1,93 @@
+"""
+Run the whole benchmark suite (no network needed) and write the results as JSON.
+Run from backend/: python -m benchmarks.run_all [--quick] [--only inference,http] [--llm-latency 0.3] [--out results.json]
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import subprocess
+
+from benchmarks.common import BACKEND_DIR, REPO_DIR
+
+SUITES = ("point_inference", "inference", "engines", "uncertainty", "sweep", "columnar", "http", "serve", "training")
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], cwd=REPO_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run_suite(name, quick, llm_latency_s=0.0):
+    if name == "point_inference":
+        from benchmarks import bench_point_inference
+        return bench_point_inference.run(repeats=10 if quick else 50)
+    if name == "inference":
+        from benchmarks import bench_inference
+        return bench_inference.run(repeats=30 if quick else 200)
+    if name == "engines":
+        from benchmarks import bench_engines
+        return bench_engines.run(repeats=10 if quick else 30)
+    if name == "uncertainty":
+        from benchmarks import bench_uncertainty
+        return bench_uncertainty.run(repeats=10 if quick else 30)
+    if name == "sweep":
+        from benchmarks import bench_sweep
+        return bench_sweep.run(repeats=10 if quick else 30)
+    if name == "columnar":
+        from benchmarks import bench_columnar
+        return bench_columnar.run(repeats=5 if quick else 20)
+    if name == "http":
+        from benchmarks import bench_http
+        return bench_http.run(
+            requests=50 if quick else 300,
+            concurrency_levels=(1, 8) if quick else (1, 8, 32),
+            llm_latency_s=llm_latency_s,
+        )
+    if name == "serve":
+        from benchmarks import bench_serve
+        return bench_serve.run(requests=300 if quick else 2000)
+    if name == "training":
+        from benchmarks import bench_training
+        return bench_training.run(sizes=(10_000, 50_000) if quick else (10_000, 100_000, 1_000_000))
+    raise ValueError(f"Unknown suite {name!r}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--quick", action="store_true", help="smaller sizes for a fast smoke run")
+    parser.add_argument("--only", default=",".join(SUITES), help="comma-separated suites to run")
+    parser.add_argument("--out", default=None, help="output JSON path")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="simulated Groq latency in seconds")
+    args = parser.parse_args(argv)
+
+    import torch
+
+    report = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "torch": torch.__version__,
+        "cpu_count": os.cpu_count(),
+        "torch_threads": torch.get_num_threads(),
+        "quick": args.quick,
+        "llm_stub_latency_s": args.llm_latency,
+        "suites": {},
+    }
+    for name in [s.strip() for s in args.only.split(",") if s.strip()]:
+        print(f"Running {name} ...", file=sys.stderr)
+        start = time.perf_counter()
+        report["suites"][name] = {"results": run_suite(name, args.quick, args.llm_latency), "wall_s": time.perf_counter() - start}
+
+    out = args.out or os.path.join(BACKEND_DIR, "benchmarks", "results", f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {out}", file=sys.stderr)
+    return report
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Production server: N uvicorn worker processes forked from one master.
+
+The master imports the app (so rockfall_model.pt is loaded once), binds the
+listening socket and forks the workers. Model weights are never written after
+loading, so the workers share the master's pages copy-on-write instead of each
+holding its own copy. Each worker gets an equal share of the CPUs for torch's
+intra-op threads (and, optionally, pinned to those CPUs) so workers don't
+oversubscribe cores.
+
+Run from backend/: python serve.py
+
+Environment:
+  ROCKFALL_WORKERS        worker processes (default: number of usable CPUs)
+  ROCKFALL_TORCH_THREADS  torch threads per worker (default: CPUs // workers, at least 1)
+  ROCKFALL_CPU_AFFINITY   1 pins each worker to its own slice of CPUs
+  HOST / PORT             listen address (default 0.0.0.0:8000)
+
+Metrics (/metrics, /scheduler/stats, ...) are per worker process.
+"""
+import os
+import sys
+import signal
+import socket
+import time
+
+def usable_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+# Torch reads these when its thread pools start; set them before importing it so
+# the master never spins up a full-size pool the forked workers would inherit
+WORKERS = int(os.environ.get("ROCKFALL_WORKERS", "0")) or len(usable_cpus())
+TORCH_THREADS = int(os.environ.get("ROCKFALL_TORCH_THREADS", "0")) or max(1, len(usable_cpus()) // WORKERS)
+CPU_AFFINITY = os.environ.get("ROCKFALL_CPU_AFFINITY") == "1"
+HOST = os.environ.get("HOST", "0.0.0.0")
+PORT = int(os.environ.get("PORT", "8000"))
+os.environ.setdefault("OMP_NUM_THREADS", str(TORCH_THREADS))
+os.environ.setdefault("MKL_NUM_THREADS", str(TORCH_THREADS))
+
+import torch
+import uvicorn
+
+# Load the app and the model weights once, before forking. Nothing may run
+# inference here: an OpenMP pool started in the master is unusable after fork(),
+# so warmup, which also builds the inference engines (ModelVersion defers them),
+# happens in each worker (app startup) instead.
+import app as app_module
+from Feature1 import logic
+
+logic.load_model(warmup=False)
+
+def cpu_slice(index, workers):
+    """CPUs for worker `index` when pinning: an even, contiguous share of the usable CPUs"""
+    cpus = usable_cpus()
+    per_worker = max(1, len(cpus) // workers)
+    start = (index * per_worker) % len(cpus)
+    return set(cpus[start:start + per_worker])
+
+def bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def run_worker(index, sock):
+    """Body of one forked worker process; never returns"""
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    if CPU_AFFINITY and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpu_slice(index, WORKERS))
+    torch.set_num_threads(TORCH_THREADS)
+
+    config = uvicorn.Config(app_module.app, host=HOST, port=PORT, log_level="info")
+    server = uvicorn.Server(config)
+    try:
+        server.run(sockets=[sock])
+    finally:
+        os._exit(0)
+
+def spawn(index, sock):
+    pid = os.fork()
+    if pid == 0:
+        run_worker(index, sock)
+    return pid
+
+def main():
+    sock = bind_socket(HOST, PORT)
+    print(
+        f"Serving on {HOST}:{PORT} with {WORKERS} workers x {TORCH_THREADS} torch threads"
+        f"{' (pinned)' if CPU_AFFINITY else ''}",
+        file=sys.stderr,
+    )
+
+    workers = {spawn(i, sock): i for i in range(WORKERS)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    # Reap workers; replace any that die unexpectedly
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index = workers.pop(pid, None)
+        if index is None or stopping:
+            continue
+        print(f"Worker {pid} exited with status {status}, restarting", file=sys.stderr)
+        time.sleep(1)
+        workers[spawn(index, sock)] = index
+
+    sock.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import shutil
+import tempfile
+
+import pytest
+import torch
+
+# Run from backend/: python -m pytest tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from Feature1.network import SimpleCNN  # noqa: E402
+
+CHANNELS = 6
+
+def random_model(seed, in_channels=CHANNELS):
+    """SimpleCNN with random weights and random BatchNorm statistics, so folding is exercised"""
+    torch.manual_seed(seed)
+    model = SimpleCNN(in_channels)
+    with torch.no_grad():
+        for bn in (model.bn1, model.bn2):
+            bn.weight.uniform_(0.5, 1.5)
+            bn.bias.uniform_(-0.5, 0.5)
+            bn.running_mean.uniform_(-0.5, 0.5)
+            bn.running_var.uniform_(0.5, 2.0)
+    return model.eval()
+
+@pytest.fixture(params=[0, 1, 2], ids=lambda seed: f"seed{seed}")
+def model(request):
+    return random_model(request.param)
+
+@pytest.fixture
+def make_model():
+    return random_model
+
+# ------- API under test -------
+# app.py and Feature1.logic read their configuration at import, and test modules
+# may import them at collection, so it is set here: a temporary registry (the
+# client fixture publishes one manifest version that uses the cost columns), the
+# Groq stub, an assessment history database and a risk map path.
+API_DIR = tempfile.mkdtemp(prefix="rockfall-tests-")
+os.environ.update({
+    "GROQ_STUB": "1",
+    "ROCKFALL_MODEL_REGISTRY": os.path.join(API_DIR, "models"),
+    "ROCKFALL_HISTORY_DB": os.path.join(API_DIR, "history.db"),
+    "ROCKFALL_RISK_MAP": os.path.join(API_DIR, "risk_map.npy"),
+    "ROCKFALL_WARMUP_BATCH_SIZES": "1",
+})
+
+API_FEATURES = ['Ore_Grade (%)', 'Tonnage', 'Ore_Value (¥/tonne)', 'Mining_Cost (¥)', 'Processing_Cost (¥)', 'Rock_Type_enc']
+API_MANIFEST = {
+    "version": "test-v1",
+    "channels": len(API_FEATURES),
+    "grid_size": 64,
+    "features": API_FEATURES,
+    "normalization": {
+        "mean": dict(zip(API_FEATURES, [50.0, 1000.0, 40.0, 30.0, 15.0, 2.0])),
+        "std": dict(zip(API_FEATURES, [20.0, 500.0, 10.0, 10.0, 5.0, 1.5])),
+    },
+    "bounds": {"x_min": 0.0, "x_max": 1000.0, "y_min": 0.0, "y_max": 1000.0},
+    "rock_type_encoding": {"Granite": 0, "Limestone": 1, "Sandstone": 2, "Shale": 3, "Basalt": 4},
+}
+SAMPLE_INPUT = {
+    "X": 420.0, "Y": 310.0, "Z": 55.0, "Rock_Type": "Granite", "Ore_Grade (%)": 62.5, "Tonnage": 1500.0,
+    "Ore_Value (¥/tonne)": 48.0, "Mining_Cost (¥)": 42.0, "Processing_Cost (¥)": 9.0,
+}
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+    from Feature1.registry import publish
+
+    weights = os.path.join(API_DIR, "model.pt")
+    torch.save(random_model(0).state_dict(), weights)
+    publish(os.environ["ROCKFALL_MODEL_REGISTRY"], weights, API_MANIFEST)
+    import app
+    from Feature1 import logic
+
+    with TestClient(app.app) as client:
+        logic.ensure_model()
+        yield client
+    shutil.rmtree(API_DIR, ignore_errors=True)
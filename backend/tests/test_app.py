@@ -0,0 +1,101 @@
+import json
+
+import pytest
+
+from conftest import SAMPLE_INPUT
+from Feature1 import logic
+
+def predict(client, row):
+    return client.post("/predict", json=row).json()["prediction"]
+
+def risk_probability(prediction):
+    """Risk-class probability behind a /predict label and confidence"""
+    if prediction["risk_label"] == logic.CLASS_LABELS[logic.RISK_CLASS]:
+        return prediction["confidence"]
+    return 1.0 - prediction["confidence"]
+
+def test_batch_matches_predict(client):
+    rows = [{**SAMPLE_INPUT, "X": float(x), "Rock_Type": rock, "Processing_Cost (¥)": float(x % 30)}
+            for x, rock in zip(range(0, 1000, 90), ["Granite", "Shale", "Basalt", "Marble"] * 3)]
+
+    response = client.post("/predict-batch", json={"items": rows})
+
+    body = response.json()
+    assert body["count"] == len(rows) and body["metadata"]["model_version"] == "test-v1"
+    for row, got in zip(rows, body["predictions"]):
+        expected = predict(client, row)
+        assert (got["risk_label"], got["grid_position"]) == (expected["risk_label"], expected["grid_position"])
+        assert got["confidence"] == pytest.approx(expected["confidence"], abs=1e-6)
+
+def test_batch_validation(client):
+    assert client.post("/predict-batch", json={"items": []}).status_code == 422
+    assert client.post("/predict-batch", json={"items": [{**SAMPLE_INPUT, "Tonnage": 0}]}).status_code == 422
+
+def test_sweep_matches_predict_and_follows_a_feature(client):
+    costs = [0.0, 20.0, 40.0, 60.0, 80.0]
+
+    response = client.post("/predict-sweep", json={
+        "base": SAMPLE_INPUT, "ranges": [{"parameter": "Mining_Cost (¥)", "values": costs}],
+    })
+
+    assert response.status_code == 200, response.text
+    curve = response.json()["risk_probability"]
+    assert len(set(curve)) > 1
+    for cost, risk in zip(costs, curve):
+        expected = predict(client, {**SAMPLE_INPUT, "Mining_Cost (¥)": cost})
+        assert risk == pytest.approx(risk_probability(expected), abs=1e-4)
+
+def test_sweep_surface_shape(client):
+    response = client.post("/predict-sweep", json={"base": SAMPLE_INPUT, "ranges": [
+        {"parameter": "X", "start": 0, "stop": 1000, "steps": 3},
+        {"parameter": "Rock_Type", "values": ["Granite", "Shale"]},
+    ]})
+
+    body = response.json()
+    assert body["shape"] == [3, 2] and len(body["risk_probability"][0]) == 2
+
+def test_sweep_rejects_parameters_the_version_does_not_use(client):
+    response = client.post("/predict-sweep", json={
+        "base": SAMPLE_INPUT, "ranges": [{"parameter": "Z", "start": 0, "stop": 200, "steps": 5}],
+    })
+
+    assert response.status_code == 400
+    assert "does not use Z" in response.json()["detail"]
+    assert "Processing_Cost (¥)" in response.json()["detail"]
+
+def test_async_explanations_rejected_when_the_queue_is_full(client, monkeypatch):
+    import app
+
+    monkeypatch.setattr(app.explanation_jobs, "max_pending", 0)
+
+    response = client.post("/predict", params={"explanation_mode": "async"}, json=SAMPLE_INPUT)
+
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+def sse_events(response):
+    events = []
+    for frame in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in frame.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_stream_events(client):
+    row = {**SAMPLE_INPUT, "X": 777.0, "Y": 888.0}  # not explained (cached) by other tests
+
+    first = sse_events(client.post("/predict-stream", json=row))
+    second = sse_events(client.post("/predict-stream", json=row))
+
+    kinds = [kind for kind, _ in first]
+    assert kinds[0] == "prediction" and kinds[-1] == "done" and set(kinds[1:-1]) == {"token"}
+    assert first[0][1] == {key: value for key, value in predict(client, row).items() if key != "model_version"}
+    text = "".join(data["text"] for kind, data in first if kind == "token")
+    assert text.startswith("Stub explanation") and first[-1][1]["explanation_source"] == "llm"
+    assert first[-1][1]["metadata"]["model_version"] == "test-v1"
+    # The finished explanation is cached and replayed as one token
+    assert second[1] == ("token", {"text": text}) and second[-1][1]["explanation_source"] == "cache"
+
+def test_stream_validation_error_is_not_a_stream(client):
+    response = client.post("/predict-stream", json={**SAMPLE_INPUT, "Tonnage": -5})
+
+    assert response.status_code == 422
@@ -0,0 +1,79 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+import pytest
+
+from Feature1.batching import MicroBatcher
+
+def test_concurrent_items_are_coalesced_in_order():
+    batches = []
+
+    def square(items):
+        batches.append(list(items))
+        return [x * x for x in items]
+
+    batcher = MicroBatcher(square, max_batch_size=8, max_wait_us=50000)
+    try:
+        with ThreadPoolExecutor(16) as pool:
+            results = list(pool.map(batcher, range(16)))
+    finally:
+        batcher.shutdown()
+
+    assert results == [x * x for x in range(16)]
+    assert max(len(batch) for batch in batches) > 1
+    assert all(len(batch) <= 8 for batch in batches)
+    assert batcher.stats()["requests"] == 16
+
+def test_wrong_result_count_fails_every_item():
+    batcher = MicroBatcher(lambda items: items[:-1], max_batch_size=4, max_wait_us=50000)
+    try:
+        futures = [batcher.submit(i) for i in range(3)]
+        for future in futures:
+            with pytest.raises(RuntimeError, match="2 results for 3 items"):
+                future.result(timeout=5)
+    finally:
+        batcher.shutdown()
+
+def test_timed_out_items_are_dropped_from_their_batch():
+    started, release = threading.Event(), threading.Event()
+    seen = []
+
+    def slow(items):
+        seen.append(list(items))
+        started.set()
+        release.wait(5)
+        return items
+
+    batcher = MicroBatcher(slow, max_batch_size=1, max_wait_us=0, timeout_s=5)
+    try:
+        blocker = batcher.submit("first")
+        started.wait(5)
+        with pytest.raises(TimeoutError):
+            batcher("late", timeout=0.05)
+        release.set()
+
+        assert blocker.result(timeout=5) == "first"
+        assert batcher("next") == "next"
+        assert seen == [["first"], ["next"]]
+    finally:
+        release.set()
+        batcher.shutdown()
+
+def test_predict_through_the_scheduler_matches_direct_scoring(client, monkeypatch):
+    from conftest import SAMPLE_INPUT
+    from Feature1 import logic
+
+    rows = [{**SAMPLE_INPUT, "X": float(x), "Mining_Cost (¥)": float(x % 70)} for x in range(0, 1000, 125)]
+    direct = [client.post("/predict", json=row).json()["prediction"] for row in rows]
+    batcher = MicroBatcher(logic._score_microbatch, max_batch_size=8, max_wait_us=20000)
+    monkeypatch.setattr(logic, "scheduler", batcher)
+    try:
+        with ThreadPoolExecutor(len(rows)) as pool:
+            batched = list(pool.map(lambda row: client.post("/predict", json=row).json()["prediction"], rows))
+    finally:
+        batcher.shutdown()
+
+    for got, expected in zip(batched, direct):
+        assert (got["risk_label"], got["grid_position"]) == (expected["risk_label"], expected["grid_position"])
+        assert got["confidence"] == pytest.approx(expected["confidence"], abs=1e-6)
+    assert batcher.stats()["requests"] == len(rows)
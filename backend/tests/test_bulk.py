@@ -0,0 +1,118 @@
+import json
+
+import numpy as np
+import pytest
+
+from conftest import SAMPLE_INPUT
+from Feature1 import logic
+from Feature1.bulk import NUMERIC_COLUMNS
+from Feature1.features import ROCK_TYPE_ENCODING
+
+def csv_body(rows):
+    header = list(rows[0])
+    lines = [",".join(f'"{name}"' for name in header)]
+    lines += [",".join(str(row[name]) for name in header) for row in rows]
+    return ("\n".join(lines) + "\n").encode()
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+def test_csv_matches_predict(client):
+    rows = [SAMPLE_INPUT, {**SAMPLE_INPUT, "Mining_Cost (¥)": 5.0, "Rock_Type": "Shale", "X": 900.0}]
+
+    lines = ndjson(client.post("/predict-csv", content=csv_body(rows)))
+
+    assert lines[-1]["summary"]["scored_rows"] == 2
+    for row, line in zip(rows, lines):
+        expected = client.post("/predict", json=row).json()["prediction"]
+        assert line["risk_label"] == expected["risk_label"]
+        assert line["grid_position"] == expected["grid_position"]
+        assert line["confidence"] == pytest.approx(expected["confidence"], abs=1e-6)
+
+def test_csv_cost_columns_are_used(client):
+    cheap, costly = [
+        ndjson(client.post("/predict-csv", content=csv_body([{**SAMPLE_INPUT, "Mining_Cost (¥)": cost}])))[0]
+        for cost in (0.0, 90.0)
+    ]
+
+    assert cheap["confidence"] != costly["confidence"]
+
+def test_csv_without_a_version_column_is_rejected(client):
+    row = {name: value for name, value in SAMPLE_INPUT.items() if name != "Processing_Cost (¥)"}
+
+    response = client.post("/predict-csv", content=csv_body([row]))
+
+    assert response.status_code == 400
+    assert "Processing_Cost" in response.json()["detail"]
+
+def test_csv_invalid_rows_and_compact_lines(client):
+    rows = [SAMPLE_INPUT, {**SAMPLE_INPUT, "Tonnage": -1}, {**SAMPLE_INPUT, "Ore_Grade (%)": "n/a"}]
+
+    response = client.post("/predict-csv", content=csv_body(rows))
+    lines = ndjson(response)
+
+    assert [line.get("error") for line in lines[:3]] == [
+        None, "Tonnage must be positive", "Ore_Grade (%) must be a number"
+    ]
+    assert lines[3]["summary"] == {"rows": 3, "scored_rows": 1, "invalid_rows": 2, "model_version": "test-v1"}
+    assert all(", " not in line and ": " not in line for line in response.text.splitlines()[:3])
+
+def raw_body(rows, layout):
+    matrix = np.array([[row[name] for name in layout] for row in rows], dtype="<f4")
+    codes = np.array([ROCK_TYPE_ENCODING[row["Rock_Type"].lower()] for row in rows], dtype=np.uint8)
+    return matrix.tobytes() + codes.tobytes()
+
+def post_raw(client, rows, layout):
+    return client.post(
+        "/predict-columnar", content=raw_body(rows, layout), params={"columns": ",".join(layout)},
+        headers={"Content-Type": "application/octet-stream"},
+    )
+
+def test_raw_columnar_matches_predict(client):
+    rows = [SAMPLE_INPUT, {**SAMPLE_INPUT, "Processing_Cost (¥)": 28.0, "Rock_Type": "Basalt", "Y": 40.0}]
+    layout = tuple(reversed(NUMERIC_COLUMNS))  # any order the request names
+
+    response = post_raw(client, rows, layout)
+
+    assert response.status_code == 200, response.text
+    assert response.headers["X-Rows"] == "2" and response.headers["X-Model-Version"] == "test-v1"
+    risk = np.frombuffer(response.content, dtype="<f4", count=2)
+    classes = np.frombuffer(response.content, dtype=np.uint8, offset=8)
+    for row, p, c in zip(rows, risk, classes):
+        expected = client.post("/predict", json=row).json()["prediction"]
+        confidence = p if c == logic.RISK_CLASS else 1.0 - p
+        assert logic.CLASS_LABELS[c] == expected["risk_label"]
+        assert confidence == pytest.approx(expected["confidence"], abs=1e-5)
+
+def test_raw_columnar_without_version_columns_is_rejected(client):
+    # The original 6-column layout has no cost columns, which this version reads
+    response = post_raw(client, [SAMPLE_INPUT], ("X", "Y", "Z", "Ore_Grade (%)", "Tonnage", "Ore_Value (¥/tonne)"))
+
+    assert response.status_code == 400
+    assert "Mining_Cost" in response.json()["detail"]
+
+def test_raw_columnar_unknown_column(client):
+    response = post_raw(client, [SAMPLE_INPUT], ("X", "Y"))
+    bad = client.post("/predict-columnar", content=b"", params={"columns": "X,Depth"},
+                      headers={"Content-Type": "application/octet-stream"})
+
+    assert response.status_code == 400
+    assert bad.status_code == 400 and "Depth" in bad.json()["detail"]
+
+def test_arrow_columnar_matches_predict(client):
+    pa = pytest.importorskip("pyarrow")
+    rows = [SAMPLE_INPUT, {**SAMPLE_INPUT, "Mining_Cost (¥)": 3.0}]
+    table = pa.table({name: [row[name] for row in rows] for name in ("Rock_Type", *NUMERIC_COLUMNS)})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    response = client.post("/predict-columnar", content=sink.getvalue().to_pybytes(),
+                           headers={"Content-Type": "application/vnd.apache.arrow.stream"})
+    result = pa.ipc.open_stream(response.content).read_all().to_pydict()
+
+    for i, row in enumerate(rows):
+        expected = client.post("/predict", json=row).json()["prediction"]
+        assert [result["grid_x"][i], result["grid_y"][i]] == [expected["grid_position"]["x"], expected["grid_position"]["y"]]
+        p = result["risk_probability"][i]
+        assert max(p, 1.0 - p) == pytest.approx(expected["confidence"], abs=1e-5)
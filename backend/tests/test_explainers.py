@@ -0,0 +1,76 @@
+import asyncio
+import time
+
+from Feature1 import explainers
+from Feature1.explainers import CircuitBreaker, ResilientExplainer, StubBackend
+
+def fallback():
+    return "template"
+
+def test_breaker_opens_half_opens_and_closes(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(explainers.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout_s=30)
+
+    breaker.record_failure()
+    assert breaker.state == "closed" and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open" and not breaker.allow()
+
+    now[0] += 30
+    assert breaker.state == "half-open"
+    assert breaker.allow() and not breaker.allow()  # a single trial call
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+    now[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed" and breaker.allow()
+
+def test_abandoned_trial_releases_the_half_open_slot(monkeypatch):
+    now = [0.0]
+    monkeypatch.setattr(explainers.time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_s=1)
+    breaker.record_failure()
+    now[0] += 1
+
+    assert breaker.allow()
+    breaker.record_abandoned()
+    assert breaker.allow()
+
+def test_explainer_falls_back_and_stops_calling_a_failing_backend():
+    backend = StubBackend(fail=True)
+    explainer = ResilientExplainer(backend, breaker=CircuitBreaker(failure_threshold=2, reset_timeout_s=0.1))
+
+    results = [explainer.explain("prompt", fallback) for _ in range(4)]
+
+    assert results == [("template", "fallback")] * 4
+    assert backend.calls == 2 and explainer.breaker.state == "open"
+    backend.fail = False
+    time.sleep(0.1)
+    assert explainer.explain("prompt", fallback)[1] == "llm"
+    assert explainer.breaker.state == "closed"
+
+def test_explainer_deadline():
+    explainer = ResilientExplainer(StubBackend(latency_s=1.0), timeout_s=0.05)
+
+    started = time.perf_counter()
+    assert explainer.explain("prompt", fallback) == ("template", "fallback")
+    assert time.perf_counter() - started < 0.5
+
+def collect(explainer):
+    async def run():
+        return [chunk async for chunk in explainer.stream("prompt", fallback)]
+    return asyncio.run(run())
+
+def test_stream_appends_the_template_after_a_partial_answer():
+    chunks = collect(ResilientExplainer(StubBackend(content="one two three four", fail=True)))
+
+    assert chunks[:2] == [("llm", "one"), ("llm", " two")]
+    assert chunks[-1] == ("fallback", "\n\ntemplate")
+
+def test_stream_without_failures():
+    chunks = collect(ResilientExplainer(StubBackend(content="one two")))
+
+    assert chunks == [("llm", "one"), ("llm", " two")]
@@ -0,0 +1,50 @@
+from Feature1 import explanation_cache
+from Feature1.explanation_cache import ExplanationCache
+
+PREDICTION = {"risk_label": "Risk", "confidence": 0.83}
+FEATURES = {"X": 420.0, "Y": 310.0, "Z": 55.0, "Rock_Type_enc": 1, "Ore_Grade (%)": 62.5, "Tonnage": 1500.0,
+            "Ore_Value (¥/tonne)": 48.0, "Mining_Cost (¥)": 42.0, "Processing_Cost (¥)": 9.0}
+
+def test_key_quantizes_features_and_confidence():
+    cache = ExplanationCache()
+    key = cache.make_key(PREDICTION, FEATURES)
+
+    # Within one resolution step / confidence bucket: same explanation
+    assert cache.make_key({**PREDICTION, "confidence": 0.84}, {**FEATURES, "X": 421.0, "Tonnage": 1510.0}) == key
+    assert cache.make_key(PREDICTION, {"unrelated": 1, **dict(reversed(FEATURES.items()))}) == key
+    # Anything the explanation depends on changes the key
+    assert cache.make_key({**PREDICTION, "risk_label": "Safe"}, FEATURES) != key
+    assert cache.make_key({**PREDICTION, "confidence": 0.91}, FEATURES) != key
+    assert cache.make_key(PREDICTION, {**FEATURES, "Rock_Type_enc": 4}) != key
+    assert cache.make_key(PREDICTION, {**FEATURES, "Mining_Cost (¥)": 45.0}) != key
+
+def test_custom_resolutions():
+    coarse = ExplanationCache(resolutions={"X": 100.0})
+
+    assert coarse.make_key(PREDICTION, FEATURES) == coarse.make_key(PREDICTION, {**FEATURES, "X": 440.0})
+    assert ExplanationCache().make_key(PREDICTION, FEATURES) != ExplanationCache().make_key(
+        PREDICTION, {**FEATURES, "X": 440.0}
+    )
+
+def test_lru_and_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(explanation_cache.time, "time", lambda: now[0])
+    cache = ExplanationCache(max_entries=2, ttl_seconds=60)
+    for key in ("a", "b"):
+        cache.put(key, f"explanation {key}")
+    cache.get("a")
+    cache.put("c", "explanation c")  # evicts b, the least recently used
+
+    assert [cache.get(key) for key in ("a", "b", "c")] == ["explanation a", None, "explanation c"]
+    now[0] += 61
+    assert cache.get("a") is None
+    assert cache.stats()["evictions"] == 1
+
+def test_sqlite_tier_survives_a_restart(tmp_path):
+    path = str(tmp_path / "explanations.db")
+    ExplanationCache(sqlite_path=path).put("key", "cached text", llm_seconds=1.5)
+
+    restarted = ExplanationCache(sqlite_path=path)
+
+    assert restarted.get("key") == "cached text"
+    assert restarted.stats()["disk_hits"] == 1
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from Feature1.features import LEGACY_SCALES, ROCK_TYPE_ENCODING, FeatureSpec
+
+FEATURES = ['Ore_Grade (%)', 'Tonnage', 'Ore_Value (¥/tonne)', 'Mining_Cost (¥)', 'Processing_Cost (¥)', 'Rock_Type_enc']
+MANIFEST = {
+    "version": "test",
+    "grid_size": 64,
+    "features": FEATURES,
+    "normalization": {
+        "mean": dict(zip(FEATURES, [50.0, 1000.0, 40.0, 10.0, 20.0, 1.0])),
+        "std": dict(zip(FEATURES, [10.0, 200.0, 5.0, 2.0, 4.0, 0.5])),
+    },
+    "bounds": {"x_min": 100.0, "x_max": 1100.0, "y_min": -50.0, "y_max": 450.0},
+    "rock_type_encoding": {"Basalt": 0, "Granite": 1, "Shale": 2},
+}
+
+def columns(**overrides):
+    base = {"X": [600.0], "Y": [200.0], "Z": [10.0], "Rock_Type_enc": [ROCK_TYPE_ENCODING["shale"]],
+            "Ore_Grade (%)": [60.0], "Tonnage": [800.0], "Ore_Value (¥/tonne)": [45.0],
+            "Mining_Cost (¥)": [12.0], "Processing_Cost (¥)": [16.0]}
+    return {key: np.asarray(overrides.get(key, values), dtype=np.float64) for key, values in base.items()}
+
+def test_manifest_normalization_and_rock_encoding():
+    vectors = FeatureSpec(MANIFEST).vectors(columns())
+
+    # Shale is API code 4 but was trained as 2
+    np.testing.assert_allclose(vectors[0], [1.0, -1.0, 1.0, 1.0, -1.0, 2.0], rtol=1e-6)
+
+def test_unknown_rock_type_sits_at_the_mean():
+    vectors = FeatureSpec(MANIFEST).vectors(columns(Rock_Type_enc=[ROCK_TYPE_ENCODING["marble"]]))
+
+    assert vectors[0, FEATURES.index("Rock_Type_enc")] == 0.0
+
+def test_missing_manifest_column_is_rejected():
+    spec = FeatureSpec(MANIFEST)
+    cols = columns()
+    del cols["Mining_Cost (¥)"]
+    del cols["Z"]  # not a feature of this version
+
+    assert spec.columns == ("X", "Y", *FEATURES)
+    with pytest.raises(ValueError, match="Mining_Cost"):
+        spec.vectors(cols)
+    spec.vectors({key: values for key, values in columns().items() if key != "Z"})
+
+def test_manifest_bounds():
+    grid_x, grid_y = FeatureSpec(MANIFEST).grid_indices([100.0, 1100.0, 0.0, 600.0], [-50.0, 450.0, 200.0, 1e6])
+
+    assert grid_x.tolist() == [0, 63, 0, 31]
+    assert grid_y.tolist() == [0, 63, 31, 63]
+
+def test_fixed_layout_without_manifest_fields():
+    spec = FeatureSpec({"version": "legacy", "grid_size": 64})
+    cols = columns()
+
+    vectors = spec.vectors(cols)
+    grid_x, grid_y = spec.grid_indices([500.0, 2000.0], [0.0, 999.0])
+
+    raw = [600.0, 200.0, 10.0, ROCK_TYPE_ENCODING["shale"], 60.0, 45.0 * 800.0]
+    np.testing.assert_allclose(vectors[0], np.array(raw) / LEGACY_SCALES, rtol=1e-6)
+    assert grid_x.tolist() == [31, 63] and grid_y.tolist() == [0, 62]
@@ -0,0 +1,72 @@
+import math
+import sqlite3
+
+import numpy as np
+import pytest
+
+from Feature1.history import AssessmentHistory
+
+@pytest.fixture
+def history(tmp_path):
+    history = AssessmentHistory(str(tmp_path / "history.db"))
+    rng = np.random.default_rng(0)
+    points = rng.uniform(0, 1000, size=(500, 2))
+    points[:20] = rng.normal(300, 5, size=(20, 2))  # a dense cluster
+    for i, (x, y) in enumerate(points):
+        history.record(x, y, 10.0, "granite", 50.0, 1000.0, "Risk" if i % 2 else "Safe", 0.5 + i / 1000)
+    history.flush()
+    yield history, points
+    history.close()
+
+def test_recent_is_newest_first(history):
+    history, points = history
+
+    rows = history.recent(3)
+
+    assert [(row["x"], row["y"]) for row in rows] == [tuple(p) for p in points[::-1][:3]]
+
+def test_bbox_matches_a_scan(history):
+    history, points = history
+    inside = (points[:, 0] >= 200) & (points[:, 0] <= 450) & (points[:, 1] >= 100) & (points[:, 1] <= 600)
+
+    rows, truncated = history.bbox(200, 100, 450, 600, limit=1000)
+    few, more = history.bbox(200, 100, 450, 600, limit=3)
+
+    assert sorted((row["x"], row["y"]) for row in rows) == sorted(map(tuple, points[inside]))
+    assert not truncated and more and len(few) == 3
+
+@pytest.mark.parametrize("x, y, n", [
+    (300.0, 300.0, 5), (300.0, 300.0, 50), (900.0, 50.0, 7), (-500.0, 2000.0, 4), (300.0, 300.0, 500),
+])
+def test_nearest_matches_a_scan(history, x, y, n):
+    history, points = history
+    expected = np.sort(np.hypot(points[:, 0] - x, points[:, 1] - y))[:n]
+
+    rows = history.nearest(x, y, n)
+
+    np.testing.assert_allclose([row["distance"] for row in rows], expected)
+    assert all(math.isclose(row["distance"], math.hypot(row["x"] - x, row["y"] - y)) for row in rows)
+
+def test_counts_follow_deletes(history, tmp_path):
+    history, points = history
+    with sqlite3.connect(history.path) as db:
+        db.execute("DELETE FROM assessments WHERE id <= 100")
+
+    assert history.stats()["rows"] == len(points) - 100
+    assert len(history.nearest(300.0, 300.0, len(points))) == len(points) - 100
+
+def test_predict_is_recorded(client):
+    import app
+    from conftest import SAMPLE_INPUT
+
+    row = {**SAMPLE_INPUT, "X": 12.5, "Y": 987.5}
+    prediction = client.post("/predict", json=row).json()["prediction"]
+    app.assessment_history.flush()
+
+    nearest = client.get("/assessments/nearest", params={"x": 12.5, "y": 987.5, "n": 1}).json()["assessments"][0]
+    rows = client.get("/assessments/bbox", params={"x_min": 0, "y_min": 980, "x_max": 20, "y_max": 990}).json()
+
+    assert nearest["distance"] == 0.0 and nearest["risk_label"] == prediction["risk_label"]
+    assert nearest["model_version"] == "test-v1" and nearest["explanation"]
+    assert any(r["id"] == nearest["id"] for r in rows["assessments"])
+    assert client.get("/assessments/bbox", params={"x_min": 5, "y_min": 0, "x_max": 0, "y_max": 1}).status_code == 400
@@ -0,0 +1,26 @@
+import pytest
+import torch
+
+from Feature1.inference import (
+    ENGINE_MODES, PARITY_TOLERANCE, FusedSimpleCNN, build_engine, check_parity, quantize_int8, reference_grids,
+)
+
+@pytest.mark.parametrize("mode", ENGINE_MODES)
+def test_engine_within_accuracy_budget(model, mode):
+    parity = check_parity(model, build_engine(model, mode))
+
+    assert parity["max_abs_diff"] <= PARITY_TOLERANCE[mode]
+
+@pytest.mark.parametrize("mode", ["fused", "script"])
+def test_exact_engines_keep_every_label(model, mode):
+    assert check_parity(model, build_engine(model, mode))["label_agreement"] == 1.0
+
+def test_int8_restores_quantized_engine(model):
+    before = torch.backends.quantized.engine
+    others = [e for e in ("qnnpack", "x86", "fbgemm") if e in torch.backends.quantized.supported_engines and e != before]
+    if not others:
+        pytest.skip("only one quantized engine available")
+
+    quantize_int8(FusedSimpleCNN(model), reference_grids(count=8), backend=others[0])
+
+    assert torch.backends.quantized.engine == before
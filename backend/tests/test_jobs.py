@@ -0,0 +1,43 @@
+import threading
+import time
+
+import pytest
+
+from Feature1.jobs import ExplanationJobs, JobQueueFull
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+def test_pending_jobs_are_bounded():
+    release = threading.Event()
+    jobs = ExplanationJobs(lambda prediction, features: release.wait(5) and {"explanation": "ok"},
+                           max_workers=1, max_pending=2)
+    try:
+        first = jobs.submit({}, {})
+        jobs.submit({}, {})
+        with pytest.raises(JobQueueFull):
+            jobs.submit({}, {})
+
+        release.set()
+        wait_for(lambda: jobs.pending() == 0)
+        assert jobs.get(first)["result"] == {"explanation": "ok"}
+        jobs.submit({}, {})
+    finally:
+        release.set()
+        jobs.shutdown(wait=True)
+
+def test_failed_jobs_free_their_slot():
+    def explain(prediction, features):
+        raise RuntimeError("groq down")
+
+    jobs = ExplanationJobs(explain, max_workers=1, max_pending=1)
+    try:
+        job_id = jobs.submit({}, {})
+        wait_for(lambda: jobs.pending() == 0)
+        assert jobs.get(job_id)["status"] == "failed"
+        jobs.submit({}, {})
+    finally:
+        jobs.shutdown(wait=True)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+import torch
+
+from Feature1.pointeval import PointEvaluator, check_parity
+
+GRID_SIZE = 64
+TOLERANCE = 1e-5
+
+# Corners, edges, one cell in from the edge (its window still touches the padding) and the interior
+BORDER_CELLS = [(0, 0), (0, GRID_SIZE - 1), (GRID_SIZE - 1, 0), (GRID_SIZE - 1, GRID_SIZE - 1),
+                (0, 31), (63, 17), (40, 0), (9, 63), (1, 1), (62, 62), (1, 40)]
+INTERIOR_CELLS = [(2, 2), (31, 32), (17, 48), (61, 61)]
+
+def full_forward(model, grids, grid_y, grid_x):
+    with torch.no_grad():
+        _, probs = model(torch.from_numpy(grids))
+    return probs[np.arange(len(grids)), :, grid_y, grid_x].numpy()
+
+def test_check_parity_random_weights(model):
+    assert check_parity(model, grid_size=GRID_SIZE) < TOLERANCE
+
+@pytest.mark.parametrize("cells", [BORDER_CELLS, INTERIOR_CELLS], ids=["border", "interior"])
+def test_constant_grids(model, cells):
+    rng = np.random.default_rng(1)
+    grid_y, grid_x = np.array(cells).T
+    vectors = rng.uniform(-1.0, 2.0, size=(len(cells), model.conv1.in_channels)).astype(np.float32)
+    grids = np.ascontiguousarray(np.broadcast_to(vectors[:, :, None, None], vectors.shape + (GRID_SIZE, GRID_SIZE)))
+
+    probs = PointEvaluator(model).predict_constant(vectors, grid_y, grid_x, GRID_SIZE)
+
+    assert np.abs(probs - full_forward(model, grids, grid_y, grid_x)).max() < TOLERANCE
+
+@pytest.mark.parametrize("cells", [BORDER_CELLS, INTERIOR_CELLS], ids=["border", "interior"])
+def test_arbitrary_grids(model, cells):
+    rng = np.random.default_rng(2)
+    grid_y, grid_x = np.array(cells).T
+    grids = rng.normal(0.5, 0.5, size=(len(cells), model.conv1.in_channels, GRID_SIZE, GRID_SIZE)).astype(np.float32)
+
+    probs = PointEvaluator(model).predict_grid(grids, grid_y, grid_x)
+
+    assert np.abs(probs - full_forward(model, grids, grid_y, grid_x)).max() < TOLERANCE
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+import torch
+
+from Feature1.registry import ModelRegistry, publish
+
+@pytest.fixture
+def registry_dir(tmp_path, make_model):
+    weights = tmp_path / "model.pt"
+    torch.save(make_model(0).state_dict(), weights)
+    root = tmp_path / "models"
+    publish(str(root), str(weights), {"version": "v1", "channels": 6})
+    return str(root)
+
+def test_load_only_published_versions(registry_dir):
+    registry = ModelRegistry(registry_dir)
+
+    assert registry.load("v1").version == "v1"
+    for name in ("..", "../models/v1", os.path.abspath(os.path.join(registry_dir, "v1")), "v2"):
+        with pytest.raises(FileNotFoundError):
+            registry.load(name)
+
+def test_failed_publish_leaves_no_staging_dir(registry_dir, tmp_path):
+    with pytest.raises(FileNotFoundError):
+        publish(registry_dir, str(tmp_path / "model.pt"), {"version": "v2"}, members=[str(tmp_path / "missing.pt")])
+
+    assert sorted(os.listdir(registry_dir)) == ["CURRENT", "v1"]
+
+def test_engine_is_built_on_first_use(registry_dir):
+    version = ModelRegistry(registry_dir, inference_mode="full").load("v1")
+
+    assert version._full_engine is None
+    assert version.full_engine is version.full_engine
@@ -0,0 +1,49 @@
+import io
+import os
+
+import numpy as np
+import pytest
+
+from Feature1.riskmap import RiskMap, save_risk_map
+
+BOUNDS = {"x_min": 0.0, "x_max": 630.0, "y_min": 100.0, "y_max": 730.0}
+LABELS = {0: "Safe", 1: "Risk"}
+
+def site_map(grid_size=64, seed=0):
+    risk = np.random.default_rng(seed).uniform(size=(grid_size, grid_size))
+    return np.stack([1.0 - risk, risk]).astype(np.float32)
+
+def test_save_and_lookup(tmp_path):
+    probs = site_map()
+    path = save_risk_map(str(tmp_path / "map.npy"), probs, BOUNDS, LABELS)
+
+    risk_map = RiskMap(path)
+    cell = risk_map.cell(*risk_map.to_grid(320.0, 105.0)[::-1])
+
+    assert sorted(os.listdir(tmp_path)) == ["map.json", "map.npy"]
+    assert cell["grid_position"] == {"x": 32, "y": 0}
+    assert cell["probabilities"]["Risk"] == pytest.approx(probs[1, 0, 32], abs=1e-3)
+    with pytest.raises(IndexError):
+        risk_map.cell(64, 0)
+
+def test_endpoints_serve_the_saved_map(client):
+    path = os.environ["ROCKFALL_RISK_MAP"]
+    probs = site_map()
+    save_risk_map(path, probs, BOUNDS, LABELS)
+
+    cell = client.get("/risk-map/cell", params={"x": 630.0, "y": 730.0}).json()
+    window = client.get("/risk-map/window", params={"x_min": 0, "y_min": 100, "x_max": 20, "y_max": 120}).json()
+    tile = np.load(io.BytesIO(client.get("/risk-map", params={"format": "npy"}).content))
+
+    assert cell["grid_position"] == {"x": 63, "y": 63}
+    assert cell["probabilities"]["Risk"] == pytest.approx(probs[1, 63, 63], abs=1e-3)
+    assert window["grid_window"] == {"x0": 0, "y0": 0, "x1": 2, "y1": 2}
+    np.testing.assert_allclose(window["risk_probability"], probs[1, :3, :3], atol=1e-3)
+    np.testing.assert_array_equal(tile, probs.astype(np.float16))
+
+    # A regenerated map is picked up without a restart
+    save_risk_map(path, site_map(seed=1), BOUNDS, LABELS)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    regenerated = client.get("/risk-map/cell", params={"grid_x": 63, "grid_y": 63}).json()
+    assert regenerated["probabilities"]["Risk"] == pytest.approx(site_map(seed=1)[1, 63, 63], abs=1e-3)
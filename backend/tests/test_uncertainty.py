@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+import torch
+
+from Feature1.registry import ModelVersion, UncertaintyUnavailable, file_sha256
+from Feature1.uncertainty import UncertaintyEstimator, check_parity, summarize
+
+TOLERANCE = 1e-5
+
+def test_check_parity_random_weights(model):
+    assert check_parity(model) < TOLERANCE
+
+def test_ensemble_members_match_their_own_forward_pass(make_model):
+    members = [make_model(seed) for seed in range(3)]
+    rng = np.random.default_rng(0)
+    vectors = rng.uniform(-1.0, 2.0, size=(8, 6)).astype(np.float32)
+    grid_y = np.array([0, 63, 0, 63, 1, 32, 62, 17])
+    grid_x = np.array([0, 0, 63, 63, 32, 1, 62, 40])
+    grids = np.ascontiguousarray(np.broadcast_to(vectors[:, :, None, None], (8, 6, 64, 64)))
+
+    passes = UncertaintyEstimator(members).sample(vectors, grid_y, grid_x, 64)
+
+    for k, member in enumerate(members):
+        with torch.no_grad():
+            _, probs = member(torch.from_numpy(grids))
+        expected = probs[np.arange(8), :, grid_y, grid_x].numpy()
+        assert np.abs(passes[k] - expected).max() < TOLERANCE
+
+def test_mc_dropout_passes_differ(make_model):
+    estimator = UncertaintyEstimator([make_model(0)], samples=16, dropout=0.2)
+    passes = estimator.sample(np.ones((4, 6), dtype=np.float32), np.array([0, 10, 30, 63]), np.array([5, 10, 30, 63]), 64)
+
+    assert passes.shape == (16, 4, 2)
+    _, variance, interval = summarize(passes)
+    assert (variance > 0).all()
+    assert (interval[:, 0] <= interval[:, 1]).all()
+
+@pytest.fixture
+def weights(tmp_path, make_model):
+    path = tmp_path / "model.pt"
+    torch.save(make_model(0).state_dict(), path)
+    return str(path)
+
+def test_refused_without_dropout_or_members(weights):
+    version = ModelVersion({"version": "plain", "channels": 6}, weights)
+
+    with pytest.raises(UncertaintyUnavailable):
+        version.uncertainty
+
+def test_mc_dropout_at_training_rate(weights):
+    version = ModelVersion({"version": "dropout", "channels": 6, "dropout": 0.25}, weights)
+
+    assert version.uncertainty.method == "mc_dropout"
+    assert version.uncertainty.dropout == 0.25
+
+def test_ensemble_from_manifest_members(weights):
+    manifest = {"version": "ensemble", "channels": 6,
+                "ensemble": [{"weights": "model.pt", "sha256": file_sha256(weights)}]}
+
+    estimator = ModelVersion(manifest, weights).uncertainty
+
+    assert estimator.method == "ensemble" and estimator.samples == 2
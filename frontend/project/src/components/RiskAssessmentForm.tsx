@@ -1,7 +1,7 @@
 import React, { useState } from 'react';
 import { MapPin, Loader2, AlertCircle, CheckCircle, TrendingUp } from 'lucide-react';
 import { RiskAssessmentInput, PredictionResponse } from '../types';
-import { predictRisk } from '../services/api';
+import { predictRisk, predictRiskStream } from '../services/api';
 import { rockTypeOptions } from '../data/mockData';
 
 const RiskAssessmentForm: React.FC = () => {
@@ -35,7 +35,14 @@ const RiskAssessmentForm: React.FC = () => {
     setError(null);
 
     try {
-      const result = await predictRisk(formData);
+      // Show the risk label as soon as it is known; the explanation fills in as it streams
+      const result = await predictRiskStream(formData, (partial) => {
+        setPrediction(partial);
+        setIsLoading(false);
+      }).catch((streamError) => {
+        console.warn('Streaming prediction failed, falling back to /predict:', streamError);
+        return predictRisk(formData);
+      });
       setPrediction(result);
     } catch (err) {
       setError('Failed to get prediction. Please try again.');
@@ -1,25 +1,27 @@
-import { RiskAssessmentInput, PredictionResponse } from '../types';
+import { RiskAssessmentInput, PredictionResponse, RiskMapTile, SweepRange, SweepResponse, AssessmentRecord } from '../types';
 
 const API_BASE_URL = "http://localhost:8000";
 
-export const predictRisk = async (data: RiskAssessmentInput): Promise<PredictionResponse> => {
+// Transform the data to match FastAPI field names/aliases
+const toApiPayload = (data: RiskAssessmentInput) => ({
+  X: data.X,
+  Y: data.Y,
+  Z: data.Z,
+  Rock_Type: data.Rock_Type,
+  "Ore_Grade (%)": data.Ore_Grade_percent,  // Note the alias with parentheses
+  Tonnage: data.Tonnage,
+  "Ore_Value (¥/tonne)": data.Ore_Value_per_tonne,  // Note the alias
+  "Mining_Cost (¥)": data.Mining_Cost,  // Note the alias
+  "Processing_Cost (¥)": data.Processing_Cost  // Note the alias
+});
+
+export const predictRisk = async (data: RiskAssessmentInput, uncertainty = false): Promise<PredictionResponse> => {
   try {
-    // Transform the data to match FastAPI field names/aliases
-    const apiPayload = {
-      X: data.X,
-      Y: data.Y,
-      Z: data.Z,
-      Rock_Type: data.Rock_Type,
-      "Ore_Grade (%)": data.Ore_Grade_percent,  // Note the alias with parentheses
-      Tonnage: data.Tonnage,
-      "Ore_Value (¥/tonne)": data.Ore_Value_per_tonne,  // Note the alias
-      "Mining_Cost (¥)": data.Mining_Cost,  // Note the alias
-      "Processing_Cost (¥)": data.Processing_Cost  // Note the alias
-    };
+    const apiPayload = toApiPayload(data);
 
     console.log('Sending API payload:', apiPayload); // Debug log
 
-    const response = await fetch(`${API_BASE_URL}/predict`, {
+    const response = await fetch(`${API_BASE_URL}/predict${uncertainty ? '?uncertainty=true' : ''}`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -75,5 +77,118 @@ export const predictRisk = async (data: RiskAssessmentInput): Promise<Prediction
   }
 };
 
+// Streaming prediction (/predict-stream, server-sent events over a POST body).
+// onUpdate is called with the partial response as soon as the CNN result arrives,
+// then again for every explanation chunk; the promise resolves with the final response.
+export const predictRiskStream = async (
+  data: RiskAssessmentInput,
+  onUpdate: (partial: PredictionResponse) => void
+): Promise<PredictionResponse> => {
+  const response = await fetch(`${API_BASE_URL}/predict-stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      Accept: 'text/event-stream',
+    },
+    body: JSON.stringify(toApiPayload(data)),
+  });
+
+  if (!response.ok || !response.body) {
+    throw new Error(`Failed to get prediction: ${response.status} ${response.statusText}`);
+  }
+
+  let result: PredictionResponse | null = null;
+  const handleEvent = (event: string, payload: any) => {
+    if (event === 'prediction') {
+      result = {
+        success: true,
+        prediction: payload,
+        explanation: '',
+        key_factors: [],
+        safety_recommendations: [],
+        input_summary: { location: '', rock_type: '', ore_details: '', economic_summary: '' },
+        metadata: { rock_type_original: data.Rock_Type, total_value: 0, profit_margin: 0 },
+      };
+    } else if (event === 'error') {
+      throw new Error(payload.detail);
+    } else if (result && event === 'token') {
+      result = { ...result, explanation: result.explanation + payload.text };
+    } else if (result && event === 'done') {
+      result = { ...result, ...payload, metadata: { ...result.metadata, ...payload.metadata } };
+    }
+    if (result) onUpdate(result);
+  };
+
+  // Events are separated by a blank line; a network chunk can end mid-event
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+    let boundary;
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const frame = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      let event = 'message';
+      let dataLine = '';
+      for (const line of frame.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim();
+        else if (line.startsWith('data:')) dataLine += line.slice(5).trim();
+      }
+      if (dataLine) handleEvent(event, JSON.parse(dataLine));
+    }
+  }
+
+  if (!result) {
+    throw new Error('Prediction stream ended before a prediction was received');
+  }
+  return result;
+};
+
+// Whole precomputed site risk map in one request (no per-cell predictions)
+export const getRiskMap = async (): Promise<RiskMapTile> => {
+  const response = await fetch(`${API_BASE_URL}/risk-map`);
+  if (!response.ok) {
+    throw new Error(`Failed to load risk map: ${response.status} ${response.statusText}`);
+  }
+  return response.json();
+};
+
+// What-if sweep: risk over one or two parameter ranges around the form values
+export const predictSweep = async (data: RiskAssessmentInput, ranges: SweepRange[]): Promise<SweepResponse> => {
+  const response = await fetch(`${API_BASE_URL}/predict-sweep`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ base: toApiPayload(data), ranges }),
+  });
+  if (!response.ok) {
+    throw new Error(`Failed to run sweep: ${response.status} ${response.statusText}`);
+  }
+  return response.json();
+};
+
+// Assessment history: past scored assessments by recency, area or proximity
+const getAssessments = async (path: string, params: Record<string, number>) => {
+  const query = new URLSearchParams(Object.entries(params).map(([k, v]) => [k, String(v)]));
+  const response = await fetch(`${API_BASE_URL}/assessments/${path}?${query}`);
+  if (!response.ok) {
+    throw new Error(`Failed to fetch assessments: ${response.status} ${response.statusText}`);
+  }
+  return response.json();
+};
+
+export const getRecentAssessments = async (limit = 50): Promise<AssessmentRecord[]> =>
+  (await getAssessments('recent', { limit })).assessments;
+
+export const getAssessmentsInBox = async (
+  x_min: number, y_min: number, x_max: number, y_max: number, limit = 1000
+): Promise<{ assessments: AssessmentRecord[]; truncated: boolean }> =>
+  getAssessments('bbox', { x_min, y_min, x_max, y_max, limit });
+
+export const getNearestAssessments = async (x: number, y: number, n = 10): Promise<AssessmentRecord[]> =>
+  (await getAssessments('nearest', { x, y, n })).assessments;
+
 // Alternative: You could also modify your FastAPI to accept both formats
 // But it's easier to fix the frontend to match the backend
\ No newline at end of file
@@ -16,14 +16,27 @@ export interface RiskAssessmentInput {
   Processing_Cost: number;
 }
 
+export interface PredictionUncertainty {
+  method: 'mc_dropout' | 'ensemble';
+  samples: number;
+  mean_risk_probability: number;
+  variance: number;
+  std: number;
+  interval: [number, number];
+  interval_level: number;
+}
+
 export interface PredictionResponse {
   success: boolean;
   prediction: {
     risk_label: string;
     confidence: number;
     grid_position: { x: number; y: number };
+    // Only when requested with uncertainty=true
+    uncertainty?: PredictionUncertainty;
   };
   explanation: string;
+  explanation_source?: 'llm' | 'cache' | 'fallback';
   key_factors: string[];
   safety_recommendations: string[];
   input_summary: {
@@ -39,6 +52,52 @@ export interface PredictionResponse {
   };
 }
 
+export interface RiskMapTile {
+  grid_size: number;
+  bounds: { x_min: number; x_max: number; y_min: number; y_max: number };
+  class_labels: Record<string, string>;
+  risk_probability: number[][];
+  risk_label: number[][];
+}
+
+export interface SweepRange {
+  parameter: 'X' | 'Y' | 'Z' | 'Rock_Type' | 'Ore_Grade (%)' | 'Tonnage' | 'Ore_Value (¥/tonne)';
+  start?: number;
+  stop?: number;
+  steps?: number;
+  values?: (number | string)[];
+}
+
+export interface SweepResponse {
+  success: boolean;
+  parameters: { name: string; values: (number | string)[] }[];
+  shape: number[];
+  // number[] for one range (curve), number[][] for two (surface)
+  risk_probability: number[] | number[][];
+  predicted_class: number[] | number[][];
+  class_labels: Record<string, string>;
+  metadata: { points: number; model_version: string };
+}
+
+// One row of the backend assessment history (/assessments/*)
+export interface AssessmentRecord {
+  id: number;
+  created_at: number;
+  x: number;
+  y: number;
+  z: number;
+  rock_type: string;
+  ore_grade: number;
+  tonnage: number;
+  risk_label: string;
+  confidence: number;
+  explanation: string | null;
+  explanation_source: string | null;
+  model_version: string | null;
+  // Only on /assessments/nearest results
+  distance?: number;
+}
+
 export interface RecentAssessment {
   id: string;
   location: string;
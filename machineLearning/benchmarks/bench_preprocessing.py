@@ -0,0 +1,73 @@
+"""
+Vectorized grid construction (preprocessing.build_grids) vs the old iterrows loops.
+Run: python machineLearning/benchmarks/bench_preprocessing.py
+"""
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from preprocessing import build_grids, compute_bounds, map_to_grid
+
+FEATURES = [
+    'Ore_Grade (%)',
+    'Tonnage',
+    'Ore_Value (¥/tonne)',
+    'Mining_Cost (¥)',
+    'Processing_Cost (¥)',
+    'Rock_Type_enc'
+]
+
+def synthetic_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({f: rng.normal(size=rows) for f in FEATURES})
+    df['X'] = rng.uniform(0, 1000, size=rows)
+    df['Y'] = rng.uniform(0, 1000, size=rows)
+    df['Target'] = rng.integers(0, 2, size=rows)
+    return df
+
+def loop_grids(df, grid_size, bounds):
+    """The original steps 4 and 5 of machinelearning.py"""
+    df = df.copy()
+    df['grid_x'], df['grid_y'] = map_to_grid(df['X'], df['Y'], bounds, grid_size)
+    feature_grid = np.zeros((len(FEATURES), grid_size, grid_size), dtype=np.float32)
+    for i, feature in enumerate(FEATURES):
+        for _, row in df.iterrows():
+            feature_grid[i, int(row['grid_y']), int(row['grid_x'])] = row[feature]
+    target_grid = np.zeros((grid_size, grid_size), dtype=np.int64)
+    for _, row in df.iterrows():
+        target_grid[int(row['grid_y']), int(row['grid_x'])] = row['Target']
+    return feature_grid, target_grid
+
+def run(sizes=(1_000, 10_000, 100_000, 1_000_000), loop_max_rows=20_000, grid_size=64):
+    results = []
+    for rows in sizes:
+        df = synthetic_frame(rows)
+        bounds = compute_bounds(df['X'], df['Y'])
+        case = {"rows": rows}
+        for policy in ("last", "mean", "max"):
+            start = time.perf_counter()
+            feature_grid, target_grid, _ = build_grids(df, FEATURES, grid_size, bounds=bounds, policy=policy)
+            case[f"vectorized_{policy}_s"] = time.perf_counter() - start
+        if rows <= loop_max_rows:
+            start = time.perf_counter()
+            ref_features, ref_targets = loop_grids(df, grid_size, bounds)
+            case["loops_s"] = time.perf_counter() - start
+            case["speedup"] = case["loops_s"] / case["vectorized_last_s"]
+            # 'last' must reproduce the loops exactly
+            last_features, last_targets, _ = build_grids(df, FEATURES, grid_size, bounds=bounds, policy="last")
+            case["matches_loops"] = bool(
+                np.array_equal(last_features, ref_features) and np.array_equal(last_targets, ref_targets)
+            )
+        results.append(case)
+    return results
+
+if __name__ == "__main__":
+    for case in run():
+        line = f"{case['rows']:>9} rows: vectorized last {case['vectorized_last_s'] * 1e3:8.1f} ms"
+        line += f", mean {case['vectorized_mean_s'] * 1e3:8.1f} ms, max {case['vectorized_max_s'] * 1e3:8.1f} ms"
+        if "loops_s" in case:
+            line += f" | loops {case['loops_s']:7.2f} s ({case['speedup']:.0f}x, matches={case['matches_loops']})"
+        print(line)
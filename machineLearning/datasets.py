@@ -0,0 +1,54 @@
+import numpy as np
+import torch
+from torch.utils.data import Dataset
+
+# Target value for padded cells; nn.NLLLoss skips it by default
+IGNORE_INDEX = -100
+
+def tile_starts(length, patch_size, stride):
+    """Start offsets that cover [0, length) with patches; the last patch is aligned to the edge"""
+    if length <= patch_size:
+        return [0]
+    starts = list(range(0, length - patch_size + 1, stride))
+    if starts[-1] != length - patch_size:
+        starts.append(length - patch_size)
+    return starts
+
+class TiledGridDataset(Dataset):
+    """
+    Overlapping patches cut from one or more site grids.
+    feature_grids: [C, H, W] array or list of them (one per site, memmaps are fine)
+    target_grids: [H, W] array or list of them
+    Patches at the border of grids smaller than patch_size are zero-padded,
+    with padded targets set to IGNORE_INDEX.
+    """
+
+    def __init__(self, feature_grids, target_grids, patch_size=64, stride=None):
+        if not isinstance(feature_grids, (list, tuple)):
+            feature_grids, target_grids = [feature_grids], [target_grids]
+        if len(feature_grids) != len(target_grids):
+            raise ValueError("feature_grids and target_grids must have the same number of sites")
+        self.feature_grids = feature_grids
+        self.target_grids = target_grids
+        self.patch_size = patch_size
+        stride = stride or patch_size
+        self.index = []
+        for site, grid in enumerate(feature_grids):
+            _, height, width = grid.shape
+            for y0 in tile_starts(height, patch_size, stride):
+                for x0 in tile_starts(width, patch_size, stride):
+                    self.index.append((site, y0, x0))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __getitem__(self, idx):
+        site, y0, x0 = self.index[idx]
+        p = self.patch_size
+        features = np.asarray(self.feature_grids[site][:, y0:y0 + p, x0:x0 + p], dtype=np.float32)
+        targets = np.asarray(self.target_grids[site][y0:y0 + p, x0:x0 + p], dtype=np.int64)
+        h, w = targets.shape
+        if h < p or w < p:
+            features = np.pad(features, ((0, 0), (0, p - h), (0, p - w)))
+            targets = np.pad(targets, ((0, p - h), (0, p - w)), constant_values=IGNORE_INDEX)
+        return torch.from_numpy(features), torch.from_numpy(targets)
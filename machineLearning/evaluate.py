@@ -0,0 +1,144 @@
+import os
+import json
+import numpy as np
+import torch
+
+# ------- Evaluation stage -------
+# Metrics and figures for a trained model, kept out of the training loop so
+# headless training never imports matplotlib/seaborn. machinelearning.py runs
+# the metrics (ROCKFALL_EVALUATE); the figures are opt-in, or run later on the
+# saved artifacts:
+#   python evaluate.py [--model rockfall_model.pt] [--dir .] [--no-plots]
+
+CLASS_NAMES = ['Safe', 'Critical']
+
+def predict_grid(model, feature_grid, device):
+    """Full-grid forward pass: (predictions [H, W], risk probabilities [H, W], probs [classes, H, W])"""
+    model.eval()
+    with torch.no_grad():
+        features = torch.as_tensor(np.asarray(feature_grid, dtype=np.float32)).unsqueeze(0).to(device)
+        log_probs, probs = model(features)
+    predictions = torch.argmax(log_probs, dim=1).squeeze(0).cpu().numpy()
+    probs = probs.squeeze(0).cpu().numpy()
+    return predictions, probs[1], probs
+
+def risk_levels(predictions, risk_probability):
+    """Four display levels from the binary output: 0 Critical, 1 Danger, 2 Normal, 3 Safe"""
+    levels = np.full(predictions.shape, 3)
+    risky = predictions == 1
+    levels[risky & (risk_probability > 0.5)] = 2
+    levels[risky & (risk_probability > 0.65)] = 1
+    levels[risky & (risk_probability > 0.85)] = 0
+    return levels
+
+def compute_metrics(target_grid, predictions, risk_probability, mask=None):
+    """Classification report, confusion matrix and ROC AUC over the cells in mask (default: all)"""
+    from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score
+
+    y_true = np.asarray(target_grid).ravel()
+    y_pred = np.asarray(predictions).ravel()
+    y_score = np.asarray(risk_probability).ravel()
+    if mask is not None:
+        keep = np.asarray(mask).ravel()
+        y_true, y_pred, y_score = y_true[keep], y_pred[keep], y_score[keep]
+    metrics = {
+        "cells": int(len(y_true)),
+        "report": classification_report(
+            y_true, y_pred, labels=[0, 1], target_names=CLASS_NAMES, output_dict=True, zero_division=0
+        ),
+        "confusion_matrix": confusion_matrix(y_true, y_pred, labels=[0, 1]).tolist(),
+        "roc_auc": None,
+    }
+    if len(np.unique(y_true)) == 2:
+        metrics["roc_auc"] = float(roc_auc_score(y_true, y_score))
+    return metrics
+
+def print_metrics(metrics, title="All cells"):
+    report = metrics["report"]
+    print(f"{title} ({metrics['cells']} cells): accuracy {report['accuracy']:.4f}, "
+          f"Critical precision {report['Critical']['precision']:.4f} recall {report['Critical']['recall']:.4f}")
+    print("Confusion Matrix:\n", np.array(metrics["confusion_matrix"]))
+    if metrics["roc_auc"] is None:
+        print("ROC AUC Score: undefined (only one class present)")
+    else:
+        print(f"ROC AUC Score: {metrics['roc_auc']:.4f}")
+
+def save_plots(target_grid, predictions, risk_probability, out_dir="."):
+    """Confusion matrix heatmap, ROC curve and risk level map as PNGs; returns their paths"""
+    import matplotlib
+    matplotlib.use("Agg")  # no display needed
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    from sklearn.metrics import confusion_matrix, roc_curve, roc_auc_score
+
+    y_true = np.asarray(target_grid).ravel()
+    y_pred = np.asarray(predictions).ravel()
+    y_score = np.asarray(risk_probability).ravel()
+    paths = []
+
+    plt.figure(figsize=(6, 5))
+    cm = confusion_matrix(y_true, y_pred, labels=[0, 1])
+    sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=CLASS_NAMES, yticklabels=CLASS_NAMES)
+    plt.xlabel('Predicted')
+    plt.ylabel('Actual')
+    plt.title('Confusion Matrix')
+    paths.append(os.path.join(out_dir, 'confusion_matrix.png'))
+    plt.savefig(paths[-1])
+    plt.close()
+
+    if len(np.unique(y_true)) == 2:
+        fpr, tpr, _ = roc_curve(y_true, y_score)
+        plt.figure()
+        plt.plot(fpr, tpr, label=f'ROC curve (area = {roc_auc_score(y_true, y_score):.2f})')
+        plt.plot([0, 1], [0, 1], 'k--')
+        plt.xlabel('False Positive Rate')
+        plt.ylabel('True Positive Rate')
+        plt.title('ROC Curve')
+        plt.legend(loc='lower right')
+        paths.append(os.path.join(out_dir, 'roc_curve.png'))
+        plt.savefig(paths[-1])
+        plt.close()
+
+    plt.figure(figsize=(8, 6))
+    cmap = plt.get_cmap('RdYlGn_r', 4)  # 4 discrete colors
+    plt.imshow(risk_levels(predictions, risk_probability), cmap=cmap, vmin=0, vmax=3)
+    cbar = plt.colorbar(ticks=[0, 1, 2, 3])
+    cbar.set_ticklabels(['Critical', 'Danger', 'Normal', 'Safe'])
+    plt.title('Predicted Rockfall Risk Levels')
+    paths.append(os.path.join(out_dir, 'risk_level_map.png'))
+    plt.savefig(paths[-1])
+    plt.close()
+    return paths
+
+def evaluate(model, feature_grid, target_grid, device, holdout=None, plots=False, out_dir="."):
+    """Metrics over all cells (and the validation holdout, if given); writes evaluation.json and optional figures"""
+    predictions, risk_probability, _ = predict_grid(model, feature_grid, device)
+    results = {"all": compute_metrics(target_grid, predictions, risk_probability)}
+    print_metrics(results["all"])
+    if holdout is not None and holdout.any():
+        results["holdout"] = compute_metrics(target_grid, predictions, risk_probability, mask=holdout)
+        print_metrics(results["holdout"], "Validation holdout")
+    with open(os.path.join(out_dir, 'evaluation.json'), 'w') as f:
+        json.dump(results, f, indent=2)
+    if plots:
+        results["figures"] = save_plots(target_grid, predictions, risk_probability, out_dir)
+    return results
+
+if __name__ == "__main__":
+    import argparse
+    from network import SimpleCNN
+
+    parser = argparse.ArgumentParser(description="Evaluate a trained rockfall model on the saved site grids")
+    parser.add_argument("--model", default="rockfall_model.pt")
+    parser.add_argument("--dir", default=".", help="where machinelearning.py saved feature_grid.npy / target_grid.npy")
+    parser.add_argument("--no-plots", action="store_true")
+    args = parser.parse_args()
+
+    feature_grid = np.load(os.path.join(args.dir, "feature_grid.npy"), mmap_mode="r")
+    target_grid = np.load(os.path.join(args.dir, "target_grid.npy"), mmap_mode="r")
+    holdout_path = os.path.join(args.dir, "holdout_mask.npy")
+    holdout = np.load(holdout_path) if os.path.exists(holdout_path) else None
+    device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+    model = SimpleCNN(in_channels=feature_grid.shape[0]).to(device)
+    model.load_state_dict(torch.load(args.model, map_location=device))
+    evaluate(model, feature_grid, target_grid, device, holdout=holdout, plots=not args.no_plots, out_dir=args.dir)
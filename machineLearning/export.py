@@ -0,0 +1,18 @@
+import os
+import sys
+
+# ------- Publish a trained model into the backend's model registry -------
+# Uses backend/Feature1/registry.py's publish(), so there is one implementation of
+# the layout (<registry>/<version>/model.pt + manifest.json, <registry>/CURRENT),
+# the atomic staging, the duplicate-version check and ensemble members.
+# The site risk map goes through Feature1/riskmap.py's save_risk_map the same way.
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from Feature1.registry import publish  # noqa: E402
+from Feature1.riskmap import save_risk_map  # noqa: E402,F401
+
+def publish_model(registry_dir, weights_path, manifest, activate=True, members=()):
+    """Copy weights (+ ensemble members) and manifest into a new registry version; returns the manifest"""
+    return publish(registry_dir, weights_path, manifest, activate=activate, members=members)
@@ -0,0 +1,167 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from preprocessing import POLICIES, last_occurrence, map_to_grid
+
+# ------- Out-of-core ingestion for survey CSVs larger than RAM -------
+# Pass 1 (scan_csv): one streaming pass for z-score stats (Welford/Chan merge),
+#   X/Y bounds and the rock-type vocabulary.
+# Pass 2 (stream_grids): normalize each chunk and accumulate it into
+#   memory-mapped feature/target grids.
+# Peak memory is one chunk plus the (memory-mapped) grids.
+
+class RunningStats:
+    """Online mean/variance per column, merged chunk by chunk (NaNs ignored like pandas)"""
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self.count = np.zeros(len(self.columns))
+        self.mean = np.zeros(len(self.columns))
+        self.m2 = np.zeros(len(self.columns))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        n_b = np.sum(~np.isnan(values), axis=0).astype(np.float64)
+        if not n_b.any():
+            return
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean_b = np.where(n_b > 0, np.nansum(values, axis=0) / n_b, 0.0)
+        m2_b = np.nansum((values - mean_b) ** 2, axis=0)
+        n = self.count + n_b
+        delta = mean_b - self.mean
+        safe_n = np.where(n > 0, n, 1.0)
+        self.mean = self.mean + delta * n_b / safe_n
+        self.m2 = self.m2 + m2_b + delta ** 2 * self.count * n_b / safe_n
+        self.count = n
+
+    def std(self, ddof=1):
+        return np.sqrt(self.m2 / np.maximum(self.count - ddof, 1))
+
+def scan_csv(path, numeric_features, chunksize=500_000):
+    """
+    First pass: z-score stats for numeric_features, X/Y bounds and rock-type counts.
+    Returns a JSON-serializable stats dict.
+    """
+    stats = RunningStats(numeric_features)
+    bounds = {"x_min": np.inf, "x_max": -np.inf, "y_min": np.inf, "y_max": -np.inf}
+    rock_counts = {}
+    rows = 0
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=[*numeric_features, "Rock_Type", "X", "Y"]):
+        rows += len(chunk)
+        stats.update(chunk[numeric_features].to_numpy(dtype=np.float64))
+        bounds["x_min"] = min(bounds["x_min"], float(chunk["X"].min()))
+        bounds["x_max"] = max(bounds["x_max"], float(chunk["X"].max()))
+        bounds["y_min"] = min(bounds["y_min"], float(chunk["Y"].min()))
+        bounds["y_max"] = max(bounds["y_max"], float(chunk["Y"].max()))
+        for rock_type, count in chunk["Rock_Type"].value_counts().items():
+            rock_counts[rock_type] = rock_counts.get(rock_type, 0) + int(count)
+
+    # Same codes as sklearn's LabelEncoder (sorted classes), so stats match the in-memory path
+    rock_types = sorted(rock_counts)
+    codes = np.arange(len(rock_types), dtype=np.float64)
+    counts = np.array([rock_counts[r] for r in rock_types], dtype=np.float64)
+    total = counts.sum()
+    enc_mean = float((codes * counts).sum() / total) if total else 0.0
+    enc_var = float((counts * (codes - enc_mean) ** 2).sum() / max(total - 1, 1))
+
+    stds = stats.std()
+    return {
+        "rows": rows,
+        "mean": {**dict(zip(numeric_features, stats.mean.tolist())), "Rock_Type_enc": enc_mean},
+        "std": {**dict(zip(numeric_features, stds.tolist())), "Rock_Type_enc": float(np.sqrt(enc_var))},
+        "bounds": bounds,
+        "rock_types": rock_types,
+    }
+
+def stream_grids(path, stats, features, grid_size, out_dir, policy="last", target="Target",
+                 target_policy="last", chunksize=500_000):
+    """
+    Second pass: normalize each chunk with `stats` and accumulate it into
+    memory-mapped grids under out_dir.
+    Returns feature_grid [channels, H, W] (float32 memmap), target_grid [H, W] (int64 memmap)
+    """
+    if policy not in POLICIES or target_policy not in POLICIES:
+        raise ValueError(f"Unknown policy, expected one of {POLICIES}")
+    os.makedirs(out_dir, exist_ok=True)
+    channels = len(features)
+    cells = grid_size * grid_size
+    encoding = {rock_type: code for code, rock_type in enumerate(stats["rock_types"])}
+    mean = np.array([stats["mean"][f] for f in features])
+    std = np.array([stats["std"][f] for f in features])
+    std[std == 0] = 1.0
+
+    feature_acc = _GridAccumulator(os.path.join(out_dir, "feature_acc"), channels, cells, policy)
+    target_acc = _GridAccumulator(os.path.join(out_dir, "target_acc"), 1, cells, target_policy)
+    raw_columns = [f for f in features if f != "Rock_Type_enc"]
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=[*raw_columns, "Rock_Type", "X", "Y", target]):
+        chunk["Rock_Type_enc"] = chunk["Rock_Type"].map(encoding).fillna(0)
+        values = (chunk[features].to_numpy(dtype=np.float64) - mean) / std
+        grid_x, grid_y = map_to_grid(chunk["X"].to_numpy(), chunk["Y"].to_numpy(), stats["bounds"], grid_size)
+        flat = grid_y * grid_size + grid_x
+        feature_acc.add(flat, values)
+        target_acc.add(flat, chunk[target].to_numpy(dtype=np.float64)[:, None])
+
+    feature_grid = np.lib.format.open_memmap(
+        os.path.join(out_dir, "feature_grid.npy"), mode="w+", dtype=np.float32, shape=(channels, grid_size, grid_size)
+    )
+    feature_acc.write_to(feature_grid.reshape(channels, cells))
+    target_grid = np.lib.format.open_memmap(
+        os.path.join(out_dir, "target_grid.npy"), mode="w+", dtype=np.int64, shape=(grid_size, grid_size)
+    )
+    target_values = np.zeros((1, cells))
+    target_acc.write_to(target_values)
+    if target_policy == "mean":
+        target_values = target_values >= 0.5
+    target_grid[:] = target_values.reshape(grid_size, grid_size)
+    feature_grid.flush()
+    target_grid.flush()
+    feature_acc.close()
+    target_acc.close()
+    with open(os.path.join(out_dir, "preprocessing_stats.json"), "w") as f:
+        json.dump({**stats, "grid_size": grid_size, "policy": policy, "features": list(features)}, f, indent=2)
+    return feature_grid, target_grid
+
+class _GridAccumulator:
+    """Memory-mapped per-cell accumulator for one scatter policy"""
+
+    def __init__(self, prefix, channels, cells, policy):
+        self.policy = policy
+        self.paths = []
+        init = -np.inf if policy == "max" else 0.0
+        self.values = self._memmap(prefix + ".values", (channels, cells), init)
+        self.counts = self._memmap(prefix + ".counts", (cells,), 0.0)
+
+    def _memmap(self, path, shape, init):
+        self.paths.append(path)
+        arr = np.memmap(path, mode="w+", dtype=np.float64, shape=shape)
+        arr[:] = init
+        return arr
+
+    def add(self, flat, values):
+        self.counts[:] += np.bincount(flat, minlength=self.counts.shape[0])
+        if self.policy == "last":
+            last = last_occurrence(flat)
+            self.values[:, flat[last]] = values[last].T
+        elif self.policy == "mean":
+            for c in range(self.values.shape[0]):
+                self.values[c] += np.bincount(flat, weights=values[:, c], minlength=self.counts.shape[0])
+        else:
+            chunk_max = np.full(self.values.shape[::-1], -np.inf)
+            np.maximum.at(chunk_max, flat, values)
+            np.maximum(self.values, chunk_max.T, out=self.values)
+
+    def write_to(self, out):
+        """Write final per-cell values into out [channels, cells]; empty cells become 0"""
+        occupied = self.counts > 0
+        out[:] = 0
+        if self.policy == "mean":
+            out[:, occupied] = self.values[:, occupied] / self.counts[occupied]
+        else:
+            out[:, occupied] = self.values[:, occupied]
+
+    def close(self):
+        del self.values, self.counts
+        for path in self.paths:
+            os.remove(path)
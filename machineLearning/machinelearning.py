@@ -1,20 +1,32 @@
-import pandas as pd
+import os
+import multiprocessing
 import numpy as np
 import torch
-from torch.utils.data import Dataset, DataLoader
+from torch.utils.data import DataLoader
 import torch.nn as nn
 import torch.optim as optim
-from sklearn.preprocessing import LabelEncoder
-from sklearn.metrics import classification_report, confusion_matrix, roc_auc_score, roc_curve
-import matplotlib.pyplot as plt
-
-# 1. Load dataset
-df = pd.read_csv('/home/lenovo/Desktop/OtherOpenSource/GeoGurdians-SIH/dataset.csv')
-print(df.columns)
-
-# 2. Preprocessing
-le = LabelEncoder()
-df['Rock_Type_enc'] = le.fit_transform(df['Rock_Type'])
+from preprocessing import load_site_grids
+from datasets import TiledGridDataset, IGNORE_INDEX
+from network import SimpleCNN
+from training import fit, holdout_mask, split_targets
+from evaluate import evaluate, predict_grid
+from export import publish_model, save_risk_map
+
+# Dataset location and ingestion mode (ROCKFALL_STREAMING=1 for CSVs larger than RAM)
+DATASET_PATH = os.environ.get('ROCKFALL_DATASET', '/home/lenovo/Desktop/OtherOpenSource/GeoGurdians-SIH/dataset.csv')
+STREAMING = os.environ.get('ROCKFALL_STREAMING') == '1'
+CHUNKSIZE = int(os.environ.get('ROCKFALL_CHUNKSIZE', '500000'))
+GRID_DIR = os.environ.get('ROCKFALL_GRID_DIR', 'grids')
+# Versioned model registry the API serves from (empty string skips publishing)
+MODEL_REGISTRY = os.environ.get(
+    'ROCKFALL_MODEL_REGISTRY',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'models'),
+)
+# Site risk map the API serves (/risk-map/*); the same variable and default path as backend/app.py
+RISK_MAP_PATH = os.environ.get(
+    'ROCKFALL_RISK_MAP',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend', 'risk_map.npy'),
+)
 
 features = [
     'Ore_Grade (%)',
@@ -24,32 +36,48 @@ features = [
     'Processing_Cost (¥)',
     'Rock_Type_enc'
 ]
-df[features] = (df[features] - df[features].mean()) / df[features].std()
-
-# 3. Map (X,Y) coords to grid
-x_min, x_max = df['X'].min(), df['X'].max()
-y_min, y_max = df['Y'].min(), df['Y'].max()
-grid_size = 64
-
-def map_to_grid(x, y):
-    grid_x = ((x - x_min) / (x_max - x_min) * (grid_size - 1)).astype(int)
-    grid_y = ((y - y_min) / (y_max - y_min) * (grid_size - 1)).astype(int)
-    return grid_x, grid_y
-
-df['grid_x'], df['grid_y'] = map_to_grid(df['X'], df['Y'])
-
-# 4. Build feature tensor grid for CNN input
 channels = len(features)
-feature_grid = np.zeros((channels, grid_size, grid_size), dtype=np.float32)
-
-for i, feature in enumerate(features):
-    for _, row in df.iterrows():
-        feature_grid[i, row['grid_y'], row['grid_x']] = row[feature]
-
-# 5. Build raw target grid with original labels (assumed binary 0/1)
-target_grid = np.zeros((grid_size, grid_size), dtype=np.int64)
-for _, row in df.iterrows():
-    target_grid[row['grid_y'], row['grid_x']] = row['Target']
+# Site grid resolution per axis and the patch size the CNN trains on
+grid_size = int(os.environ.get('ROCKFALL_GRID_SIZE', '64'))
+patch_size = int(os.environ.get('ROCKFALL_PATCH_SIZE', '64'))
+patch_stride = int(os.environ.get('ROCKFALL_PATCH_STRIDE', str(max(patch_size * 3 // 4, 1))))
+batch_size = int(os.environ.get('ROCKFALL_BATCH_SIZE', '16'))
+# Worker processes only with fork: this script has no __main__ guard for spawn to re-import
+default_workers = min(4, os.cpu_count() or 1) if multiprocessing.get_start_method() == 'fork' else 0
+num_workers = int(os.environ.get('ROCKFALL_NUM_WORKERS', str(default_workers)))
+# Training length: at most ROCKFALL_EPOCHS, stopping once the validation loss has not
+# improved for ROCKFALL_PATIENCE epochs (0 disables early stopping)
+max_epochs = int(os.environ.get('ROCKFALL_EPOCHS', '500'))
+patience = int(os.environ.get('ROCKFALL_PATIENCE', '30'))
+# Share of the site held out for validation, in val_block x val_block squares of cells
+val_fraction = float(os.environ.get('ROCKFALL_VAL_FRACTION', '0.2'))
+val_block = int(os.environ.get('ROCKFALL_VAL_BLOCK', '8'))
+# Checkpoint of model + optimizer state every N epochs; ROCKFALL_RESUME=1 continues from it
+CHECKPOINT_PATH = os.environ.get('ROCKFALL_CHECKPOINT', os.path.join('checkpoints', 'last.pt'))
+# ROCKFALL_CHECKPOINT_EVERY=0 / ROCKFALL_LOG_EVERY=0: only at the end of training
+checkpoint_every = int(os.environ.get('ROCKFALL_CHECKPOINT_EVERY', '10'))
+RESUME = os.environ.get('ROCKFALL_RESUME') == '1'
+log_every = int(os.environ.get('ROCKFALL_LOG_EVERY', '10'))
+# Dropout on the hidden activations while training (0 disables it); a model trained
+# with dropout can serve MC-dropout uncertainty estimates (backend uncertainty=true)
+dropout = float(os.environ.get('ROCKFALL_DROPOUT', '0'))
+# Seeds the holdout, weight init and shuffling, so runs (and resumed runs) are repeatable
+seed = int(os.environ.get('ROCKFALL_SEED', '0'))
+# After training: 'metrics' (default), 'plots' (metrics + PNG figures) or 'none'
+EVALUATE = os.environ.get('ROCKFALL_EVALUATE', 'metrics')
+# How rows landing in the same cell are combined: 'last', 'mean' or 'max' (see preprocessing.py)
+grid_policy = 'last'
+
+# 1-5. Load the dataset, normalize the features (z-score, label-encoded rock type) and
+# scatter them onto the site grid; ROCKFALL_STREAMING=1 does it in chunked passes
+# into memory-mapped grids (see preprocessing.load_site_grids / ingest.py)
+feature_grid, target_grid, bounds, normalization, rock_type_encoding = load_site_grids(
+    DATASET_PATH, features, grid_size, policy=grid_policy,
+    streaming=STREAMING, chunksize=CHUNKSIZE, grid_dir=GRID_DIR,
+)
+
+x_min, x_max = bounds['x_min'], bounds['x_max']
+y_min, y_max = bounds['y_min'], bounds['y_max']
 
 # 6. Convert binary labels to 4 risk categories: mapping example
 # 0 -> Safe (3), 1 -> Critical (0) as simple example - adjust as needed
@@ -59,130 +87,91 @@ risk_map[target_grid == 0] = 3  # Safe
 risk_map[target_grid == 1] = 0  # Critical
 # Further logic can be added for Normal and Danger based on probabilities later.
 
-# 7. Dataset and DataLoader
-class RockfallDataset(Dataset):
-    def __init__(self, features, targets):
-        self.features = torch.tensor(features)
-        self.targets = torch.tensor(targets)
-        
-    def __len__(self):
-        return 1
-    
-    def __getitem__(self, idx):
-        return self.features, self.targets
-
-dataset = RockfallDataset(feature_grid, target_grid)
-loader = DataLoader(dataset, batch_size=1, shuffle=True)
-
-# 8. Define CNN Model
-class SimpleCNN(nn.Module):
-    def __init__(self, in_channels):
-        super(SimpleCNN, self).__init__()
-        self.conv1 = nn.Conv2d(in_channels, 16, 3, padding=1)
-        self.bn1 = nn.BatchNorm2d(16)
-        self.conv2 = nn.Conv2d(16, 32, 3, padding=1)
-        self.bn2 = nn.BatchNorm2d(32)
-        self.conv3 = nn.Conv2d(32, 2, 1)  # output 2 classes
-        self.logsoftmax = nn.LogSoftmax(dim=1)
-        self.softmax = nn.Softmax(dim=1)  # for confidence scores
-        
-    def forward(self, x):
-        x = torch.relu(self.bn1(self.conv1(x)))
-        x = torch.relu(self.bn2(self.conv2(x)))
-        out = self.conv3(x)
-        log_prob = self.logsoftmax(out)
-        prob = self.softmax(out)
-        return log_prob, prob
-
-# 9. Training Setup
+# 7. Validation holdout: blocks of cells whose labels training never sees
+holdout = holdout_mask(target_grid.shape, fraction=val_fraction, block=val_block, seed=seed)
+train_targets, val_targets = split_targets(target_grid, holdout)
+
+# Dataset and DataLoader: overlapping patches of the site grid, shuffled each epoch
+dataset = TiledGridDataset(feature_grid, train_targets, patch_size=patch_size, stride=patch_stride)
+loader = DataLoader(
+    dataset,
+    batch_size=batch_size,
+    shuffle=True,
+    num_workers=num_workers,
+    pin_memory=torch.cuda.is_available(),
+    persistent_workers=num_workers > 0,
+)
+print(f"{len(dataset)} patches of {patch_size}x{patch_size}, batch size {batch_size}, {num_workers} workers, "
+      f"{int(holdout.sum())} validation cells")
+
+# 8. Training Setup (SimpleCNN lives in network.py)
 device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-model = SimpleCNN(in_channels=channels).to(device)
-criterion = nn.NLLLoss()
+torch.manual_seed(seed)
+np.random.seed(seed)
+model = SimpleCNN(in_channels=channels, dropout=dropout).to(device)
+criterion = nn.NLLLoss(ignore_index=IGNORE_INDEX)  # padded and held-out cells carry no label
 optimizer = optim.Adam(model.parameters(), lr=0.001)
 
-# 10. Training loop (100 epochs)
-model.train()
-for epoch in range(500):
-    for features_batch, targets_batch in loader:
-        features_batch = features_batch.to(device)
-        targets_batch = targets_batch.to(device)
-        
-        optimizer.zero_grad()
-        log_probs, _ = model(features_batch)
-        loss = criterion(log_probs, targets_batch)
-        loss.backward()
-        optimizer.step()
-    print(f"Epoch {epoch+1}, Loss: {loss.item():.4f}")
-
-# Save model weights
+# 9. Training loop: early stopping on the validation loss, periodic checkpoints
+# (ROCKFALL_RESUME=1 continues an interrupted run from its checkpoint)
+val_features = val_target_tensor = None
+if holdout.any():
+    val_features = torch.tensor(np.asarray(feature_grid)).unsqueeze(0).to(device)
+    val_target_tensor = torch.from_numpy(val_targets).unsqueeze(0).to(device)
+summary = fit(
+    model, optimizer, criterion, loader, device,
+    max_epochs=max_epochs,
+    val_features=val_features,
+    val_targets=val_target_tensor,
+    patience=patience,
+    checkpoint_path=CHECKPOINT_PATH,
+    checkpoint_every=checkpoint_every,
+    resume=RESUME,
+    log_every=log_every,
+)
+print(f"Trained {summary['epochs']} epochs in {summary['seconds']:.1f} s, "
+      f"best loss {summary['best_loss']:.4f} at epoch {summary['best_epoch']}")
+
+# Save the best model weights
 torch.save(model.state_dict(), "rockfall_model.pt")
 
-# 11. Load model for inference (if separate time)
-# model.load_state_dict(torch.load("rockfall_model.pt"))
-# model.eval()
-
-# 12. Evaluate model, get predictions and confidence scores
-model.eval()
-with torch.no_grad():
-    test_features = torch.tensor(feature_grid).unsqueeze(0).to(device)
-    log_probs, probs = model(test_features)
-    predictions = torch.argmax(log_probs, dim=1).squeeze(0).cpu().numpy()
-    confidence_scores = torch.max(probs, dim=1)[0].squeeze(0).cpu().numpy()
-
-# 13. Map output probabilities to risk labels (critical, danger, normal, safe)
-# For demo, convert binary probs to 4 classes via thresholds on confidence
-risk_labels = np.full(predictions.shape, 3)  # Default Safe=3
-risk_labels[(predictions==1) & (confidence_scores>0.85)] = 0  # Critical
-risk_labels[(predictions==1) & (confidence_scores>0.65)] = 1  # Danger
-risk_labels[(predictions==1) & (confidence_scores>0.5)] = 2   # Normal
-
-# 14. Print accuracy metrics with sklearn
-y_true = target_grid.flatten()
-y_pred = predictions.flatten()
-
-print("Classification Report:\n", classification_report(y_true, y_pred, target_names=['Safe','Critical']))
-print("Confusion Matrix:\n", confusion_matrix(y_true, y_pred))
-
-# For ROC AUC (binary classification only)
-try:
-    roc_auc = roc_auc_score(y_true, confidence_scores.flatten())
-    print(f"ROC AUC Score: {roc_auc:.4f}")
-except Exception as e:
-    print(f"ROC AUC Score Exception: {e}")
-
-# 15. Plot confusion matrix heatmap
-import seaborn as sns
-plt.figure(figsize=(6,5))
-cm = confusion_matrix(y_true, y_pred)
-sns.heatmap(cm, annot=True, fmt='d', cmap='Blues', xticklabels=['Safe','Critical'], yticklabels=['Safe','Critical'])
-plt.xlabel('Predicted')
-plt.ylabel('Actual')
-plt.title('Confusion Matrix')
-plt.savefig('confusion_matrix.png')
-
-# 16. Plot ROC Curve
-fpr, tpr, _ = roc_curve(y_true, confidence_scores.flatten())
-plt.figure()
-plt.plot(fpr, tpr, label=f'ROC curve (area = {roc_auc:.2f})')
-plt.plot([0,1], [0,1], 'k--')
-plt.xlabel('False Positive Rate')
-plt.ylabel('True Positive Rate')
-plt.title('ROC Curve')
-plt.legend(loc='lower right')
-plt.savefig('roc_curve.png')
-
-# 17. Visualize risk label predictions
-plt.figure(figsize=(8,6))
-cmap = plt.get_cmap('RdYlGn_r', 4)  # 4 discrete colors
-plt.imshow(risk_labels, cmap=cmap, vmin=0, vmax=3)
-cbar = plt.colorbar(ticks=[0,1,2,3])
-cbar.set_ticklabels(['Critical', 'Danger', 'Normal', 'Safe'])
-plt.title('Predicted Rockfall Risk Levels')
-plt.savefig('risk_level_map.png')
-
-#machine Learning Created
-
-
-
-
-#done
\ No newline at end of file
+# 10. Full-site predictions and confidence scores
+_, _, probs = predict_grid(model, feature_grid, device)
+
+# Save the full-site risk map where the API reads it, so it can serve cell lookups
+# without a forward pass (float16 [classes, H, W] probabilities + JSON sidecar,
+# see backend/Feature1/riskmap.py); a running API picks up the new file by itself
+saved = save_risk_map(
+    RISK_MAP_PATH, probs,
+    {"x_min": x_min, "x_max": x_max, "y_min": y_min, "y_max": y_max},
+    {0: "Safe", 1: "Risk"},
+    source="machinelearning.py",
+)
+print(f"Saved risk map to {saved}")
+# Keep the input grid too, so the map can be regenerated on demand with a new model,
+# plus the targets and holdout so evaluate.py can run later as its own stage
+np.save('feature_grid.npy', feature_grid)
+np.save('target_grid.npy', target_grid)
+np.save('holdout_mask.npy', holdout)
+
+# Publish weights + preprocessing metadata as a new registry version; a running API
+# picks it up via POST /models/reload or ROCKFALL_MODEL_WATCH_S, without a restart
+if MODEL_REGISTRY:
+    manifest = publish_model(MODEL_REGISTRY, "rockfall_model.pt", {
+        "channels": channels,
+        "grid_size": grid_size,
+        "features": features,
+        "normalization": {k: {f: float(v) for f, v in d.items()} for k, d in normalization.items()},
+        "bounds": {"x_min": float(x_min), "x_max": float(x_max), "y_min": float(y_min), "y_max": float(y_max)},
+        "rock_type_encoding": {k: int(v) for k, v in rock_type_encoding.items()},
+        "class_labels": {"0": "Safe", "1": "Risk"},
+        "dropout": dropout,
+        "source": "machinelearning.py",
+        "dataset": os.path.basename(DATASET_PATH),
+    })
+    print(f"Published model version {manifest['version']} to {MODEL_REGISTRY}")
+
+# 11. Evaluation stage: metrics by default, figures only when asked for
+# (or later: python evaluate.py)
+if EVALUATE != 'none':
+    evaluate(model, feature_grid, target_grid, device, holdout=holdout, plots=EVALUATE == 'plots')
@@ -0,0 +1,27 @@
+import torch
+import torch.nn as nn
+
+# Rockfall risk CNN; backend/Feature1/network.py must match this architecture
+# with the default widths (other widths are for hyperparameter sweeps, see sweep.py).
+# dropout acts on the conv1/conv2 activations in training only and adds no weights,
+# so the backend loads the state_dict either way; the backend's MC-dropout
+# uncertainty mode needs a model trained with it (manifest "dropout").
+class SimpleCNN(nn.Module):
+    def __init__(self, in_channels, widths=(16, 32), dropout=0.0):
+        super(SimpleCNN, self).__init__()
+        self.conv1 = nn.Conv2d(in_channels, widths[0], 3, padding=1)
+        self.bn1 = nn.BatchNorm2d(widths[0])
+        self.conv2 = nn.Conv2d(widths[0], widths[1], 3, padding=1)
+        self.bn2 = nn.BatchNorm2d(widths[1])
+        self.conv3 = nn.Conv2d(widths[1], 2, 1)  # output 2 classes
+        self.logsoftmax = nn.LogSoftmax(dim=1)
+        self.softmax = nn.Softmax(dim=1)  # for confidence scores
+        self.dropout = nn.Dropout(dropout)
+
+    def forward(self, x):
+        x = self.dropout(torch.relu(self.bn1(self.conv1(x))))
+        x = self.dropout(torch.relu(self.bn2(self.conv2(x))))
+        out = self.conv3(x)
+        log_prob = self.logsoftmax(out)
+        prob = self.softmax(out)
+        return log_prob, prob
@@ -0,0 +1,116 @@
+import numpy as np
+
+# Policies for cells that several rows map to
+#   last : value of the last row in file order (what the old iterrows loops did)
+#   mean : average of all rows in the cell
+#   max  : largest value in the cell
+POLICIES = ("last", "mean", "max")
+
+def compute_bounds(x, y):
+    """X/Y extent of the survey, used to map coordinates onto the grid"""
+    x = np.asarray(x)
+    y = np.asarray(y)
+    return {
+        "x_min": float(x.min()), "x_max": float(x.max()),
+        "y_min": float(y.min()), "y_max": float(y.max()),
+    }
+
+def map_to_grid(x, y, bounds, grid_size):
+    """Map (X, Y) coordinates to integer (grid_x, grid_y) cell indices"""
+    x_span = (bounds["x_max"] - bounds["x_min"]) or 1.0
+    y_span = (bounds["y_max"] - bounds["y_min"]) or 1.0
+    grid_x = ((np.asarray(x, dtype=np.float64) - bounds["x_min"]) / x_span * (grid_size - 1)).astype(np.int64)
+    grid_y = ((np.asarray(y, dtype=np.float64) - bounds["y_min"]) / y_span * (grid_size - 1)).astype(np.int64)
+    return np.clip(grid_x, 0, grid_size - 1), np.clip(grid_y, 0, grid_size - 1)
+
+def last_occurrence(flat):
+    """Indices of the last row that maps to each distinct cell"""
+    # First occurrence in reversed order == last occurrence in file order
+    _, rev_idx = np.unique(flat[::-1], return_index=True)
+    return len(flat) - 1 - rev_idx
+
+def scatter_to_grid(grid_y, grid_x, values, grid_size, policy="last", fill=0.0, dtype=np.float32):
+    """
+    Scatter row values into a [channels, grid_size, grid_size] grid in one pass.
+    values: array [N, channels] (or [N] for a single channel)
+    Cells no row maps to keep `fill`.
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Unknown policy {policy!r}, expected one of {POLICIES}")
+    values = np.asarray(values)
+    single = values.ndim == 1
+    if single:
+        values = values[:, None]
+    n, channels = values.shape
+    cells = grid_size * grid_size
+    flat = np.asarray(grid_y, dtype=np.int64) * grid_size + np.asarray(grid_x, dtype=np.int64)
+
+    out = np.full((cells, channels), fill, dtype=dtype)
+    if n:
+        if policy == "last":
+            last = last_occurrence(flat)
+            out[flat[last]] = values[last]
+        elif policy == "mean":
+            counts = np.bincount(flat, minlength=cells)
+            occupied = counts > 0
+            for c in range(channels):
+                sums = np.bincount(flat, weights=values[:, c], minlength=cells)
+                out[occupied, c] = sums[occupied] / counts[occupied]
+        else:
+            acc = np.full((cells, channels), -np.inf)
+            np.maximum.at(acc, flat, values)
+            occupied = np.bincount(flat, minlength=cells) > 0
+            out[occupied] = acc[occupied]
+
+    out = out.T.reshape(channels, grid_size, grid_size)
+    return out[0] if single else out
+
+def build_grids(df, features, grid_size, bounds=None, target="Target", policy="last", target_policy="last"):
+    """
+    Build the CNN feature grid [channels, H, W] and the target grid [H, W] from a frame
+    that already has normalized feature columns.
+    target_policy "mean" is a majority vote (cell is 1 if at least half its rows are 1).
+    Returns feature_grid, target_grid, bounds
+    """
+    bounds = bounds or compute_bounds(df["X"], df["Y"])
+    grid_x, grid_y = map_to_grid(df["X"].to_numpy(), df["Y"].to_numpy(), bounds, grid_size)
+    feature_grid = scatter_to_grid(
+        grid_y, grid_x, df[features].to_numpy(dtype=np.float32), grid_size, policy=policy
+    )
+    target_grid = scatter_to_grid(
+        grid_y, grid_x, df[target].to_numpy(dtype=np.float64), grid_size,
+        policy=target_policy, dtype=np.float64,
+    )
+    target_grid = (target_grid >= 0.5).astype(np.int64) if target_policy == "mean" else target_grid.astype(np.int64)
+    return feature_grid, target_grid, bounds
+
+def load_site_grids(path, features, grid_size, policy="last", streaming=False, chunksize=500_000, grid_dir="grids"):
+    """
+    CSV -> normalized site grids, in memory or (streaming=True) in two chunked passes
+    into memory-mapped grids under grid_dir (see ingest.py).
+    Returns feature_grid, target_grid, bounds, normalization {mean, std}, rock_type_encoding
+    """
+    import pandas as pd
+    from ingest import scan_csv, stream_grids
+
+    if streaming:
+        stats = scan_csv(path, features[:-1], chunksize=chunksize)
+        print(f"Scanned {stats['rows']} rows, rock types: {stats['rock_types']}")
+        normalization = {"mean": stats["mean"], "std": stats["std"]}
+        rock_type_encoding = {rock_type: code for code, rock_type in enumerate(stats["rock_types"])}
+        feature_grid, target_grid = stream_grids(
+            path, stats, features, grid_size, grid_dir, policy=policy, chunksize=chunksize
+        )
+        return feature_grid, target_grid, stats["bounds"], normalization, rock_type_encoding
+
+    df = pd.read_csv(path)
+    print(df.columns)
+    # Sorted codes, the same as sklearn's LabelEncoder
+    rock_types = sorted(df["Rock_Type"].unique())
+    df["Rock_Type_enc"] = df["Rock_Type"].map({rock_type: code for code, rock_type in enumerate(rock_types)})
+    feature_mean, feature_std = df[features].mean(), df[features].std()
+    df[features] = (df[features] - feature_mean) / feature_std
+    normalization = {"mean": feature_mean.to_dict(), "std": feature_std.to_dict()}
+    rock_type_encoding = {str(rock_type): code for code, rock_type in enumerate(rock_types)}
+    feature_grid, target_grid, bounds = build_grids(df, features, grid_size, policy=policy)
+    return feature_grid, target_grid, bounds, normalization, rock_type_encoding
@@ -0,0 +1,214 @@
+import os
+import json
+import time
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+import torch
+import torch.nn as nn
+import torch.optim as optim
+from torch.utils.data import DataLoader
+
+from preprocessing import load_site_grids
+from datasets import TiledGridDataset, IGNORE_INDEX
+from network import SimpleCNN
+from training import fit, holdout_mask, split_targets
+from evaluate import compute_metrics, predict_grid
+
+# ------- Parallel hyperparameter sweep for SimpleCNN -------
+# The CSV is loaded and gridded once; the feature/target grids and the validation
+# holdout are saved as .npy files in the sweep directory and memory-mapped by every
+# worker process, so all of them share one copy in the page cache. The feature grid
+# is mapped copy-on-write so torch can wrap it without copying; nothing writes to it.
+# Each worker trains one configuration at a time with its own slice of the CPUs
+# for torch threads, and every configuration lands as one row of results.csv.
+#
+# Run from machineLearning/:
+#   python sweep.py --dataset dataset.csv --lr 0.001 0.003 --widths 16,32 32,64 --epochs 200
+#   (every combination of the listed values is trained)
+
+FEATURES = [
+    'Ore_Grade (%)',
+    'Tonnage',
+    'Ore_Value (¥/tonne)',
+    'Mining_Cost (¥)',
+    'Processing_Cost (¥)',
+    'Rock_Type_enc'
+]
+
+def configurations(lrs, widths, epochs, batch_sizes, seeds):
+    """Every combination of the swept values, each with a short unique name"""
+    configs = []
+    for lr, width, max_epochs, batch_size, seed in itertools.product(lrs, widths, epochs, batch_sizes, seeds):
+        configs.append({
+            "name": f"lr{lr:g}-w{'x'.join(map(str, width))}-e{max_epochs}-b{batch_size}-s{seed}",
+            "lr": lr,
+            "widths": tuple(width),
+            "max_epochs": max_epochs,
+            "batch_size": batch_size,
+            "seed": seed,
+        })
+    return configs
+
+def prepare_grids(dataset, out_dir, grid_size=64, streaming=False, chunksize=500_000,
+                  val_fraction=0.2, val_block=8, seed=0):
+    """Build the grids and holdout once and save them in out_dir for the workers to memory-map"""
+    os.makedirs(out_dir, exist_ok=True)
+    feature_grid, target_grid, *_ = load_site_grids(
+        dataset, FEATURES, grid_size, streaming=streaming, chunksize=chunksize, grid_dir=out_dir
+    )
+    if not streaming:  # streaming already wrote feature_grid.npy / target_grid.npy there
+        np.save(os.path.join(out_dir, "feature_grid.npy"), feature_grid)
+        np.save(os.path.join(out_dir, "target_grid.npy"), target_grid)
+    holdout = holdout_mask(target_grid.shape, fraction=val_fraction, block=val_block, seed=seed)
+    np.save(os.path.join(out_dir, "holdout_mask.npy"), holdout)
+
+# Per-process state, set up once by _init_worker
+_worker = {}
+
+def _init_worker(grid_dir, threads, patch_size, patch_stride, patience):
+    torch.set_num_threads(threads)
+    # "c": copy-on-write, so torch.from_numpy gets a writable array backed by the shared pages
+    feature_grid = np.load(os.path.join(grid_dir, "feature_grid.npy"), mmap_mode="c")
+    target_grid = np.load(os.path.join(grid_dir, "target_grid.npy"), mmap_mode="r")
+    holdout = np.load(os.path.join(grid_dir, "holdout_mask.npy"))
+    train_targets, val_targets = split_targets(target_grid, holdout)
+    _worker.update({
+        "grid_dir": grid_dir,
+        "feature_grid": feature_grid,
+        "target_grid": target_grid,
+        "holdout": holdout,
+        "train_targets": train_targets,
+        "val_features": torch.from_numpy(feature_grid).unsqueeze(0),
+        "val_targets": torch.from_numpy(val_targets).unsqueeze(0),
+        "patch_size": patch_size,
+        "patch_stride": patch_stride,
+        "patience": patience,
+    })
+
+def train_configuration(config):
+    """Train and evaluate one configuration in a worker; returns its results row"""
+    w = _worker
+    device = torch.device("cpu")
+    torch.manual_seed(config["seed"])
+    np.random.seed(config["seed"])
+    dataset = TiledGridDataset(w["feature_grid"], w["train_targets"], patch_size=w["patch_size"], stride=w["patch_stride"])
+    loader = DataLoader(dataset, batch_size=config["batch_size"], shuffle=True)
+    model = SimpleCNN(in_channels=w["feature_grid"].shape[0], widths=config["widths"])
+    optimizer = optim.Adam(model.parameters(), lr=config["lr"])
+    has_holdout = bool(w["holdout"].any())
+    summary = fit(
+        model, optimizer, nn.NLLLoss(ignore_index=IGNORE_INDEX), loader, device,
+        max_epochs=config["max_epochs"],
+        val_features=w["val_features"] if has_holdout else None,
+        val_targets=w["val_targets"] if has_holdout else None,
+        patience=w["patience"],
+        log=lambda line: None,
+    )
+    torch.save(model.state_dict(), os.path.join(w["grid_dir"], config["name"] + ".pt"))
+
+    predictions, risk_probability, _ = predict_grid(model, w["feature_grid"], device)
+    overall = compute_metrics(w["target_grid"], predictions, risk_probability)
+    scored = compute_metrics(w["target_grid"], predictions, risk_probability, mask=w["holdout"]) if has_holdout else overall
+    best = summary["history"][summary["best_epoch"] - 1] if summary["best_epoch"] else summary["history"][-1]
+    (tn, fp), (fn, tp) = scored["confusion_matrix"]
+    return {
+        "name": config["name"],
+        "lr": config["lr"],
+        "widths": "x".join(map(str, config["widths"])),
+        "max_epochs": config["max_epochs"],
+        "batch_size": config["batch_size"],
+        "seed": config["seed"],
+        "epochs": summary["epochs"],
+        "best_epoch": summary["best_epoch"],
+        "stopped_early": summary["stopped_early"],
+        "train_loss": best["train_loss"],
+        "val_loss": best["val_loss"],
+        "roc_auc": scored["roc_auc"],
+        "roc_auc_all_cells": overall["roc_auc"],
+        "accuracy": scored["report"]["accuracy"],
+        "tn": tn, "fp": fp, "fn": fn, "tp": tp,
+        "seconds": summary["seconds"],
+    }
+
+def run_sweep(configs, grid_dir, workers=None, threads=None, patch_size=64, patch_stride=48, patience=30,
+              log=print):
+    """
+    Train configs across a process pool over the grids prepare_grids() saved in grid_dir.
+    workers: processes (default: one per CPU, at most one per config)
+    threads: torch threads per process (default: CPUs // workers)
+    Returns the results table sorted by validation loss.
+    """
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else (os.cpu_count() or 1)
+    workers = workers or max(1, min(cpus, len(configs)))
+    threads = threads or max(1, cpus // workers)
+    log(f"{len(configs)} configurations on {workers} workers x {threads} torch threads")
+    rows = []
+    started = time.perf_counter()
+    # spawn: torch's thread pools do not survive fork() reliably
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(grid_dir, threads, patch_size, patch_stride, patience),
+    ) as pool:
+        futures = {pool.submit(train_configuration, config): config for config in configs}
+        for future in as_completed(futures):
+            try:
+                row = future.result()
+            except Exception as e:
+                row = {"name": futures[future]["name"], "error": repr(e)}
+            rows.append(row)
+            if "error" in row:
+                log(f"[{len(rows)}/{len(configs)}] {row['name']}: {row['error']}")
+                continue
+            loss = row["train_loss"] if row["val_loss"] is None else row["val_loss"]
+            log(f"[{len(rows)}/{len(configs)}] {row['name']}: best loss {loss:.4f}, "
+                f"ROC AUC {row['roc_auc'] or float('nan'):.4f}, {row['epochs']} epochs in {row['seconds']:.1f} s")
+    log(f"Sweep finished in {time.perf_counter() - started:.1f} s")
+    results = pd.DataFrame(rows)
+    sort_key = "val_loss" if "val_loss" in results and results["val_loss"].notna().any() else "train_loss"
+    return results.sort_values(sort_key, na_position="last").reset_index(drop=True)
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train SimpleCNN configurations in parallel on one shared site grid")
+    parser.add_argument("--dataset", default=os.environ.get('ROCKFALL_DATASET', 'dataset.csv'))
+    parser.add_argument("--out", default=os.path.join("sweeps", time.strftime("%Y%m%d-%H%M%S")),
+                        help="sweep directory: shared grids, results.csv/json and the weights of every configuration")
+    parser.add_argument("--lr", type=float, nargs="+", default=[0.001])
+    parser.add_argument("--widths", nargs="+", default=["16,32"], help="conv1,conv2 channel widths")
+    parser.add_argument("--epochs", type=int, nargs="+", default=[500], help="max epochs (early stopping applies)")
+    parser.add_argument("--batch-size", type=int, nargs="+", default=[16])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--patience", type=int, default=30)
+    parser.add_argument("--grid-size", type=int, default=int(os.environ.get('ROCKFALL_GRID_SIZE', '64')))
+    parser.add_argument("--patch-size", type=int, default=int(os.environ.get('ROCKFALL_PATCH_SIZE', '64')))
+    parser.add_argument("--patch-stride", type=int, default=None)
+    parser.add_argument("--val-fraction", type=float, default=0.2)
+    parser.add_argument("--streaming", action="store_true", help="chunked ingestion for CSVs larger than RAM")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--threads", type=int, default=None, help="torch threads per worker")
+    args = parser.parse_args()
+
+    configs = configurations(
+        args.lr, [tuple(int(w) for w in widths.split(",")) for widths in args.widths],
+        args.epochs, args.batch_size, args.seeds,
+    )
+    start = time.perf_counter()
+    prepare_grids(args.dataset, args.out, grid_size=args.grid_size, streaming=args.streaming,
+                  val_fraction=args.val_fraction)
+    print(f"Prepared shared grids in {args.out} in {time.perf_counter() - start:.1f} s")
+
+    results = run_sweep(
+        configs, args.out, workers=args.workers, threads=args.threads, patch_size=args.patch_size,
+        patch_stride=args.patch_stride or max(args.patch_size * 3 // 4, 1), patience=args.patience,
+    )
+    results.to_csv(os.path.join(args.out, "results.csv"), index=False)
+    with open(os.path.join(args.out, "results.json"), "w") as f:
+        json.dump(results.to_dict(orient="records"), f, indent=2, default=str)
+    with pd.option_context("display.width", 200, "display.max_columns", None):
+        print(results.to_string(index=False))
@@ -0,0 +1,149 @@
+import os
+import time
+import tempfile
+import numpy as np
+import torch
+
+from datasets import IGNORE_INDEX
+
+# ------- Training runner: validation holdout, early stopping, checkpoints -------
+# The site is one grid, so validation holds out square blocks of cells rather than
+# patches: their labels are hidden from training (IGNORE_INDEX) and the validation
+# loss is computed on them alone from one full-grid forward pass per epoch.
+# A checkpoint holds model + optimizer state, the best weights so far and the
+# early-stopping counters, so a resumed run continues exactly where it stopped.
+
+def holdout_mask(shape, fraction=0.2, block=8, seed=0):
+    """Boolean [H, W] mask of validation cells: a random `fraction` of block x block squares"""
+    height, width = shape
+    if fraction <= 0:
+        return np.zeros(shape, dtype=bool)
+    rows, cols = -(-height // block), -(-width // block)
+    rng = np.random.default_rng(seed)
+    chosen = np.zeros(rows * cols, dtype=bool)
+    chosen[rng.choice(rows * cols, max(1, int(round(fraction * rows * cols))), replace=False)] = True
+    cells = np.kron(chosen.reshape(rows, cols), np.ones((block, block), dtype=bool))
+    return cells[:height, :width]
+
+def split_targets(target_grid, mask):
+    """(train_targets, val_targets): each with the other split's cells set to IGNORE_INDEX"""
+    target_grid = np.asarray(target_grid, dtype=np.int64)
+    return np.where(mask, IGNORE_INDEX, target_grid), np.where(mask, target_grid, IGNORE_INDEX)
+
+def save_checkpoint(path, state):
+    """Write a checkpoint atomically, so a crash mid-write keeps the previous one"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=".checkpoint.")
+    with os.fdopen(fd, "wb") as f:
+        torch.save(state, f)
+    os.replace(tmp, path)
+
+def load_checkpoint(path, model, optimizer):
+    """Restore model/optimizer/RNG state in place; returns the checkpoint dict"""
+    state = torch.load(path, map_location="cpu", weights_only=False)
+    model.load_state_dict(state["model"])
+    optimizer.load_state_dict(state["optimizer"])
+    torch.set_rng_state(state["torch_rng"])
+    np.random.set_state(state["numpy_rng"])
+    return state
+
+def validation_loss(model, criterion, features, targets):
+    """Loss over the labelled cells of `targets` from one full-grid forward pass"""
+    model.eval()
+    with torch.no_grad():
+        log_probs, _ = model(features)
+        loss = criterion(log_probs, targets).item()
+    model.train()
+    return loss
+
+def fit(model, optimizer, criterion, loader, device, max_epochs=500, val_features=None, val_targets=None,
+        patience=20, min_delta=1e-4, checkpoint_path=None, checkpoint_every=10, resume=False,
+        log_every=10, log=print):
+    """
+    Train until max_epochs or until the validation loss (training loss without a
+    validation set) has not improved by min_delta for `patience` epochs, then load
+    the best weights back into the model.
+    val_features: [1, C, H, W] tensor on device; val_targets: [1, H, W] with IGNORE_INDEX outside the holdout
+    patience: 0 disables early stopping
+    checkpoint_path: written every checkpoint_every epochs and when training ends
+    (checkpoint_every <= 0: only when training ends)
+    resume: continue from checkpoint_path if it exists
+    log_every: print the first, every Nth and the final epoch (* marks a new best;
+    log_every <= 0: only the final epoch)
+    Returns a summary dict with the per-epoch loss history.
+    """
+    state = {
+        "epoch": 0, "best_loss": float("inf"), "best_epoch": 0, "bad_epochs": 0,
+        "best_model": None, "history": [],
+    }
+    if resume and checkpoint_path and os.path.exists(checkpoint_path):
+        saved = load_checkpoint(checkpoint_path, model, optimizer)
+        state.update({k: saved[k] for k in state})
+        log(f"Resumed from {checkpoint_path} at epoch {state['epoch']} (best {state['best_loss']:.4f})")
+
+    def checkpoint():
+        if checkpoint_path:
+            save_checkpoint(checkpoint_path, {
+                **state,
+                "model": model.state_dict(),
+                "optimizer": optimizer.state_dict(),
+                "torch_rng": torch.get_rng_state(),
+                "numpy_rng": np.random.get_state(),
+            })
+
+    stopped_early = state["bad_epochs"] >= patience > 0
+    started = time.perf_counter()
+    model.train()
+    while state["epoch"] < max_epochs and not stopped_early:
+        epoch_loss, labelled = 0.0, 0
+        for features_batch, targets_batch in loader:
+            features_batch = features_batch.to(device, non_blocking=True)
+            targets_batch = targets_batch.to(device, non_blocking=True)
+            count = int((targets_batch != IGNORE_INDEX).sum())
+            if count == 0:
+                continue  # every cell held out or padding; the loss would be NaN
+            optimizer.zero_grad()
+            log_probs, _ = model(features_batch)
+            loss = criterion(log_probs, targets_batch)
+            loss.backward()
+            optimizer.step()
+            epoch_loss += loss.item() * count
+            labelled += count
+        state["epoch"] += 1
+        train_loss = epoch_loss / max(labelled, 1)
+        val_loss = None
+        if val_features is not None:
+            val_loss = validation_loss(model, criterion, val_features, val_targets)
+        state["history"].append({"epoch": state["epoch"], "train_loss": train_loss, "val_loss": val_loss})
+
+        monitored = train_loss if val_loss is None else val_loss
+        improved = monitored < state["best_loss"] - min_delta
+        if improved:
+            state["best_loss"], state["best_epoch"], state["bad_epochs"] = monitored, state["epoch"], 0
+            state["best_model"] = {k: v.detach().clone() for k, v in model.state_dict().items()}
+        else:
+            state["bad_epochs"] += 1
+        stopped_early = state["bad_epochs"] >= patience > 0
+
+        last = stopped_early or state["epoch"] == max_epochs
+        if last or (log_every > 0 and (state["epoch"] % log_every == 0 or state["epoch"] == 1)):
+            line = f"Epoch {state['epoch']}, Loss: {train_loss:.4f}"
+            if val_loss is not None:
+                line += f", Val loss: {val_loss:.4f}"
+            log(line + (" *" if improved else ""))
+        if last or (checkpoint_every > 0 and state["epoch"] % checkpoint_every == 0):
+            checkpoint()
+
+    if stopped_early:
+        log(f"Stopped early at epoch {state['epoch']}: no improvement for {patience} epochs")
+    if state["best_model"] is not None:
+        model.load_state_dict(state["best_model"])
+    return {
+        "epochs": state["epoch"],
+        "best_epoch": state["best_epoch"],
+        "best_loss": state["best_loss"],
+        "stopped_early": stopped_early,
+        "seconds": time.perf_counter() - started,
+        "history": state["history"],
+    }